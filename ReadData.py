@@ -1,47 +1,153 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import tkinter as tk
-from tkinter import filedialog, ttk
+from tkinter import filedialog, simpledialog, ttk
 import os
+from matplotlib.colors import LogNorm
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import sys
 import webbrowser
 import tempfile
+import time
+import bisect
+
+from data_grid import VirtualGrid
+from plot_view import PlotView
+from npzengine import MODE_EAGER, MODE_MMAP, NPZArchive, member_stats
+from npzengine.arraycache import default_array_cache
+from npzengine.concat import ConcatArchive
+from npzengine.decimate import minmax_decimate
+from npzengine.derived import TileStore, default_derived_store
+from npzengine.density import density_grid, point_bounds, point_chunks
+from npzengine.export import EXPORT_FORMATS, export_archive, export_member
+from npzengine.folder import DTYPE_KINDS, FolderIndex
+from npzengine.histogram import member_histogram
+from npzengine.preview import member_preview
+from npzengine.pyramid import STATS as TILE_STATS, TilePyramid
+from npzengine.query import filter_rows, selection_field_stats, selection_histogram, selection_stats
+from npzengine.slicing import SliceReader
+from npzengine.stats import member_field_stats, numeric_fields
+from npzengine.table import TableModel
+from npzengine.tasks import TaskScheduler
+from npzengine.trace import span, tracer
 
 
 class NPZViewer:
+    # Background job groups; a new job cancels the running one in its group
+    TASK_GROUPS = ("load", "folder", "preview", "select", "filter", "plot", "decimate", "tiles",
+                   "density", "export")
+    
+    # How often an open folder is checked for new or changed archives; the
+    # checks run in their own group, outside TASK_GROUPS, so the status bar
+    # and its Cancel button leave them alone
+    FOLDER_RESCAN_MS = 5000
+    FOLDER_RESCAN_GROUP = "folder-rescan"
+    
+    # Save dialog label and pattern per export format
+    EXPORT_FILETYPES = {
+        "csv": ("CSV files", "*.csv"),
+        "csv.gz": ("gzip CSV files", "*.csv.gz"),
+        "csv.zst": ("zstd CSV files", "*.csv.zst"),
+        "npy": ("NumPy files", "*.npy"),
+        "parquet": ("Parquet files", "*.parquet"),
+    }
+    
     def __init__(self, root):
         self.root = root
         self.root.title("NPZ File Viewer")
         self.root.geometry("1000x800")
         
         self.npz_data = None
+        self.archive_index = None
         self.current_array_name = None
         self.current_array = None
+        self.selection = None  # query.Selection of the current array's filter, if any
+        self.line_sources = []  # (line artist, full series) of the line plot
+        self.heatmap = None  # (image artist, tile pyramid, statistic) of the heatmap
+        self.scatter_density = None  # (image artist, marker artist, point source) of the scatter plot
+        self.slice_reader = None  # 2D slices of the current N-D array
+        self.slice_axes = (0, 1)  # (row axis, column axis) shown by the slice navigator
+        self.slice_indices = []  # index along every axis; displayed axes are ignored
         
         self.x_dim = tk.StringVar()
         self.y_dim = tk.StringVar()
         
         self.data_table_window = None  # Add variable to track data table window
+        self.timing_window = None  # Timing panel of the instrumentation spans
+        
+        self.folder_index = None  # FolderIndex of the open folder, if any
+        self.folder_items = {}  # tree item id -> (archive path, array name or None)
+        self.folder_filter_job = None
+        
+        # Heavy work runs off the Tk thread; results come back through poll_tasks
+        self.tasks = TaskScheduler(max_workers=len(self.TASK_GROUPS) + 1)
         
         self.create_widgets()
+        self.poll_tasks()
     
     def create_widgets(self):
         # Create a menu bar
         menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
         
+        # Create Export menu
+        export_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Export", menu=export_menu)
+        for fmt in EXPORT_FORMATS:
+            label = self.EXPORT_FILETYPES[fmt][0]
+            export_menu.add_command(label=f"Current Array as {label}...",
+                                    command=lambda fmt=fmt: self.export_current(fmt))
+        export_menu.add_separator()
+        for fmt in EXPORT_FORMATS:
+            label = self.EXPORT_FILETYPES[fmt][0]
+            export_menu.add_command(label=f"All Arrays as {label}...",
+                                    command=lambda fmt=fmt: self.export_all(fmt))
+        
+        # Create Cache menu
+        cache_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Cache", menu=cache_menu)
+        cache_menu.add_command(label="Array Cache Budget...", command=self.set_array_cache_budget)
+        cache_menu.add_command(label="Clear Caches", command=self.clear_caches)
+        
+        # Create Debug menu
+        debug_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Debug", menu=debug_menu)
+        self.trace_enabled = tk.BooleanVar(value=tracer.enabled)
+        self.trace_alloc = tk.BooleanVar(value=tracer.track_alloc)
+        debug_menu.add_checkbutton(label="Instrumentation", variable=self.trace_enabled,
+                                   command=self.toggle_tracing)
+        debug_menu.add_checkbutton(label="Track Allocations", variable=self.trace_alloc,
+                                   command=self.toggle_tracing)
+        debug_menu.add_command(label="Timing Panel...", command=self.show_timing_panel)
+        debug_menu.add_command(label="Save Trace...", command=self.save_trace)
+        debug_menu.add_command(label="Clear Timings", command=tracer.clear)
+        
         # Create Help menu
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="View README", command=self.show_readme)
         
+        # Status bar with progress of background jobs
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 5))
+        
+        self.status_label = ttk.Label(status_frame, text="Ready")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.cache_label = ttk.Label(status_frame, text="")
+        self.cache_label.pack(side=tk.LEFT, padx=15)
+        self.trace_label = ttk.Label(status_frame, text="")
+        self.trace_label.pack(side=tk.LEFT, padx=15)
+        ttk.Button(status_frame, text="Cancel", command=self.cancel_tasks).pack(side=tk.RIGHT, padx=5)
+        self.progress_bar = ttk.Progressbar(status_frame, length=200, maximum=100)
+        self.progress_bar.pack(side=tk.RIGHT, padx=5)
+        
         # Top frame for file selection
         top_frame = ttk.Frame(self.root)
         top_frame.pack(fill=tk.X, padx=10, pady=10)
         
         ttk.Button(top_frame, text="Open NPZ File", command=self.load_npz).pack(side=tk.LEFT, padx=5)
+        ttk.Button(top_frame, text="Open Folder", command=self.open_folder).pack(side=tk.LEFT, padx=5)
         self.file_label = ttk.Label(top_frame, text="No file selected")
         self.file_label.pack(side=tk.LEFT, padx=5)
         
@@ -57,6 +163,43 @@ class NPZViewer:
         self.array_listbox.pack(fill=tk.BOTH, expand=True)
         self.array_listbox.bind('<<ListboxSelect>>', self.on_array_select)
         
+        # Folder browser: every archive below a directory, shown instead of
+        # the array list once a folder is opened
+        self.folder_frame = ttk.Frame(left_panel)
+        
+        filter_frame = ttk.Frame(self.folder_frame)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Search:").pack(side=tk.LEFT)
+        self.folder_search = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.folder_search, width=16).pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Type:").pack(side=tk.LEFT)
+        self.folder_kind = tk.StringVar(value="any")
+        ttk.Combobox(filter_frame, textvariable=self.folder_kind, values=["any"] + list(DTYPE_KINDS),
+                     width=9, state="readonly").pack(side=tk.LEFT, padx=5)
+        ttk.Label(filter_frame, text="Min MB:").pack(side=tk.LEFT)
+        self.folder_min_mb = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.folder_min_mb, width=6).pack(side=tk.LEFT, padx=5)
+        for var in (self.folder_search, self.folder_kind, self.folder_min_mb):
+            var.trace_add("write", lambda *args: self.schedule_folder_filter())
+        
+        tree_frame = ttk.Frame(self.folder_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.folder_tree = ttk.Treeview(tree_frame, columns=("shape", "dtype", "size"))
+        self.folder_tree.heading("#0", text="Archive / array")
+        self.folder_tree.heading("shape", text="Shape")
+        self.folder_tree.heading("dtype", text="Type")
+        self.folder_tree.heading("size", text="Size")
+        self.folder_tree.column("#0", width=220)
+        for column, width in (("shape", 100), ("dtype", 70), ("size", 70)):
+            self.folder_tree.column(column, width=width, stretch=False)
+        tree_scroll = ttk.Scrollbar(tree_frame, orient="vertical", command=self.folder_tree.yview)
+        self.folder_tree.configure(yscrollcommand=tree_scroll.set)
+        self.folder_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.folder_tree.bind("<<TreeviewSelect>>", self.on_folder_select)
+        ttk.Button(self.folder_frame, text="Concatenate Across Archives",
+                   command=self.open_concatenation).pack(fill=tk.X, pady=(5, 0))
+        
         # Right panel for array info and visualization
         right_panel = ttk.Frame(middle_frame)
         right_panel.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -71,6 +214,17 @@ class NPZViewer:
         
         ttk.Button(info_controls, text="View Data Table", command=self.show_data_table).pack(side=tk.RIGHT)
         
+        # Filter bar: rows matching an expression such as "col[3] > 5 and isnan(col[1])"
+        ttk.Label(info_controls, text="Filter:").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(info_controls, textvariable=self.filter_var, width=40)
+        filter_entry.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        filter_entry.bind("<Return>", lambda e: self.apply_filter())
+        ttk.Button(info_controls, text="Apply", command=self.apply_filter).pack(side=tk.LEFT)
+        ttk.Button(info_controls, text="Clear", command=self.clear_filter).pack(side=tk.LEFT, padx=(5, 0))
+        self.filter_label = ttk.Label(info_controls, text="")
+        self.filter_label.pack(side=tk.LEFT, padx=5)
+        
         self.info_text = tk.Text(info_frame, height=8, wrap=tk.WORD)
         self.info_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
@@ -112,9 +266,32 @@ class NPZViewer:
         self.x_dim.set('0')
         self.y_dim.set('1')
         
+        # Histogram options
+        hist_frame = ttk.Frame(viz_controls)
+        hist_frame.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(hist_frame, text="Bins:").pack(side=tk.LEFT)
+        self.bins_var = tk.StringVar(value="100")
+        ttk.Spinbox(hist_frame, from_=1, to=10000, width=6,
+                    textvariable=self.bins_var).pack(side=tk.LEFT, padx=5)
+        self.log_scale = tk.BooleanVar(value=False)
+        ttk.Checkbutton(hist_frame, text="Log", variable=self.log_scale).pack(side=tk.LEFT)
+        
+        # Heatmap block reduction
+        heat_frame = ttk.Frame(viz_controls)
+        heat_frame.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(heat_frame, text="Heatmap:").pack(side=tk.LEFT)
+        self.tile_stat = tk.StringVar(value="mean")
+        ttk.Combobox(heat_frame, textvariable=self.tile_stat, values=list(TILE_STATS),
+                     width=5, state="readonly").pack(side=tk.LEFT, padx=5)
+        
         # Button should be after all the controls
         ttk.Button(viz_controls, text="Plot", command=self.plot_data).pack(side=tk.LEFT, padx=10)
         
+        # Slice navigator, shown for arrays with more than two dimensions
+        self.slice_frame = ttk.LabelFrame(viz_frame, text="Slice")
+        
         # Canvas for matplotlib - Fix the initialization order
         self.fig = Figure(figsize=(5, 4), dpi=100)
         self.canvas_frame = ttk.Frame(viz_frame)
@@ -122,12 +299,142 @@ class NPZViewer:
         
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.canvas_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Plots of the same layout update these artists in place
+        self.plot_view = PlotView(self.canvas)
         
         # Create toolbar frame after canvas is initialized
         toolbar_frame = ttk.Frame(viz_frame)
         toolbar_frame.pack(fill=tk.X)
         self.toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
         
+    def run_task(self, group, fn, *args, on_done=None, on_error=None, message=""):
+        """Run fn(task, *args) on the worker pool, reporting progress in the status bar"""
+        def progress(fraction, text):
+            if text:
+                self.status_label.config(text=text)
+            if fraction is not None:
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate", value=fraction * 100)
+        
+        def finish(callback, *result):
+            self.update_status()
+            if callback is not None:
+                callback(*result)
+        
+        self.status_label.config(text=f"{message}...")
+        self.progress_bar.config(mode="indeterminate")
+        self.progress_bar.start(10)
+        return self.tasks.submit(fn, *args, group=group,
+                                 on_done=lambda result: finish(on_done, result),
+                                 on_error=lambda e: finish(on_error, e),
+                                 on_progress=progress)
+    
+    def poll_tasks(self):
+        """Deliver results of background jobs on the Tk thread"""
+        self.tasks.poll()
+        self.update_cache_status()
+        if tracer.enabled:
+            self.update_trace_status()
+        self.root.after(50, self.poll_tasks)
+    
+    def update_cache_status(self):
+        """Show how the decoded-array cache is doing in the status bar"""
+        cache = default_array_cache.to_dict()
+        text = (f"Array cache: {cache['hits']} hits, {cache['misses']} misses, "
+                f"{cache['bytes'] / 2**20:,.0f} of {cache['max_bytes'] / 2**20:,.0f} MB")
+        if self.cache_label.cget("text") != text:
+            self.cache_label.config(text=text)
+    
+    def update_trace_status(self):
+        """Show where the time went, by span, in the status bar"""
+        text = "  ".join(f"{row['name']} {row['seconds'] * 1e3:,.0f} ms"
+                         for row in tracer.totals()[:3])
+        if self.trace_label.cget("text") != text:
+            self.trace_label.config(text=text)
+    
+    def toggle_tracing(self):
+        if self.trace_enabled.get():
+            tracer.enable(track_alloc=self.trace_alloc.get())
+        else:
+            tracer.disable()
+            self.trace_alloc.set(False)
+            self.trace_label.config(text="")
+    
+    def show_timing_panel(self):
+        """Opens a window with the time, bytes and allocations of every span"""
+        if self.timing_window is not None and self.timing_window.winfo_exists():
+            self.timing_window.lift()
+            return
+        if not tracer.enabled:
+            self.trace_enabled.set(True)
+            self.toggle_tracing()
+        
+        self.timing_window = tk.Toplevel(self.root)
+        self.timing_window.title("Timings")
+        self.timing_window.geometry("700x400")
+        
+        columns = ("count", "total", "mean", "mb", "rate", "alloc")
+        tree = ttk.Treeview(self.timing_window, columns=columns)
+        tree.heading("#0", text="Span")
+        tree.column("#0", width=180)
+        for column, heading in zip(columns, ("Count", "Total ms", "Mean ms", "MB read",
+                                             "MB/s", "Alloc MB")):
+            tree.heading(column, text=heading)
+            tree.column(column, width=80, anchor=tk.E)
+        scrollbar = ttk.Scrollbar(self.timing_window, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        def refresh():
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            for row in tracer.totals():
+                rate, alloc = row["mb_per_s"], row["alloc_bytes"]
+                tree.insert("", tk.END, text=row["name"], values=(
+                    f"{row['count']:,}",
+                    f"{row['seconds'] * 1e3:,.1f}",
+                    f"{row['mean_seconds'] * 1e3:,.2f}",
+                    f"{row['bytes'] / 1e6:,.1f}" if row["bytes"] else "",
+                    "" if rate is None else f"{rate:,.0f}",
+                    "" if alloc is None else f"{alloc / 1e6:,.1f}"))
+            self.timing_window.after(500, refresh)
+        refresh()
+    
+    def save_trace(self):
+        """Write the recorded spans as a Chrome trace"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace files", "*.json"), ("All files", "*.*")],
+            initialfile="npzview-trace.json"
+        )
+        if file_path:
+            tracer.dump(file_path)
+    
+    def set_array_cache_budget(self):
+        budget = simpledialog.askinteger(
+            "Array Cache Budget", "Memory for recently viewed arrays (MB):",
+            initialvalue=default_array_cache.max_bytes // 2**20, minvalue=0, parent=self.root)
+        if budget is not None:
+            default_array_cache.resize(budget * 2**20)
+    
+    def clear_caches(self):
+        default_array_cache.clear()
+        default_derived_store.clear()
+    
+    def update_status(self):
+        if any(self.tasks.busy(group) for group in self.TASK_GROUPS):
+            return
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.status_label.config(text="Ready")
+    
+    def cancel_tasks(self):
+        for group in self.TASK_GROUPS:
+            self.tasks.cancel(group)
+        self.update_status()
+    
     def load_npz(self):
         file_path = filedialog.askopenfilename(
             filetypes=[("NPZ files", "*.npz"), ("All files", "*.*")]
@@ -135,104 +442,453 @@ class NPZViewer:
         
         if not file_path:
             return
-            
+        self.open_archive(file_path)
+    
+    def open_archive(self, file_path):
+        """Index an archive in the background and list its arrays"""
+        # Back to the single-archive array list
+        self.tasks.cancel(self.FOLDER_RESCAN_GROUP)
+        self.folder_index = None
+        self.folder_frame.pack_forget()
+        self.array_listbox.pack(fill=tk.BOTH, expand=True)
+        
+        # Anything still running belongs to the previous file
+        self.tasks.cancel("preview")
+        self.tasks.cancel("select")
+        self.tasks.cancel("filter")
+        self.tasks.cancel("plot")
+        self.file_label.config(text=f"Opening {os.path.basename(file_path)}...")
+        self.run_task("load", lambda task: NPZArchive(file_path),
+                      on_done=self.on_archive_loaded,
+                      on_error=lambda e: self.file_label.config(text=f"Error: {str(e)}"),
+                      message="Reading archive index")
+    
+    def open_folder(self):
+        """Browse every archive below a directory"""
+        folder = filedialog.askdirectory(title="Open folder of NPZ files")
+        if not folder:
+            return
+        
+        self.tasks.cancel(self.FOLDER_RESCAN_GROUP)
+        self.folder_index = FolderIndex(folder)
+        self.folder_items = {}
+        self.folder_tree.delete(*self.folder_tree.get_children())
+        self.array_listbox.pack_forget()
+        self.folder_frame.pack(fill=tk.BOTH, expand=True)
+        self.file_label.config(text=f"Indexing {folder}...")
+        
+        # Only zip directories and .npy headers are read, many files at once
+        index = self.folder_index
+        self.run_task("folder", lambda task: index.scan(
+                          progress=lambda done, total: task.progress(
+                              done / max(1, total), f"Indexed {done:,} of {total:,} archives")),
+                      on_done=lambda result: self.on_folder_scanned(index, result),
+                      on_error=lambda e: self.file_label.config(text=f"Error: {str(e)}"),
+                      message="Indexing folder")
+        # Rescans go on whether the first scan finishes, fails or is
+        # cancelled; a cancelled scan is simply picked up by the next one
+        self.root.after(self.FOLDER_RESCAN_MS, lambda: self.rescan_folder(index))
+    
+    def on_folder_scanned(self, index, result):
+        if index is not self.folder_index:
+            return
+        if result or not index.paths:
+            self.file_label.config(text=f"{index.root} ({len(index.paths):,} archives)")
+            self.update_folder_tree(result.paths)
+    
+    def rescan_folder(self, index):
+        """Pick up archives that appeared, changed or went away"""
+        if index is not self.folder_index:
+            return
+        # Scheduled before anything runs, since the callbacks of a cancelled
+        # or failed scan never reschedule
+        self.root.after(self.FOLDER_RESCAN_MS, lambda: self.rescan_folder(index))
+        if self.tasks.busy("folder") or self.tasks.busy(self.FOLDER_RESCAN_GROUP):
+            return
+        # Quietly, without the status bar: usually nothing has changed
+        self.tasks.submit(lambda task: index.scan(progress=lambda done, total: task.check()),
+                          group=self.FOLDER_RESCAN_GROUP,
+                          on_done=lambda result: self.on_folder_scanned(index, result))
+    
+    def folder_filters(self):
+        kind = self.folder_kind.get()
         try:
-            self.npz_data = np.load(file_path)
-            self.file_label.config(text=os.path.basename(file_path))
+            min_bytes = float(self.folder_min_mb.get()) * 2**20
+        except ValueError:
+            min_bytes = None
+        return {"text": self.folder_search.get().strip(),
+                "kind": None if kind == "any" else kind,
+                "min_bytes": min_bytes}
+    
+    def schedule_folder_filter(self):
+        """Re-filter the folder tree once typing pauses"""
+        if self.folder_filter_job is not None:
+            self.root.after_cancel(self.folder_filter_job)
+        self.folder_filter_job = self.root.after(200, self.filter_folder_tree)
+    
+    def filter_folder_tree(self):
+        self.folder_filter_job = None
+        if self.folder_index is None:
+            return
+        self.folder_items = {}
+        self.folder_tree.delete(*self.folder_tree.get_children())
+        self.update_folder_tree(self.folder_index.paths)
+    
+    @staticmethod
+    def format_bytes(n):
+        for unit in ("B", "KB", "MB", "GB"):
+            if n < 1024 or unit == "GB":
+                return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+            n /= 1024
+    
+    def update_folder_tree(self, paths):
+        """Refresh the tree nodes of the given archives, leaving the rest alone"""
+        tree = self.folder_tree
+        index = self.folder_index
+        filters = self.folder_filters()
+        for path in paths:
+            if tree.exists(path):
+                for child in tree.get_children(path):
+                    self.folder_items.pop(child, None)
+                tree.delete(path)
+                self.folder_items.pop(path, None)
             
-            # Update array listbox
-            self.array_listbox.delete(0, tk.END)
-            for key in self.npz_data.files:
-                self.array_listbox.insert(tk.END, key)
-                
-            self.info_text.delete(1.0, tk.END)
-            self.info_text.insert(tk.END, f"File: {file_path}\n")
-            self.info_text.insert(tk.END, f"Contains {len(self.npz_data.files)} arrays\n\n")
-            self.info_text.insert(tk.END, "Select an array to view details")
+            error = index.errors.get(path)
+            members = index.members(path, **filters)
+            if not members and (error is None or filters["text"] or filters["kind"]):
+                continue
             
-            # Clear figure
-            self.fig.clear()
-            self.canvas.draw()
+            # Archive nodes stay sorted by path
+            position = bisect.bisect(tree.get_children(), path)
+            label = os.path.relpath(path, index.root)
+            if error is not None:
+                tree.insert("", position, iid=path, text=f"{label} (unreadable)", values=("", "", ""))
+                self.folder_items[path] = (path, None)
+                continue
+            total = sum(info.nbytes for info in members)
+            tree.insert("", position, iid=path, text=label,
+                        values=(f"{len(members)} arrays", "", self.format_bytes(total)))
+            self.folder_items[path] = (path, None)
+            for info in members:
+                iid = f"{path}\n{info.name}"
+                tree.insert(path, "end", iid=iid, text=info.name,
+                            values=(str(info.shape), str(info.dtype), self.format_bytes(info.nbytes)))
+                self.folder_items[iid] = (path, info.name)
+    
+    def on_folder_select(self, event):
+        selection = self.folder_tree.selection()
+        if not selection or selection[0] not in self.folder_items:
+            return
+        path, name = self.folder_items[selection[0]]
+        
+        if self.npz_data is None or self.npz_data.path != path:
+            index = self.folder_index.indexes.get(path)
+            if index is None:
+                self.info_text.delete(1.0, tk.END)
+                self.info_text.insert(tk.END, f"{path}\n\n{self.folder_index.errors.get(path, '')}")
+                return
+            # The folder scan already indexed it, so opening reads nothing
+            self.tasks.cancel("preview")
+            self.tasks.cancel("select")
+            self.tasks.cancel("filter")
+            self.tasks.cancel("plot")
+            self.on_archive_loaded(NPZArchive(path, index=index))
+        if name is not None and name in self.archive_index:
+            self.array_listbox.selection_clear(0, tk.END)
+            self.array_listbox.selection_set(self.archive_index.files.index(name))
+            self.select_array(name)
+    
+    def open_concatenation(self):
+        """View the selected array of every archive in the folder as one
+        array, concatenated along its first axis"""
+        selection = self.folder_tree.selection()
+        if self.folder_index is None or not selection or selection[0] not in self.folder_items:
+            return
+        path, name = self.folder_items[selection[0]]
+        if name is None:
+            tk.messagebox.showinfo("Concatenate", "Select an array to concatenate across archives.")
+            return
+        
+        index = self.folder_index
+        like = index.indexes[path][name]
+        paths = index.shards(name, like)
+        indexes = {p: index.indexes[p] for p in paths if p in index.indexes}
+        self.tasks.cancel("preview")
+        self.tasks.cancel("select")
+        self.tasks.cancel("filter")
+        self.tasks.cancel("plot")
+        self.file_label.config(text=f"Concatenating {name} across {len(paths):,} archives...")
+        # Built from the folder's indexes; no array payload is read
+        self.run_task("load", lambda task: ConcatArchive(paths, name, indexes=indexes),
+                      on_done=lambda archive: self.on_concatenation_loaded(archive, name),
+                      on_error=lambda e: self.file_label.config(text=f"Error: {str(e)}"),
+                      message=f"Concatenating {name}")
+    
+    def on_concatenation_loaded(self, archive, name):
+        self.on_archive_loaded(archive)
+        self.select_array(name)
+    
+    def on_archive_loaded(self, archive):
+        # The index only reads zip metadata and .npy headers, so the
+        # array list is available without touching any array payload
+        if self.npz_data is not None:
+            self.npz_data.close()
+        self.npz_data = archive
+        self.archive_index = archive.index
+        self.current_array_name = None
+        self.current_array = None
+        self.reset_filter()
+        file_path = archive.path
+        self.file_label.config(text=os.path.basename(file_path))
+        
+        # Update array listbox
+        self.array_listbox.delete(0, tk.END)
+        for key in self.archive_index.files:
+            self.array_listbox.insert(tk.END, key)
             
-        except Exception as e:
-            self.file_label.config(text=f"Error: {str(e)}")
+        self.info_text.delete(1.0, tk.END)
+        self.info_text.insert(tk.END, f"File: {file_path}\n")
+        self.info_text.insert(tk.END, f"Contains {len(self.archive_index)} arrays\n\n")
+        self.info_text.insert(tk.END, "Select an array to view details")
+        
+        # Clear figure
+        self.fig.clear()
+        self.canvas.draw()
     
     def on_array_select(self, event):
-        if not self.npz_data:
+        if self.archive_index is None:
             return
         
         selection = self.array_listbox.curselection()
         if not selection:
             return
-            
-        self.current_array_name = self.npz_data.files[selection[0]]
-        self.current_array = self.npz_data[self.current_array_name]
+        self.select_array(self.archive_index.files[selection[0]])
+    
+    def select_array(self, name):
+        """Show the details of an array of the open archive"""
+        self.current_array_name = name
+        self.current_array = None
+        self.clear_slice_controls()
+        info = self.archive_index[self.current_array_name]
+        
+        # A plot and a filter of the previous array are stale now
+        self.tasks.cancel("plot")
+        self.reset_filter()
         
-        # Display array information
+        # Display header information straight from the index
         self.info_text.delete(1.0, tk.END)
         self.info_text.insert(tk.END, f"Array: {self.current_array_name}\n")
-        self.info_text.insert(tk.END, f"Shape: {self.current_array.shape}\n")
-        self.info_text.insert(tk.END, f"Type: {self.current_array.dtype}\n")
+        self.info_text.insert(tk.END, f"Shape: {info.shape}\n")
+        self.info_text.insert(tk.END, f"Type: {info.dtype}\n")
+        self.info_text.insert(tk.END, f"Order: {'Fortran' if info.fortran_order else 'C'}\n")
+        self.info_text.insert(tk.END, f"Storage: {'deflate' if info.compressed else 'stored'}, "
+                                      f"{info.compressed_size:,} bytes in archive, "
+                                      f"{info.nbytes:,} bytes in memory\n")
+        if isinstance(self.npz_data, ConcatArchive):
+            self.info_text.insert(tk.END, f"Access: concatenated from {len(self.npz_data.archives):,} "
+                                          f"archives, read per archive on demand\n")
+        elif self.npz_data.access_mode(self.current_array_name) == MODE_MMAP:
+            self.info_text.insert(tk.END, "Access: memory-mapped (zero-copy)\n")
+        else:
+            self.info_text.insert(tk.END, "Access: loaded into memory\n")
+        
+        # Statistics go here when they are ready, above the preview
+        self.info_text.mark_set("stats", tk.END)
+        self.info_text.mark_gravity("stats", tk.LEFT)
         
-        if self.current_array.size > 0:
-            self.info_text.insert(tk.END, f"Min: {self.current_array.min()}\n")
-            self.info_text.insert(tk.END, f"Max: {self.current_array.max()}\n")
-            if self.current_array.size > 1:
-                self.info_text.insert(tk.END, f"Mean: {self.current_array.mean()}\n")
-                self.info_text.insert(tk.END, f"Std Dev: {self.current_array.std()}\n")
+        # The preview needs only the start of the array, so it is shown
+        # right away; statistics and loading follow on another worker.
+        # Selecting another array cancels both and drops their results
+        self.run_task("preview", self.load_preview, self.npz_data, self.current_array_name,
+                      on_done=self.show_preview,
+                      on_error=lambda e: self.info_text.insert(tk.END, f"\nError reading preview: {str(e)}\n"),
+                      message=f"Reading {self.current_array_name}")
+        self.run_task("select", self.load_array_details, self.npz_data, self.current_array_name,
+                      on_done=self.show_array_details,
+                      on_error=lambda e: self.info_text.insert(tk.END, f"\nError loading array: {str(e)}\n"),
+                      message=f"Loading {self.current_array_name}")
+    
+    def load_preview(self, task, archive, name):
+        """Worker side of the info panel preview: format it from the first
+        rows of the member, or reuse it from the derived store"""
+        entry = default_derived_store.get(archive, name, "preview")
+        if entry is not None:
+            return name, entry[0]["text"]
+        preview = member_preview(archive, name)
+        default_derived_store.put(archive, name, "preview", meta={"text": preview})
+        return name, preview
+    
+    def show_preview(self, result):
+        name, preview = result
+        shape = self.archive_index[name].shape
         
         # Add a better data preview with tabular format
         self.info_text.insert(tk.END, "\nData Preview (First 10 rows):\n")
-        
-        # Format the preview based on array dimensions
-        data = self.current_array
-        
-        if data.ndim == 1:
-            # For 1D arrays, show index and value
-            preview = "Index | Value\n"
-            preview += "-" * 30 + "\n"
-            for i in range(min(10, data.size)):
-                preview += f"{i:5d} | {data[i]}\n"
-                
-        elif data.ndim == 2:
-            # For 2D arrays, show row indices and columns
-            max_cols = min(10, data.shape[1])  # Show at most 10 columns
-            preview = "Row |"
-            for col in range(max_cols):
-                preview += f" Col{col} |"
-            preview += "\n" + "-" * (8 * max_cols + 6) + "\n"
-            
-            for row in range(min(10, data.shape[0])):
-                preview += f"{row:3d} |"
-                for col in range(max_cols):
-                    val = data[row, col]
-                    # Format the value to keep table tidy
-                    if isinstance(val, (int, np.integer)):
-                        val_str = f"{val:5d}"
-                    else:
-                        val_str = f"{val:.4f}"[:6]
-                    preview += f" {val_str:>5} |"
-                preview += "\n"
-                
-        else:
-            # For higher dimensional arrays, flatten first 100 elements and show
-            preview = "Flattened view:\n"
-            preview += "-" * 30 + "\n"
-            flat_data = data.flatten()
-            for i in range(min(10, flat_data.size)):
-                preview += f"[{i:3d}]: {flat_data[i]}\n"
-        
         self.info_text.insert(tk.END, preview)
         
         # If the array is large, add a note
-        if (data.ndim == 1 and data.size > 10) or \
-           (data.ndim == 2 and (data.shape[0] > 10 or data.shape[1] > 10)) or \
-           (data.ndim > 2):
+        if (len(shape) == 1 and shape[0] > 10) or \
+           (len(shape) == 2 and (shape[0] > 10 or shape[1] > 10)) or \
+           (len(shape) > 2):
             self.info_text.insert(tk.END, "\n(Showing truncated preview of larger data)")
+    
+    def load_array_details(self, task, archive, name):
+        """Worker side of on_array_select: load the array and compute its
+        statistics, reusing them from the derived store when the archive
+        is unchanged"""
+        # The array is needed for plots and the table anyway, so a member
+        # that has to be decoded is decoded once and summarised from memory
+        # rather than inflated a second time for the statistics
+        data = None
+        if archive.access_mode(name) == MODE_EAGER:
+            data = archive[name]
+        task.progress(0.0, f"Computing statistics for {name}")
+        # One chunked pass, cached per (file, array) in memory and on disk;
+        # structured arrays get statistics per field
+        if archive.index[name].dtype.names is not None:
+            stats = member_field_stats(archive, name, progress=task.progress, data=data)
+        else:
+            stats = member_stats(archive, name, progress=task.progress, data=data)
+        # The plot last made of this array, read here rather than on the
+        # GUI thread
+        entry = default_derived_store.get(archive, name, "plot")
+        settings = None if entry is None else entry[0]
+        return name, stats, archive[name] if data is None else data, settings
+    
+    def show_array_details(self, result):
+        name, stats, data, settings = result
+        
+        # One insert: the mark stays in front of inserted text
+        lines = self.stats_lines(stats)
+        if lines:
+            self.info_text.insert("stats", "".join(line + "\n" for line in lines))
+        self.on_array_loaded(name, data, settings)
+    
+    @classmethod
+    def stats_lines(cls, stats):
+        """Info panel lines of an ArrayStats, or of {field: ArrayStats}"""
+        lines = []
+        if isinstance(stats, dict):
+            lines.append("Fields:")
+            for field, field_stats in stats.items():
+                lines.append(f"  {field}: {cls.format_field_stats(field_stats)}")
+        elif stats is not None and stats.count > 0:
+            lines.append(f"Min: {stats.min}")
+            lines.append(f"Max: {stats.max}")
+            if stats.count > 1:
+                lines.append(f"Mean: {stats.mean}")
+                lines.append(f"Std Dev: {stats.std}")
+        if stats is not None and not isinstance(stats, dict) and stats.total > 0:
+            lines.append(f"NaN: {stats.nan_count:,}  Inf: {stats.inf_count:,}  "
+                         f"Zeros: {stats.zero_count:,}")
+        return lines
+    
+    @staticmethod
+    def format_field_stats(stats):
+        if stats is None:
+            return "not numeric"
+        if stats.count == 0:
+            return f"no finite values ({stats.nan_count:,} NaN)"
+        text = f"min {stats.min}, max {stats.max}, mean {stats.mean:.6g}, std {stats.std:.6g}"
+        if stats.nan_count or stats.inf_count:
+            text += f", {stats.nan_count:,} NaN, {stats.inf_count:,} Inf"
+        return text
+    
+    def apply_filter(self):
+        """Select the rows of the current array that match the filter bar"""
+        if self.current_array is None:
+            return
+        text = self.filter_var.get().strip()
+        if not text:
+            self.clear_filter()
+            return
+        name = self.current_array_name
+        self.filter_label.config(text="Filtering...")
+        self.run_task("filter", self.load_filter, self.npz_data, name, self.current_array, text,
+                      on_done=self.show_filter,
+                      on_error=lambda e: self.filter_label.config(text=f"Error: {str(e)}"),
+                      message=f"Filtering {name}")
+    
+    def load_filter(self, task, archive, name, data, text):
+        """Worker side of apply_filter: the matching rows and their statistics"""
+        # The filter runs block by block on the array already loaded
+        # (memory-mapped, decoded or concatenated); only the matching
+        # row numbers are kept
+        selection = filter_rows(archive, name, text, data=data,
+                                progress=lambda f: task.progress(0.5 * f))
+        task.progress(0.5, f"Computing statistics of {len(selection):,} rows")
+        view = selection.view(data)
+        progress = lambda f: task.progress(0.5 + 0.5 * f)
+        if data.dtype.names is not None:
+            return name, selection, selection_field_stats(view, progress=progress)
+        return name, selection, selection_stats(view, progress=progress)
+    
+    def show_filter(self, result):
+        name, selection, stats = result
+        if name != self.current_array_name:
+            return
+        self.reset_filter()
+        self.selection = selection
+        self.filter_label.config(text=f"{len(selection):,} of {selection.n_rows:,} rows")
+        lines = [f"Filter: {selection.text} ({len(selection):,} of {selection.n_rows:,} rows)"]
+        lines += ["  " + line for line in self.stats_lines(stats)]
+        self.info_text.insert(tk.END, "\n" + "".join(line + "\n" for line in lines), "filter")
+        self.show_selection()
+    
+    def clear_filter(self):
+        """Show the whole array again"""
+        self.filter_var.set("")
+        had_selection = self.selection is not None
+        self.reset_filter()
+        if had_selection:
+            self.show_selection()
+    
+    def reset_filter(self):
+        """Drop the filter of the current array; the filter bar keeps its
+        text so it can be applied to the next array"""
+        self.tasks.cancel("filter")
+        self.selection = None
+        self.filter_label.config(text="")
+        ranges = self.info_text.tag_ranges("filter")
+        if ranges:
+            self.info_text.delete(ranges[0], ranges[-1])
+    
+    def show_selection(self):
+        """Redraw the views that show only the filtered rows: the data
+        table, histograms and scatter plots"""
+        if self.data_table_window is not None and self.data_table_window.winfo_exists():
+            self.show_data_table()
+        if self.plot_type.get() in ("histogram", "scatter") and self.plot_view.layout is not None:
+            self.plot_data()
+    
+    @staticmethod
+    def plot_fields(dtype):
+        """Fields of a structured dtype that can be plotted as one value per record"""
+        return [field for field in numeric_fields(dtype) if not dtype[field].shape]
+    
+    def on_array_loaded(self, name, data, settings=None):
+        if name != self.current_array_name:
+            return
+        self.current_array = data
+        
+        if data.ndim > 2 and data.dtype.names is None:
+            self.build_slice_controls(name, data)
         
         # After setting current_array, update dimension options if scatter is selected
         if self.plot_type.get() == "scatter":
             self.update_dimension_options()
+        
+        # Redraw the plot last made of this array; its histogram, tiles or
+        # statistics are usually in the derived store already
+        if settings is not None:
+            self.plot_type.set(settings["plot_type"])
+            self.on_plot_type_change()
+            self.bins_var.set(settings["bins"])
+            self.log_scale.set(settings["log"])
+            self.tile_stat.set(settings["tile_stat"])
+            self.x_dim.set(settings["x_dim"])
+            self.y_dim.set(settings["y_dim"])
+            self.plot_data()
     
     def on_plot_type_change(self, event=None):
         """Show/hide dimension controls based on plot type"""
@@ -250,7 +906,15 @@ class NPZViewer:
         # Get the shape of the current array
         shape = self.current_array.shape
         
-        if len(shape) == 1:
+        if self.current_array.dtype.names is not None:
+            # For structured arrays, offer the record index and every field
+            fields = self.plot_fields(self.current_array.dtype)
+            options = ['index'] + fields
+            self.x_combo.config(values=options)
+            self.y_combo.config(values=options)
+            self.x_dim.set(fields[0] if len(fields) > 1 else 'index')
+            self.y_dim.set(fields[1] if len(fields) > 1 else fields[0] if fields else 'index')
+        elif len(shape) == 1:
             # For 1D arrays, offer index and value
             options = ['index', 'value']
             self.x_combo.config(values=options)
@@ -280,140 +944,574 @@ class NPZViewer:
             self.y_combo.config(values=options)
             self.x_dim.set('flattened')
             self.y_dim.set('flattened')
-    
+
+    def clear_slice_controls(self):
+        """Hide the slice navigator and drop the previous array's slices"""
+        if self.slice_reader is not None:
+            self.slice_reader.close()
+            self.slice_reader = None
+        for child in self.slice_frame.winfo_children():
+            child.destroy()
+        self.slice_frame.pack_forget()
+
+    def build_slice_controls(self, name, data):
+        """Show axis pickers and index sliders for an N-D array"""
+        self.clear_slice_controls()
+        self.slice_reader = SliceReader(self.npz_data, name, data=data)
+        self.slice_axes = (data.ndim - 2, data.ndim - 1)
+        self.slice_indices = [0] * data.ndim
+
+        axes = [str(axis) for axis in range(data.ndim)]
+        axis_frame = ttk.Frame(self.slice_frame)
+        axis_frame.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(axis_frame, text="Rows axis:").pack(side=tk.LEFT)
+        self.slice_row_var = tk.StringVar(value=str(self.slice_axes[0]))
+        row_combo = ttk.Combobox(axis_frame, textvariable=self.slice_row_var, values=axes,
+                                 width=3, state="readonly")
+        row_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Label(axis_frame, text="Cols axis:").pack(side=tk.LEFT)
+        self.slice_col_var = tk.StringVar(value=str(self.slice_axes[1]))
+        col_combo = ttk.Combobox(axis_frame, textvariable=self.slice_col_var, values=axes,
+                                 width=3, state="readonly")
+        col_combo.pack(side=tk.LEFT, padx=5)
+        row_combo.bind("<<ComboboxSelected>>", self.on_slice_axes_changed)
+        col_combo.bind("<<ComboboxSelected>>", self.on_slice_axes_changed)
+
+        self.slice_scales_frame = ttk.Frame(self.slice_frame)
+        self.slice_scales_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.build_slice_scales()
+        self.slice_frame.pack(fill=tk.X, padx=5, before=self.canvas_frame)
+
+    def build_slice_scales(self):
+        """One slider per axis that is not displayed"""
+        for child in self.slice_scales_frame.winfo_children():
+            child.destroy()
+        shape = self.slice_reader.shape
+        for axis, size in enumerate(shape):
+            if axis in self.slice_axes:
+                continue
+            ttk.Label(self.slice_scales_frame, text=f"Axis {axis}:").pack(side=tk.LEFT)
+            scale = tk.Scale(self.slice_scales_frame, from_=0, to=size - 1, resolution=1,
+                             orient=tk.HORIZONTAL, length=120,
+                             command=lambda value, axis=axis: self.on_slice_moved(axis, value))
+            scale.set(self.slice_indices[axis])
+            scale.pack(side=tk.LEFT, padx=(0, 10))
+
+    def on_slice_axes_changed(self, event=None):
+        rows, cols = int(self.slice_row_var.get()), int(self.slice_col_var.get())
+        if rows == cols:
+            # Keep the previous choice for the other picker
+            self.slice_row_var.set(str(self.slice_axes[0]))
+            self.slice_col_var.set(str(self.slice_axes[1]))
+            return
+        self.slice_axes = (rows, cols)
+        self.build_slice_scales()
+        if self.plot_type.get() in ("line", "heatmap"):
+            self.plot_data()
+
+    def on_slice_moved(self, axis, value):
+        index = int(float(value))
+        if index == self.slice_indices[axis]:
+            return
+        self.slice_indices[axis] = index
+        if self.plot_type.get() in ("line", "heatmap"):
+            self.plot_data()
+        # Read the neighbouring slices while this one is drawn, so stepping
+        # along the axis does not wait on the archive
+        self.slice_reader.prefetch(*self.slice_view(), axis)
+
+    def slice_view(self):
+        """(row axis, column axis, indices) of the slice being navigated"""
+        return self.slice_axes[0], self.slice_axes[1], tuple(self.slice_indices)
+
     def plot_data(self):
         if self.current_array is None:
             return
-            
-        self.fig.clear()
-        ax = self.fig.add_subplot(111)
         
+        # Tk variables are read here, the worker only sees plain values
         try:
-            plot_type = self.plot_type.get()
+            bins = max(1, int(self.bins_var.get()))
+        except ValueError:
+            bins = 100
+        options = {
+            "plot_type": self.plot_type.get(),
+            "x_dim": self.x_dim.get(),
+            "y_dim": self.y_dim.get(),
+            "width": self.canvas.get_tk_widget().winfo_width(),
+            "bins": bins,
+            "log": self.log_scale.get(),
+            "height": self.canvas.get_tk_widget().winfo_height(),
+            "tile_stat": self.tile_stat.get(),
+            "selection": self.selection,
+        }
+        if self.slice_reader is not None:
+            options["slice_reader"] = self.slice_reader
+            options["slice"] = self.slice_view()
+        self.run_task("plot", self.prepare_plot, self.npz_data, self.current_array,
+                      self.current_array_name, options,
+                      on_done=self.draw_plot,
+                      on_error=self.draw_plot_error,
+                      message="Preparing plot")
+    
+    def prepare_plot(self, task, archive, data, name, options):
+        """Worker side of plot_data: sample and reduce the data into a plot
+        description that draw_plot renders on the GUI thread"""
+        plot_type = options["plot_type"]
+        x_dim, y_dim = options["x_dim"], options["y_dim"]
+        width = options["width"]
+        plot = {"kind": plot_type, "title": name, "log": options["log"]}
+        member = name
+        tile_variant = ()
+        
+        # Remembered so selecting this array again redraws the same plot
+        default_derived_store.put(archive, name, "plot", meta={
+            key: options[key] for key in ("plot_type", "bins", "log", "tile_stat", "x_dim", "y_dim")})
+        
+        selection = options["selection"]
+        if selection is not None and plot_type in ("histogram", "scatter"):
+            # Only the filtered rows, gathered block by block; line plots
+            # and heatmaps show the whole array
+            data = selection.view(data)
+        else:
+            selection = None
+        
+        fields = None if data.dtype.names is None else self.plot_fields(data.dtype)
+        if fields is not None:
+            if not fields:
+                raise ValueError(f"{name} has no numeric fields to plot")
+            if plot_type == "heatmap":
+                raise ValueError("Heatmaps need a numeric array; plot the fields of a "
+                                 "structured array as lines, histograms or a scatter plot")
+            with span("plot.flatten", nbytes=data.nbytes):
+                records = data if data.ndim == 1 else data.reshape(-1)
+        
+        if plot_type == "histogram" and fields is not None:
+            # One exact histogram per field, each a pass over a field view
+            plot["fields"] = []
+            for i, field in enumerate(fields):
+                progress = lambda f, i=i: task.progress((i + f) / len(fields))
+                if selection is not None:
+                    histogram = selection_histogram(data, bins=options["bins"], field=field,
+                                                    progress=progress)
+                else:
+                    histogram = member_histogram(archive, name, bins=options["bins"], field=field,
+                                                 progress=progress)
+                plot["fields"].append((field, histogram.counts, histogram.edges))
+            plot["title"] = f"{name} Histograms"
             
-            # Flatten data for certain plot types
-            data = self.current_array
+        elif plot_type == "histogram":
+            # Exact counts over every value, cached per (array, bins, range)
+            if selection is not None:
+                histogram = selection_histogram(data, bins=options["bins"], progress=task.progress)
+            else:
+                histogram = member_histogram(archive, name, bins=options["bins"], progress=task.progress)
+            if histogram is None:
+                raise ValueError(f"Cannot compute a histogram of {data.dtype} values")
+            plot["counts"], plot["edges"] = histogram.counts, histogram.edges
+            plot["title"] = f"{name} Histogram"
             
-            if plot_type == "histogram":
-                if data.size > 1000000:  # Prevent huge histograms
-                    indices = np.random.choice(data.size, size=1000000, replace=False)
-                    data_sample = data.flat[indices]
-                    ax.hist(data_sample, bins=100)
-                    ax.set_title(f"{self.current_array_name} Histogram (Sampled)")
+        if data.ndim > 2 and fields is None and plot_type in ("line", "heatmap"):
+            # Only the 2D slice picked in the slice navigator is read
+            row_axis, col_axis, indices = options["slice"]
+            data = options["slice_reader"].read(row_axis, col_axis, indices)
+            name += "[" + ", ".join(":" if axis in (row_axis, col_axis) else str(i)
+                                    for axis, i in enumerate(indices)) + "]"
+            if row_axis > col_axis:
+                name += " (transposed)"
+            tile_variant = (row_axis, col_axis) + tuple(
+                i for axis, i in enumerate(indices) if axis not in (row_axis, col_axis))
+            if plot_type == "heatmap":
+                plot["xlabel"], plot["ylabel"] = f"Axis {col_axis}", f"Axis {row_axis}"
+        
+        if plot_type == "line":
+            series = []
+            if fields is not None:
+                # One series per field, each a zero-copy view of the records
+                for field in fields[:10]:
+                    series.append((records[field], field))
+                plot["title"] = f"{name} Line Plot"
+            elif data.ndim == 1:
+                series.append((data, None))
+                plot["title"] = f"{name} Line Plot"
+            elif data.ndim == 2 and (data.shape[0] <= 10 or data.shape[1] <= 10):
+                if data.shape[0] <= data.shape[1]:
+                    for i in range(min(10, data.shape[0])):
+                        series.append((data[i], f'Row {i}'))
                 else:
-                    ax.hist(data.flatten(), bins=100)
-                    ax.set_title(f"{self.current_array_name} Histogram")
+                    for i in range(min(10, data.shape[1])):
+                        series.append((data[:, i], f'Column {i}'))
+                plot["title"] = f"{name} Line Plot"
+            else:
+                with span("plot.flatten", nbytes=data.nbytes):
+                    series.append((data.reshape(-1), None))
+                plot["title"] = f"{name} Line Plot (Flattened)"
+            
+            # Draw about two points per pixel column; the full series is
+            # kept so zooming can re-decimate the visible range
+            plot["series"] = []
+            for values, label in series:
+                task.check()
+                plot["series"].append((values, label, minmax_decimate(values, width)))
                 
-            elif plot_type == "line":
-                if data.ndim == 1:
-                    ax.plot(data)
-                    ax.set_title(f"{self.current_array_name} Line Plot")
-                elif data.ndim == 2 and (data.shape[0] <= 10 or data.shape[1] <= 10):
-                    if data.shape[0] <= data.shape[1]:
-                        for i in range(min(10, data.shape[0])):
-                            ax.plot(data[i], label=f'Row {i}')
-                    else:
-                        for i in range(min(10, data.shape[1])):
-                            ax.plot(data[:, i], label=f'Column {i}')
-                    ax.legend()
-                    ax.set_title(f"{self.current_array_name} Line Plot")
-                else:
-                    ax.plot(data.flatten())
-                    ax.set_title(f"{self.current_array_name} Line Plot (Flattened)")
+        elif plot_type == "heatmap":
+            # Block-reduced tiles at screen resolution; zooming requests
+            # finer tiles for just the visible region
+            image = data.reshape(-1, 1) if data.ndim < 2 else data
+            pyramid = TilePyramid(image, store=TileStore(default_derived_store, archive,
+                                                         member, tile_variant))
+            stat = options["tile_stat"]
+            plot["pyramid"], plot["tile_stat"] = pyramid, stat
+            plot["image"], plot["bounds"] = pyramid.viewport(
+                0, pyramid.height, 0, pyramid.width,
+                options["height"], width, stat, task.check)
+            plot["colorbar"] = data.ndim == 2
+            plot["title"] = f"{name} Heatmap" if stat == "mean" else f"{name} Heatmap ({stat})"
+                
+        elif plot_type == "scatter":
+            # Points are the array's elements against their index, or two
+            # columns of a 2D array
+            x, y = "index", "value"
+            if fields is not None:
+                # For structured arrays, two fields (or the record index)
+                x = x_dim if x_dim in fields else "index"
+                y = y_dim if y_dim in fields else fields[0]
+                data = records
+                plot["title"] = f"{name} Scatter ({x} vs {y})"
+                plot["xlabel"], plot["ylabel"] = x, y
+                
+            elif data.ndim == 1:
+                # For 1D data, use index vs value or value vs index
+                if x_dim == 'value' and y_dim == 'index':
+                    x, y = "value", "index"
+                plot["title"] = f"{name} Scatter Plot"
+                
+            elif data.ndim == 2:
+                # For 2D data, get the selected dimensions
+                try:
+                    x_idx = int(x_dim)
+                    y_idx = int(y_dim)
                     
-            elif plot_type == "heatmap":
-                if data.ndim == 1:
-                    data = data.reshape(-1, 1)
-                    im = ax.imshow(data, aspect="auto", cmap="viridis")
-                elif data.ndim == 2:
-                    # Sample if too large
-                    if data.shape[0] > 1000 or data.shape[1] > 1000:
-                        rows = min(1000, data.shape[0])
-                        cols = min(1000, data.shape[1])
-                        row_indices = np.linspace(0, data.shape[0]-1, rows, dtype=int)
-                        col_indices = np.linspace(0, data.shape[1]-1, cols, dtype=int)
-                        data_sample = data[np.ix_(row_indices, col_indices)]
-                        im = ax.imshow(data_sample, aspect="auto", cmap="viridis")
-                        ax.set_title(f"{self.current_array_name} Heatmap (Sampled)")
-                    else:
-                        im = ax.imshow(data, aspect="auto", cmap="viridis")
-                        ax.set_title(f"{self.current_array_name} Heatmap")
-                    self.fig.colorbar(im, ax=ax)
-                else:
-                    # For higher dimensions, reshape to 2D
-                    if data.size > 1000000:
-                        flat_data = data.flatten()[:1000000]
-                        side = int(np.sqrt(flat_data.size))
-                        reshaped_data = flat_data[:side*side].reshape(side, side)
-                    else:
-                        flat_data = data.flatten()
-                        side = int(np.sqrt(flat_data.size))
-                        reshaped_data = flat_data[:side*side].reshape(side, side)
-                    im = ax.imshow(reshaped_data, aspect="auto", cmap="viridis")
-                    self.fig.colorbar(im, ax=ax)
-                    ax.set_title(f"{self.current_array_name} Heatmap (Reshaped)")
+                    # Check if indices are valid
+                    if x_idx < 0 or x_idx >= data.shape[1] or y_idx < 0 or y_idx >= data.shape[1]:
+                        raise ValueError(f"Invalid indices: x={x_idx}, y={y_idx} for shape {data.shape}")
                     
-            elif plot_type == "scatter":
-                if data.ndim == 1:
-                    # For 1D data, use index vs value or value vs index
-                    if self.x_dim.get() == 'index' and self.y_dim.get() == 'value':
-                        ax.scatter(range(len(data)), data, alpha=0.5)
-                    elif self.x_dim.get() == 'value' and self.y_dim.get() == 'index':
-                        ax.scatter(data, range(len(data)), alpha=0.5)
-                    else:
-                        # Default to index vs value
-                        ax.scatter(range(len(data)), data, alpha=0.5)
-                    ax.set_title(f"{self.current_array_name} Scatter Plot")
+                    x, y = x_idx, y_idx
+                    plot["title"] = f"{name} Scatter (Dim {x_idx} vs {y_idx})"
                     
-                elif data.ndim == 2:
-                    # For 2D data, get the selected dimensions
-                    try:
-                        x_idx = int(self.x_dim.get())
-                        y_idx = int(self.y_dim.get())
-                        
-                        # Check if indices are valid
-                        if x_idx < 0 or x_idx >= data.shape[1] or y_idx < 0 or y_idx >= data.shape[1]:
-                            raise ValueError(f"Invalid indices: x={x_idx}, y={y_idx} for shape {data.shape}")
-                        
-                        # Sample if too many points
-                        if data.shape[0] > 10000:
-                            indices = np.random.choice(data.shape[0], size=10000, replace=False)
-                            ax.scatter(data[indices, x_idx], data[indices, y_idx], alpha=0.5)
-                            ax.set_title(f"{self.current_array_name} Scatter (Dim {x_idx} vs {y_idx}, Sampled)")
-                        else:
-                            ax.scatter(data[:, x_idx], data[:, y_idx], alpha=0.5)
-                            ax.set_title(f"{self.current_array_name} Scatter (Dim {x_idx} vs {y_idx})")
-                        
-                        # Add dimension labels to axes
-                        ax.set_xlabel(f"Dimension {x_idx}")
-                        ax.set_ylabel(f"Dimension {y_idx}")
-                        
-                    except ValueError as e:
-                        # Handle case where dimensions are not valid integers
-                        flat_data = data.flatten()
-                        ax.scatter(range(len(flat_data)), flat_data, alpha=0.5)
-                        ax.set_title(f"{self.current_array_name} Scatter Plot (Flattened)")
-                        print(f"Error with dimensions: {str(e)}")
-                        
-                else:
-                    # For higher dimensions, flatten and create sequence vs. value scatter
-                    if data.size > 10000:
-                        indices = np.random.choice(data.size, size=10000, replace=False)
-                        flat_data = data.flat[indices]
-                        ax.scatter(range(len(flat_data)), flat_data, alpha=0.5)
-                        ax.set_title(f"{self.current_array_name} Scatter Plot (Sampled)")
-                    else:
-                        flat_data = data.flatten()
-                        ax.scatter(range(len(flat_data)), flat_data, alpha=0.5)
-                        ax.set_title(f"{self.current_array_name} Scatter Plot (Flattened)")
-            
-            self.canvas.draw()
+                    # Add dimension labels to axes
+                    plot["xlabel"] = f"Dimension {x_idx}"
+                    plot["ylabel"] = f"Dimension {y_idx}"
+                    
+                except ValueError as e:
+                    # Handle case where dimensions are not valid integers
+                    plot["title"] = f"{name} Scatter Plot (Flattened)"
+                    print(f"Error with dimensions: {str(e)}")
+                    
+            else:
+                plot["title"] = f"{name} Scatter Plot (Flattened)"
             
+            # Every point is binned into a count grid at screen resolution;
+            # the points themselves are kept only when there are few
+            total = max(1, data.shape[0] if fields is not None or {x, y} - {"index", "value"}
+                        else data.size)
+            bounds = point_bounds(point_chunks(data, x, y),
+                                  progress=lambda n: task.progress(0.5 * n / total))
+            plot["density"] = density_grid(point_chunks(data, x, y), *bounds,
+                                           (options["height"], width),
+                                           progress=lambda n: task.progress(0.5 + 0.5 * n / total))
+            plot["source"] = (data, x, y)
+        
+        if selection is not None:
+            plot["title"] += f" [{selection.text}]"
+        return plot
+    
+    def draw_plot(self, plot):
+        """Render a plot description produced by prepare_plot, updating the
+        plot on screen in place when it has the same layout"""
+        self.tasks.cancel("decimate")
+        self.tasks.cancel("tiles")
+        self.tasks.cancel("density")
+        
+        try:
+            if self.plot_view.begin(self.plot_layout(plot)):
+                self.update_plot(plot)
+            else:
+                self.line_sources = []
+                self.heatmap = None
+                self.scatter_density = None
+                self.create_plot(plot)
         except Exception as e:
-            print(f"Error plotting: {str(e)}")
-            ax.text(0.5, 0.5, f"Error plotting: {str(e)}", 
-                   ha='center', va='center', transform=ax.transAxes)
-            self.canvas.draw()
+            self.draw_plot_error(e)
+    
+    @staticmethod
+    def plot_layout(plot):
+        """What must match for a plot to reuse the axes and artists of the
+        one on screen"""
+        kind = plot["kind"]
+        if kind == "histogram":
+            if "fields" in plot:
+                fields = tuple(field for field, _, _ in plot["fields"])
+                return kind, plot["log"], plot["fields"][0][1].size, fields
+            return kind, plot["log"], plot["counts"].size, None
+        if kind == "line":
+            return kind, tuple(label for _, label, _ in plot["series"])
+        if kind == "heatmap":
+            return kind, plot["colorbar"], "xlabel" in plot
+        return kind, "xlabel" in plot
+    
+    def create_plot(self, plot):
+        """Build the axes and artists of a new plot"""
+        view = self.plot_view
+        kind = plot["kind"]
+        
+        if kind == "histogram" and "fields" in plot:
+            # Small multiples, one per field of a structured array
+            n = len(plot["fields"])
+            cols = int(np.ceil(np.sqrt(n)))
+            rows = int(np.ceil(n / cols))
+            view.artists["bars"] = []
+            for i, (field, counts, edges) in enumerate(plot["fields"]):
+                ax = self.fig.add_subplot(rows, cols, i + 1)
+                _, _, bars = ax.hist(edges[:-1], bins=edges, weights=counts, log=plot["log"])
+                view.artists["bars"].append((ax, bars))
+                ax.set_title(field, fontsize="small")
+            self.fig.suptitle(plot["title"])
+            self.fig.tight_layout()
+            view.redraw()
+            return
+        
+        ax = self.fig.add_subplot(111)
+        view.artists["axes"] = ax
+        dynamic = []
+        
+        if kind == "histogram":
+            edges = plot["edges"]
+            _, _, bars = ax.hist(edges[:-1], bins=edges, weights=plot["counts"], log=plot["log"])
+            view.artists["bars"] = [(ax, bars)]
+            
+        elif kind == "line":
+            for values, label, (x, y) in plot["series"]:
+                line, = ax.plot(x, y, label=label)
+                self.line_sources.append((line, values))
+            legend = ax.legend() if plot["series"][0][1] is not None else None
+            # Settle autoscaling first so only user zooms trigger a resample
+            ax.get_xlim()
+            ax.callbacks.connect("xlim_changed", self.on_line_xlim_changed)
+            # The y axis follows the data, so it is redrawn with the lines
+            dynamic = [line for line, _ in self.line_sources] + [ax.yaxis, legend]
+                
+        elif kind == "heatmap":
+            im = ax.imshow(plot["image"], aspect="auto", cmap="viridis",
+                           interpolation="nearest", extent=self.image_extent(plot["bounds"]))
+            self.heatmap = (im, plot["pyramid"], plot["tile_stat"])
+            # Fix the limits so only user pans and zooms fetch tiles
+            ax.get_xlim()
+            ax.set_autoscale_on(False)
+            ax.callbacks.connect("xlim_changed", self.on_heatmap_view_changed)
+            ax.callbacks.connect("ylim_changed", self.on_heatmap_view_changed)
+            colorbar = self.fig.colorbar(im, ax=ax) if plot["colorbar"] else None
+            dynamic = [im, colorbar.ax if colorbar is not None else None]
+                
+        elif kind == "scatter":
+            grid = plot["density"]
+            im = ax.imshow(np.ma.masked_equal(grid.counts, 0), origin="lower", aspect="auto",
+                           cmap="viridis", norm=LogNorm(vmin=1), interpolation="nearest",
+                           extent=grid.extent)
+            markers = ax.scatter([], [], alpha=0.5)
+            self.scatter_density = (im, markers, plot["source"])
+            self.show_density(grid)
+            colorbar = self.fig.colorbar(im, ax=ax, label="Points per pixel")
+            # Fix the limits so only user pans and zooms re-aggregate
+            ax.set_xlim(grid.x_range)
+            ax.set_ylim(grid.y_range)
+            ax.set_autoscale_on(False)
+            ax.callbacks.connect("xlim_changed", self.on_scatter_view_changed)
+            ax.callbacks.connect("ylim_changed", self.on_scatter_view_changed)
+            dynamic = [im, markers, colorbar.ax]
+        
+        if "xlabel" in plot:
+            ax.set_xlabel(plot["xlabel"])
+            ax.set_ylabel(plot["ylabel"])
+        ax.set_title(plot["title"])
+        if dynamic:
+            # Spines are drawn over the data, and the title names the slice
+            view.set_dynamic(dynamic + list(ax.spines.values()) + [ax.title])
+        view.redraw()
+    
+    def update_plot(self, plot):
+        """Show a plot with the layout of the one on screen by replacing the
+        data of its artists; only a change of the static axes redraws the
+        whole figure"""
+        view = self.plot_view
+        kind = plot["kind"]
+        
+        if kind == "histogram":
+            fields = plot["fields"] if "fields" in plot else [(None, plot["counts"], plot["edges"])]
+            for (ax, bars), (_, counts, edges) in zip(view.artists["bars"], fields):
+                for bar, left, width, count in zip(bars, edges[:-1], np.diff(edges), counts):
+                    bar.set_x(left)
+                    bar.set_width(width)
+                    bar.set_height(count)
+                ax.relim()
+                ax.autoscale_view()
+            if "fields" in plot:
+                self.fig.suptitle(plot["title"])
+            else:
+                ax.set_title(plot["title"])
+            view.update(full=True)
+            return
+        
+        ax = view.artists["axes"]
+        limits = (ax.get_xlim(), ax.get_ylim())
+        labels = (ax.get_xlabel(), ax.get_ylabel())
+        
+        if kind == "line":
+            previous, self.line_sources = self.line_sources, []
+            for (line, _), (values, _, (x, y)) in zip(previous, plot["series"]):
+                line.set_data(x, y)
+                self.line_sources.append((line, values))
+            with ax.callbacks.blocked(signal="xlim_changed"):
+                ax.set_autoscale_on(True)
+                ax.relim()
+                ax.autoscale_view()
+            # The y axis is redrawn with the lines, so only x matters
+            limits = limits[:1]
+                
+        elif kind == "heatmap":
+            im = self.heatmap[0]
+            self.heatmap = (im, plot["pyramid"], plot["tile_stat"])
+            extent = self.image_extent(plot["bounds"])
+            im.set_data(plot["image"])
+            im.set_extent(extent)
+            im.autoscale()
+            with ax.callbacks.blocked(signal="xlim_changed"), \
+                    ax.callbacks.blocked(signal="ylim_changed"):
+                ax.set_xlim(extent[0], extent[1])
+                ax.set_ylim(extent[2], extent[3])
+                
+        elif kind == "scatter":
+            im, markers, _ = self.scatter_density
+            self.scatter_density = (im, markers, plot["source"])
+            grid = plot["density"]
+            # As imshow would: the color bar spans the new counts even
+            # when the points are shown as markers
+            im.set_data(np.ma.masked_equal(grid.counts, 0))
+            im.set_extent(grid.extent)
+            im.norm.vmax = None
+            im.autoscale_None()
+            self.show_density(grid)
+            with ax.callbacks.blocked(signal="xlim_changed"), \
+                    ax.callbacks.blocked(signal="ylim_changed"):
+                ax.set_xlim(grid.x_range)
+                ax.set_ylim(grid.y_range)
+        
+        if "xlabel" in plot:
+            ax.set_xlabel(plot["xlabel"])
+            ax.set_ylabel(plot["ylabel"])
+        ax.set_title(plot["title"])
+        moved = limits != (ax.get_xlim(), ax.get_ylim())[:len(limits)]
+        view.update(full=moved or labels != (ax.get_xlabel(), ax.get_ylabel()))
+    
+    def on_line_xlim_changed(self, ax):
+        """Re-decimate line plot series for the new visible x range"""
+        if not self.line_sources:
+            return
+        
+        x0, x1 = ax.get_xlim()
+        start, stop = int(np.floor(x0)), int(np.ceil(x1)) + 1
+        width = self.canvas.get_tk_widget().winfo_width()
+        sources = list(self.line_sources)
+        
+        def decimate(task):
+            resampled = []
+            for line, values in sources:
+                task.check()
+                resampled.append((line, minmax_decimate(values, width, start, stop)))
+            return resampled
+        
+        def done(resampled):
+            for line, (x, y) in resampled:
+                line.set_data(x, y)
+            self.plot_view.update()
+        
+        self.run_task("decimate", decimate, on_done=done, message="Resampling line plot")
+    
+    @staticmethod
+    def image_extent(bounds):
+        """imshow extent placing native rows/columns at integer coordinates"""
+        r0, r1, c0, c1 = bounds
+        return (c0 - 0.5, c1 - 0.5, r1 - 0.5, r0 - 0.5)
+    
+    def on_heatmap_view_changed(self, ax):
+        """Fetch heatmap tiles for the new visible region"""
+        if self.heatmap is None:
+            return
+        
+        im, pyramid, stat = self.heatmap
+        x0, x1 = sorted(ax.get_xlim())
+        y0, y1 = sorted(ax.get_ylim())
+        r0, r1 = int(np.floor(y0 + 0.5)), int(np.ceil(y1 + 0.5))
+        c0, c1 = int(np.floor(x0 + 0.5)), int(np.ceil(x1 + 0.5))
+        bbox = ax.get_window_extent()
+        height, width = int(bbox.height), int(bbox.width)
+        
+        def fetch(task):
+            return pyramid.viewport(r0, r1, c0, c1, height, width, stat, task.check)
+        
+        def done(result):
+            image, bounds = result
+            im.set_data(image)
+            im.set_extent(self.image_extent(bounds))
+            self.plot_view.update()
+        
+        self.run_task("tiles", fetch, on_done=done, message="Loading heatmap tiles")
+    
+    def show_density(self, grid):
+        """Show a density grid of the scatter plot, or its points as
+        markers when there are few enough"""
+        im, markers, _ = self.scatter_density
+        if grid.points is not None:
+            markers.set_offsets(np.column_stack(grid.points))
+        else:
+            counts = grid.counts
+            im.set_data(np.ma.masked_equal(counts, 0))
+            im.set_extent(grid.extent)
+            im.set_clim(1, max(2, counts.max()))
+        markers.set_visible(grid.points is not None)
+        im.set_visible(grid.points is None)
+    
+    def on_scatter_view_changed(self, ax):
+        """Re-aggregate the scatter plot points inside the new view"""
+        if self.scatter_density is None:
+            return
+        
+        data, x, y = self.scatter_density[2]
+        x_range = sorted(ax.get_xlim())
+        y_range = sorted(ax.get_ylim())
+        bbox = ax.get_window_extent()
+        shape = (int(bbox.height), int(bbox.width))
+        total = max(1, data.shape[0] if {x, y} - {"index", "value"} else data.size)
+        
+        def aggregate(task):
+            return density_grid(point_chunks(data, x, y), x_range, y_range, shape,
+                                progress=lambda n: task.progress(n / total))
+        
+        def done(grid):
+            self.show_density(grid)
+            self.plot_view.update()
+        
+        self.run_task("density", aggregate, on_done=done, message="Aggregating scatter plot")
+    
+    def draw_plot_error(self, error):
+        print(f"Error plotting: {str(error)}")
+        self.line_sources = []
+        self.heatmap = None
+        self.scatter_density = None
+        self.plot_view.reset()
+        ax = self.fig.add_subplot(111)
+        ax.text(0.5, 0.5, f"Error plotting: {str(error)}", 
+               ha='center', va='center', transform=ax.transAxes)
+        self.plot_view.redraw()
     
     def show_data_table(self):
         """Opens a new window with a full table view of the data"""
@@ -433,13 +1531,19 @@ class NPZViewer:
         main_frame = ttk.Frame(self.data_table_window)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
-        # Create toolbar with pagination controls and info
+        # Create toolbar with shape info and row navigation
         toolbar = ttk.Frame(main_frame)
         toolbar.pack(fill=tk.X, pady=(0, 10))
         
         data = self.current_array
         shape_info = f"Shape: {data.shape} | "
-        if data.ndim == 1:
+        if self.selection is not None:
+            # Only the filtered rows, gathered as the table scrolls to them
+            shape_info += f"Filter: {self.selection.text} | " \
+                          f"Rows: {len(self.selection):,} of {self.selection.n_rows:,}"
+            data = self.selection.view(data)
+            self.data_table_window.title(f"Data Table - {self.current_array_name} (filtered)")
+        elif data.ndim == 1:
             shape_info += f"Elements: {data.size}"
         elif data.ndim == 2:
             shape_info += f"Rows: {data.shape[0]}, Columns: {data.shape[1]}"
@@ -448,77 +1552,26 @@ class NPZViewer:
             
         ttk.Label(toolbar, text=shape_info).pack(side=tk.LEFT, padx=5)
         
-        # Page controls
-        page_frame = ttk.Frame(toolbar)
-        page_frame.pack(side=tk.RIGHT)
+        if self.slice_reader is not None and self.selection is None:
+            # N-D arrays can also be browsed one navigator slice at a time
+            self.table_slice = tk.BooleanVar(value=False)
+            ttk.Checkbutton(toolbar, text="Current slice only", variable=self.table_slice,
+                            command=self.toggle_table_slice).pack(side=tk.LEFT, padx=5)
         
-        ttk.Label(page_frame, text="Page:").pack(side=tk.LEFT)
-        self.page_var = tk.IntVar(value=1)
+        # Jump to row
+        goto_frame = ttk.Frame(toolbar)
+        goto_frame.pack(side=tk.RIGHT)
         
-        # Calculate total pages based on the data shape
-        if data.ndim == 1:
-            rows_per_page = 50
-            self.total_pages = max(1, (data.size + rows_per_page - 1) // rows_per_page)
-        elif data.ndim == 2:
-            rows_per_page = 50
-            self.total_pages = max(1, (data.shape[0] + rows_per_page - 1) // rows_per_page)
-        else:
-            # For higher dims, flatten and paginate
-            rows_per_page = 50
-            self.total_pages = max(1, (data.size + rows_per_page - 1) // rows_per_page)
-            
-        # Page controls
-        ttk.Button(page_frame, text="<", width=2, 
-                  command=lambda: self.change_page(-1)).pack(side=tk.LEFT)
-        
-        self.page_spinbox = ttk.Spinbox(
-            page_frame, 
-            from_=1, 
-            to=self.total_pages, 
-            width=5,
-            textvariable=self.page_var,
-            command=lambda: self.update_table_view()
-        )
-        self.page_spinbox.pack(side=tk.LEFT, padx=5)
-        self.page_spinbox.bind("<Return>", lambda e: self.update_table_view())
+        ttk.Label(goto_frame, text="Go to row:").pack(side=tk.LEFT)
+        self.goto_var = tk.StringVar(value="0")
+        goto_entry = ttk.Entry(goto_frame, textvariable=self.goto_var, width=12)
+        goto_entry.pack(side=tk.LEFT, padx=5)
+        goto_entry.bind("<Return>", lambda e: self.goto_table_row())
         
-        ttk.Label(page_frame, text=f"of {self.total_pages}").pack(side=tk.LEFT)
-        
-        ttk.Button(page_frame, text=">", width=2,
-                  command=lambda: self.change_page(1)).pack(side=tk.LEFT)
-        
-        # Create the treeview for data display
-        columns = []
-        if data.ndim == 1:
-            columns = ["Index", "Value"]
-        elif data.ndim == 2:
-            columns = ["Row"] + [f"Col {i}" for i in range(min(20, data.shape[1]))]
-        else:
-            columns = ["Index", "Value"]  # For flattened view
-            
-        # Create Treeview with scrollbars
-        tree_frame = ttk.Frame(main_frame)
-        tree_frame.pack(fill=tk.BOTH, expand=True)
-            
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
-        
-        # Configure scrollbars
-        vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=self.tree.xview)
-        self.tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
-        
-        # Grid layout for treeview and scrollbars
-        self.tree.grid(column=0, row=0, sticky='nsew')
-        vsb.grid(column=1, row=0, sticky='ns')
-        hsb.grid(column=0, row=1, sticky='ew')
-        
-        tree_frame.grid_columnconfigure(0, weight=1)
-        tree_frame.grid_rowconfigure(0, weight=1)
-        
-        # Configure columns
-        for col in columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, anchor="center", width=80)
+        # Virtual grid: only the visible cells are fetched and drawn
+        self.table_model = TableModel(data)
+        self.grid_view = VirtualGrid(main_frame, self.table_model)
+        self.grid_view.pack(fill=tk.BOTH, expand=True)
             
         # Add "Export to CSV" button
         export_frame = ttk.Frame(main_frame)
@@ -526,111 +1579,98 @@ class NPZViewer:
         ttk.Button(export_frame, text="Export to CSV", 
                    command=self.export_to_csv).pack(side=tk.RIGHT)
         
-        # Populate the table
-        self.update_table_view()
-        
-    def update_table_view(self):
-        """Update the table with current page data"""
-        if not hasattr(self, 'tree') or self.current_array is None:
-            return
-            
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Get current page
-        page = self.page_var.get()
-        if page < 1:
-            page = 1
-        elif page > self.total_pages:
-            page = self.total_pages
-            
-        self.page_var.set(page)
-        
-        # Get data for the current page
-        data = self.current_array
-        rows_per_page = 50
-        
-        if data.ndim == 1:
-            start_idx = (page - 1) * rows_per_page
-            end_idx = min(start_idx + rows_per_page, data.size)
-            
-            for i in range(start_idx, end_idx):
-                self.tree.insert("", "end", values=(i, data[i]))
-                
-        elif data.ndim == 2:
-            start_row = (page - 1) * rows_per_page
-            end_row = min(start_row + rows_per_page, data.shape[0])
-            
-            max_cols = min(20, data.shape[1])  # Limit columns display
-            
-            for row in range(start_row, end_row):
-                row_data = [row]
-                for col in range(max_cols):
-                    row_data.append(data[row, col])
-                self.tree.insert("", "end", values=tuple(row_data))
-                
+    def toggle_table_slice(self):
+        """Switch the data table between the whole array and the current slice"""
+        if self.table_slice.get():
+            data = self.slice_reader.read(*self.slice_view())
         else:
-            # Flattened view for higher dimensions
-            flat_data = data.flatten()
-            start_idx = (page - 1) * rows_per_page
-            end_idx = min(start_idx + rows_per_page, flat_data.size)
-            
-            for i in range(start_idx, end_idx):
-                self.tree.insert("", "end", values=(i, flat_data[i]))
-    
-    def change_page(self, delta):
-        """Change the current page by delta amount"""
-        new_page = self.page_var.get() + delta
-        if 1 <= new_page <= self.total_pages:
-            self.page_var.set(new_page)
-            self.update_table_view()
+            data = self.current_array
+        self.table_model = TableModel(data)
+        self.grid_view.set_model(self.table_model)
+    
+    def goto_table_row(self):
+        """Scroll the data table to the row typed in the Go to row box"""
+        try:
+            row = int(self.goto_var.get())
+        except ValueError:
+            return
+        self.grid_view.goto_row(row)
             
     def export_to_csv(self):
         """Export the current array to CSV file"""
+        self.export_current("csv")
+    
+    def export_current(self, fmt):
+        """Export the current array in one of the EXPORT_FORMATS"""
         if self.current_array is None:
             return
             
+        label, pattern = self.EXPORT_FILETYPES[fmt]
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-            initialfile=f"{self.current_array_name}.csv"
+            defaultextension=f".{fmt}",
+            filetypes=[(label, pattern), ("All files", "*.*")],
+            initialfile=f"{self.current_array_name}.{fmt}"
         )
         
         if not file_path:
             return
             
-        try:
-            data = self.current_array
-            
-            with open(file_path, "w", newline='') as f:
-                # Write header
-                if data.ndim == 1:
-                    f.write("Index,Value\n")
-                    for i in range(data.size):
-                        f.write(f"{i},{data[i]}\n")
-                        
-                elif data.ndim == 2:
-                    # Header row
-                    header = "Row," + ",".join(f"Col{i}" for i in range(data.shape[1]))
-                    f.write(header + "\n")
-                    
-                    # Data rows
-                    for i in range(data.shape[0]):
-                        row = f"{i}," + ",".join(str(data[i, j]) for j in range(data.shape[1]))
-                        f.write(row + "\n")
-                        
-                else:
-                    # Flattened view for higher dimensions
-                    f.write("Index,Value\n")
-                    flat_data = data.flatten()
-                    for i in range(flat_data.size):
-                        f.write(f"{i},{flat_data[i]}\n")
-                        
-            tk.messagebox.showinfo("Export Complete", f"Data exported to {file_path}")
-            
-        except Exception as e:
-            tk.messagebox.showerror("Export Error", f"Error exporting data: {str(e)}")
+        # Formatting and writing run on a worker; progress and the Cancel
+        # button are in the status bar
+        def export(task, archive, name, data):
+            return export_member(
+                archive, name, file_path, fmt, data=data,
+                progress=lambda done, total: task.progress(done / max(1, total),
+                                                           f"Exporting {name}: {done:,} of {total:,}"))
+        
+        def done(result):
+            tk.messagebox.showinfo(
+                "Export Complete",
+                f"Data exported to {file_path}\n\n"
+                f"{result.rows:,} rows, {result.nbytes:,} bytes in {result.seconds:.2f} s "
+                f"({result.rows_per_sec:,.0f} rows/sec)")
+        
+        self.run_task("export", export, self.npz_data, self.current_array_name, self.current_array,
+                      on_done=done,
+                      on_error=lambda e: tk.messagebox.showerror("Export Error", f"Error exporting data: {str(e)}"),
+                      message=f"Exporting {self.current_array_name}")
+    
+    def export_all(self, fmt):
+        """Export every array of the open archive into a folder, concurrently"""
+        if self.npz_data is None:
+            return
+        
+        out_dir = filedialog.askdirectory(title="Export all arrays to folder")
+        if not out_dir:
+            return
+        
+        def export(task, archive):
+            started = time.perf_counter()
+            results = export_archive(
+                archive, out_dir, fmt,
+                progress=lambda done, total: task.progress(done / max(1, total),
+                                                           f"Exported {done} of {total} arrays"))
+            return results, time.perf_counter() - started
+        
+        def done(result):
+            results, seconds = result
+            failed = {name: e for name, e in results.items() if isinstance(e, Exception)}
+            exported = [r for name, r in results.items() if name not in failed]
+            total_bytes = sum(r.nbytes for r in exported)
+            message = (f"{len(exported)} arrays exported to {out_dir}\n\n"
+                       f"{total_bytes:,} bytes in {seconds:.2f} s "
+                       f"({total_bytes / max(seconds, 1e-9) / 1e6:,.1f} MB/s)")
+            if failed:
+                message += "\n\nNot exported:\n" + "\n".join(
+                    f"{name}: {str(e)}" for name, e in failed.items())
+                tk.messagebox.showwarning("Export Incomplete", message)
+            else:
+                tk.messagebox.showinfo("Export Complete", message)
+        
+        self.run_task("export", export, self.npz_data,
+                      on_done=done,
+                      on_error=lambda e: tk.messagebox.showerror("Export Error", f"Error exporting data: {str(e)}"),
+                      message="Exporting all arrays")
     
     def show_readme(self):
         # Get the README path - works with PyInstaller bundled files
@@ -661,7 +1701,14 @@ class NPZViewer:
             tk.messagebox.showerror("Error", "README file not found")
 
 
-if __name__ == "__main__":
+def main(file_path=None):
     root = tk.Tk()
     app = NPZViewer(root)
+    if file_path:
+        app.open_archive(file_path)
     root.mainloop()
+    app.tasks.shutdown()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
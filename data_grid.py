@@ -0,0 +1,172 @@
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+
+
+class VirtualGrid(ttk.Frame):
+    """Scrollable grid that only draws the cells in view.
+
+    Cells come from a TableModel on demand, so the grid handles arrays of
+    any height and width: a fixed pool of canvas text items is reused and
+    only their text changes as the view scrolls.
+    """
+
+    def __init__(self, master, model, col_width=90, label_width=110):
+        super().__init__(master)
+        self.model = model
+        self.col_width = col_width
+        self.label_width = label_width
+
+        font = tkfont.nametofont("TkDefaultFont")
+        self.row_height = font.metrics("linespace") + 6
+
+        self.first_row = 0
+        self.first_col = 0
+        self.visible_rows = 0
+        self.visible_cols = 0
+        self._items = []          # pool of cell text items, one list per visible row
+        self._row_items = []      # row label items
+        self._col_items = []      # column header items
+
+        self.canvas = tk.Canvas(self, background="white", highlightthickness=0)
+        self.vsb = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.hsb = ttk.Scrollbar(self, orient="horizontal", command=self.xview)
+
+        self.canvas.grid(column=0, row=0, sticky='nsew')
+        self.vsb.grid(column=1, row=0, sticky='ns')
+        self.hsb.grid(column=0, row=1, sticky='ew')
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_shift_mousewheel)
+        self.canvas.bind("<Button-4>", lambda e: self.scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda e: self.scroll_rows(3))
+        self.canvas.bind("<Shift-Button-4>", lambda e: self.scroll_cols(-1))
+        self.canvas.bind("<Shift-Button-5>", lambda e: self.scroll_cols(1))
+        self.canvas.bind("<Up>", lambda e: self.scroll_rows(-1))
+        self.canvas.bind("<Down>", lambda e: self.scroll_rows(1))
+        self.canvas.bind("<Left>", lambda e: self.scroll_cols(-1))
+        self.canvas.bind("<Right>", lambda e: self.scroll_cols(1))
+        self.canvas.bind("<Prior>", lambda e: self.scroll_rows(-self.page_rows()))
+        self.canvas.bind("<Next>", lambda e: self.scroll_rows(self.page_rows()))
+        self.canvas.bind("<Home>", lambda e: self.goto_row(0))
+        self.canvas.bind("<End>", lambda e: self.goto_row(self.model.n_rows))
+        self.canvas.bind("<Button-1>", lambda e: self.canvas.focus_set())
+
+    def set_model(self, model):
+        """Show another model, scrolled back to its first cell"""
+        self.model = model
+        self.first_row = 0
+        self.first_col = 0
+        self.refresh()
+
+    def page_rows(self):
+        return max(1, self.visible_rows - 1)
+
+    def on_resize(self, event=None):
+        """Rebuild the item pool to fit the canvas"""
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        rows = max(1, height // self.row_height - 1)
+        cols = max(1, (width - self.label_width) // self.col_width + 1)
+
+        self.canvas.delete("all")
+        self.visible_rows = rows
+        self.visible_cols = cols
+
+        # Header row and label column backgrounds
+        self.canvas.create_rectangle(0, 0, width, self.row_height, fill="#e8e8e8", outline="")
+        self.canvas.create_rectangle(0, 0, self.label_width, height, fill="#e8e8e8", outline="")
+
+        y0 = self.row_height
+        x0 = self.label_width
+        self._col_items = [
+            self.canvas.create_text(x0 + (j + 0.5) * self.col_width, self.row_height / 2,
+                                    anchor="center", font="TkHeadingFont")
+            for j in range(cols)
+        ]
+        self._row_items = [
+            self.canvas.create_text(self.label_width / 2, y0 + (i + 0.5) * self.row_height,
+                                    anchor="center")
+            for i in range(rows)
+        ]
+        self._items = [
+            [self.canvas.create_text(x0 + (j + 0.5) * self.col_width,
+                                     y0 + (i + 0.5) * self.row_height, anchor="center")
+             for j in range(cols)]
+            for i in range(rows)
+        ]
+        self.refresh()
+
+    def refresh(self):
+        """Fill the item pool with the cells currently in view"""
+        model = self.model
+        self.first_row = max(0, min(self.first_row, model.n_rows - self.visible_rows))
+        self.first_col = max(0, min(self.first_col, model.n_cols - self.visible_cols + 1))
+
+        for j, item in enumerate(self._col_items):
+            col = self.first_col + j
+            self.canvas.itemconfigure(item, text=model.column_label(col) if col < model.n_cols else "")
+
+        for i, row_items in enumerate(self._items):
+            row = self.first_row + i
+            in_range = row < model.n_rows
+            self.canvas.itemconfigure(self._row_items[i], text=model.row_label(row) if in_range else "")
+            for j, item in enumerate(row_items):
+                col = self.first_col + j
+                text = model.cell(row, col) if in_range and col < model.n_cols else ""
+                self.canvas.itemconfigure(item, text=text)
+
+        self.update_scrollbars()
+
+    def update_scrollbars(self):
+        n_rows = max(1, self.model.n_rows)
+        n_cols = max(1, self.model.n_cols)
+        self.vsb.set(self.first_row / n_rows,
+                     min(1.0, (self.first_row + self.visible_rows) / n_rows))
+        # The last column is usually only partly visible
+        self.hsb.set(self.first_col / n_cols,
+                     min(1.0, (self.first_col + self.visible_cols - 1) / n_cols))
+
+    def yview(self, *args):
+        self.first_row = self._scroll_target(args, self.first_row, self.model.n_rows,
+                                             self.visible_rows)
+        self.refresh()
+
+    def xview(self, *args):
+        self.first_col = self._scroll_target(args, self.first_col, self.model.n_cols,
+                                             self.visible_cols - 1)
+        self.refresh()
+
+    @staticmethod
+    def _scroll_target(args, first, total, visible):
+        """Translate scrollbar 'moveto'/'scroll' commands into a first index"""
+        if args[0] == "moveto":
+            return int(float(args[1]) * total)
+        amount = int(args[1])
+        if args[2] == "pages":
+            amount *= max(1, visible - 1)
+        return first + amount
+
+    def scroll_rows(self, delta):
+        self.first_row += delta
+        self.refresh()
+
+    def scroll_cols(self, delta):
+        self.first_col += delta
+        self.refresh()
+
+    def goto_row(self, row):
+        self.first_row = row
+        self.refresh()
+
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_rows(-3 * step)
+
+    def on_shift_mousewheel(self, event):
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll_cols(-step)
@@ -0,0 +1,48 @@
+"""
+Data engine behind the NPZ File Viewer.
+
+Nothing in this package imports tkinter or matplotlib, so it can be used
+from scripts and batch jobs as well as from the GUI. The names below are
+imported from their submodules on first use, so a command that only
+reads the index does not pay for the rest of the engine.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "MODE_EAGER": "archive",
+    "MODE_MMAP": "archive",
+    "NPZArchive": "archive",
+    "chunk_elements": "archive",
+    "ArrayCache": "arraycache",
+    "ConcatArchive": "concat",
+    "ArchiveIndex": "index",
+    "MemberInfo": "index",
+    "build_index": "index",
+    "load_index": "index",
+    "QueryError": "query",
+    "Selection": "query",
+    "filter_rows": "query",
+    "ArrayStats": "stats",
+    "StatsCache": "stats",
+    "compute_stats": "stats",
+    "member_stats": "stats",
+    "MemberStream": "stream",
+    "span": "trace",
+    "tracer": "trace",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
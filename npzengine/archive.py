@@ -0,0 +1,146 @@
+"""
+Array access for .npz archives.
+
+Members stored without compression (np.savez) are exposed as read-only
+views over a memory map of the archive, so only the pages that are read
+are ever loaded. Compressed members (np.savez_compressed) are decoded
+into memory as np.load would do, and kept in an ArrayCache, or streamed
+in bounded blocks through iter_chunks and read_flat (which read from the
+decoded array instead when it is cached).
+"""
+
+import threading
+import zipfile
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from .arraycache import ArrayCache, default_array_cache
+from .index import DEFAULT_CACHE_DIR, load_index
+from .stream import MemberStream
+from .trace import span
+
+MODE_MMAP = "mmap"
+MODE_EAGER = "eager"
+
+DEFAULT_CHUNK_BYTES = 8 << 20
+
+
+def chunk_elements(dtype, chunk_bytes=DEFAULT_CHUNK_BYTES):
+    """Number of elements of dtype that fit in chunk_bytes"""
+    return max(1, chunk_bytes // max(1, np.dtype(dtype).itemsize))
+
+
+class NPZArchive:
+    """Read-only access to the arrays of an .npz file, built on its index"""
+
+    def __init__(self, path, index=None, cache_dir=DEFAULT_CACHE_DIR,
+                 array_cache=default_array_cache):
+        self.index = index if index is not None else load_index(path, cache_dir)
+        self.path = self.index.path
+        self.array_cache = array_cache
+        self._zip = None
+        self._streams = {}
+        self._streams_lock = threading.Lock()
+
+    @property
+    def files(self):
+        return self.index.files
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        info = self.index[name]
+        if self.access_mode(name) == MODE_MMAP:
+            return self._map_member(info)
+        if self.array_cache is None:
+            return self._read_member(info)
+        return self.array_cache.get_or_load(ArrayCache.key(self, name),
+                                            lambda: self._read_member(info))
+
+    def access_mode(self, name):
+        """MODE_MMAP if the member can be mapped zero-copy, else MODE_EAGER"""
+        info = self.index[name]
+        if info.compressed or info.dtype.hasobject or info.size == 0:
+            return MODE_EAGER
+        return MODE_MMAP
+
+    def _map_member(self, info):
+        mm = np.memmap(self.path, dtype=info.dtype, mode="r",
+                       offset=info.data_offset, shape=info.shape,
+                       order="F" if info.fortran_order else "C")
+        # A plain ndarray view keeps the mapping alive through .base without
+        # the memmap subclass leaking into the results of reductions
+        return mm.view(np.ndarray)
+
+    def _read_member(self, info):
+        with self._streams_lock:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+        with span("archive.decode", nbytes=info.compressed_size, member=info.name), \
+                self._zip.open(info.member) as fp:
+            return npy_format.read_array(fp, allow_pickle=False)
+
+    def _can_stream(self, info):
+        return info.compress_type == zipfile.ZIP_DEFLATED and not info.dtype.hasobject
+
+    def stream(self, name):
+        """Shared MemberStream for a compressed member, so its checkpoint
+        index is reused across reads"""
+        with self._streams_lock:
+            stream = self._streams.get(name)
+            if stream is None:
+                stream = MemberStream(self.path, self.index[name])
+                self._streams[name] = stream
+            return stream
+
+    def _flat_view(self, name):
+        info = self.index[name]
+        return self[name].reshape(-1, order="F" if info.fortran_order else "C")
+
+    def _should_stream(self, name):
+        """True to inflate a member block by block rather than use the array"""
+        info = self.index[name]
+        if self.access_mode(name) != MODE_EAGER or not self._can_stream(info):
+            return False
+        return (self.array_cache is None
+                or self.array_cache.peek(ArrayCache.key(self, name)) is None)
+
+    def read_flat(self, name, start, count):
+        """Elements [start, start + count) of a member in storage order"""
+        if self._should_stream(name):
+            return self.stream(name).read_elements(start, count)
+        return self._flat_view(name)[start:start + count]
+
+    def iter_chunks(self, name, chunk_elems=None, start=0, stop=None):
+        """Yield (offset, 1D array) blocks of a member in storage order.
+
+        Memory-mapped members yield views, compressed members are inflated
+        block by block so memory use is bounded by chunk_elems.
+        """
+        info = self.index[name]
+        if chunk_elems is None:
+            chunk_elems = chunk_elements(info.dtype)
+        if self._should_stream(name):
+            yield from self.stream(name).iter_chunks(chunk_elems, start, stop)
+            return
+        flat = self._flat_view(name)
+        stop = flat.size if stop is None else min(stop, flat.size)
+        for offset in range(start, stop, chunk_elems):
+            yield offset, flat[offset:min(offset + chunk_elems, stop)]
+
+    def close(self):
+        with self._streams_lock:
+            for stream in self._streams.values():
+                stream.close()
+            self._streams.clear()
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,103 @@
+"""
+In-memory cache of decoded arrays.
+
+Compressed members have to be inflated completely before they can be
+used as arrays, so re-selecting a member would repeat the whole
+decompression. ArrayCache keeps recently decoded arrays up to a byte
+budget and evicts the least recently used ones beyond it, which makes
+flipping between recent members instant while keeping the memory held
+by the cache predictable. Cached arrays are shared, so they are made
+read-only.
+
+Memory-mapped members cost no memory of their own and are not cached.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_ARRAY_CACHE_BYTES = 1 << 30
+
+
+class ArrayCache:
+    """Size-aware LRU cache of arrays with hit/miss counters"""
+
+    def __init__(self, max_bytes=DEFAULT_ARRAY_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(archive, name):
+        index = archive.index
+        return (index.path, index.mtime_ns, index.file_size, name)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def peek(self, key):
+        """The cached array for key, or None, without counting a lookup"""
+        with self._lock:
+            return self._entries.get(key)
+
+    def get(self, key):
+        with self._lock:
+            array = self._entries.get(key)
+            if array is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return array
+
+    def put(self, key, array):
+        """Cache an array, unless it alone exceeds the budget"""
+        with self._lock:
+            if array.nbytes > self.max_bytes:
+                return
+            array.flags.writeable = False
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = array
+            self.nbytes += array.nbytes
+            self._evict()
+
+    def get_or_load(self, key, load):
+        """The cached array for key, calling load() to decode it on a miss"""
+        array = self.get(key)
+        if array is None:
+            array = load()
+            self.put(key, array)
+        return array
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes and self._entries:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def resize(self, max_bytes):
+        """Change the budget, evicting arrays that no longer fit"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+default_array_cache = ArrayCache()
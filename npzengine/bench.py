@@ -0,0 +1,471 @@
+"""
+Reproducible performance benchmarks of the engine.
+
+    python -m npzengine.bench --size 2GB --out before.json
+    python -m npzengine.bench --size 2GB --out after.json --compare before.json
+
+Synthetic archives are generated from a seed, in a stored (np.savez) and
+a compressed (np.savez_compressed) variant, with a 1D float64 signal, a
+float32 feature matrix, an int16 image, a uint8 volume, a table of
+records and any number of small members. Members are written block by
+block straight into the zip file, so archives of tens of GB can be made
+without holding them in memory; an archive with the same parameters is
+reused by later runs.
+
+Each operation behind a viewer action (indexing, loading, statistics,
+histograms, line decimation, table pages, heatmap tiles, scatter
+density, slices and export) is timed headlessly with every cache turned
+off. The JSON report gives latency percentiles, throughput in MB/s and
+rows/s, and peak resident memory per operation; --compare reports the
+operations whose median latency regressed against an earlier report.
+
+Archives smaller than RAM are read from the page cache after the first
+run, so timings are warm-cache numbers unless the archives exceed RAM.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+BENCH_VERSION = 1
+
+DEFAULT_BENCH_DIR = os.path.join(tempfile.gettempdir(), "npzview-bench")
+BLOCK_BYTES = 8 << 20
+
+RECORD_DTYPE = np.dtype([("x", "f8"), ("y", "f8"), ("z", "f4"), ("value", "f4"), ("id", "i8")])
+
+# Large members: name, share of the archive size, dtype
+LAYOUT = (
+    ("signal", 0.30, np.dtype(np.float64)),
+    ("features", 0.25, np.dtype(np.float32)),
+    ("image", 0.15, np.dtype(np.int16)),
+    ("volume", 0.10, np.dtype(np.uint8)),
+    ("records", 0.20, RECORD_DTYPE),
+)
+FEATURE_COLUMNS = 8
+VOLUME_SIDE = 64
+SMALL_MEMBER_SIZE = 1000
+
+OPS = ("index", "load", "stats", "histogram", "decimate", "table", "heatmap",
+       "density", "slice", "export")
+
+_UNITS = {"": 1, "B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30, "TB": 1 << 40}
+
+
+def parse_size(text):
+    """Bytes in a size such as "512MB" or "20GB" (binary units)"""
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?B?)\s*", text.upper())
+    if match is None:
+        raise ValueError(f"Not a size: {text!r}")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def member_shapes(size_bytes, members=0):
+    """{name: (shape, dtype)} of the members of a synthetic archive"""
+    shapes = {}
+    for name, share, dtype in LAYOUT:
+        budget = max(1, int(size_bytes * share) // dtype.itemsize)
+        if name == "features":
+            shape = (max(1, budget // FEATURE_COLUMNS), FEATURE_COLUMNS)
+        elif name == "image":
+            side = max(1, int(np.sqrt(budget)))
+            shape = (side, side)
+        elif name == "volume":
+            shape = (max(1, budget // VOLUME_SIDE ** 2), VOLUME_SIDE, VOLUME_SIDE)
+        else:
+            shape = (budget,)
+        shapes[name] = (shape, dtype)
+    for i in range(members):
+        shapes[f"small_{i:04d}"] = ((SMALL_MEMBER_SIZE,), np.dtype(np.float64))
+    return shapes
+
+
+def _block(name, shape, dtype, start, stop, rng):
+    """Rows [start, stop) of a synthetic member"""
+    n = stop - start
+    if name == "signal" or name.startswith("small_"):
+        t = np.arange(start, stop, dtype=np.float64)
+        return np.sin(t / 5000.0) + 0.1 * rng.standard_normal(n)
+    if name == "features":
+        scale = np.arange(1, FEATURE_COLUMNS + 1, dtype=np.float32)
+        return rng.standard_normal((n, FEATURE_COLUMNS), dtype=np.float32) * scale
+    if name == "image":
+        rows = np.arange(start, stop)[:, np.newaxis] // 16
+        cols = np.arange(shape[1])[np.newaxis, :] // 16
+        return ((rows + cols) % 512 + rng.integers(0, 8, (n, shape[1]))).astype(dtype)
+    if name == "volume":
+        return rng.integers(0, 16, (n,) + shape[1:], dtype=np.uint8)
+    block = np.empty(n, dtype)
+    block["x"] = rng.random(n)
+    block["y"] = rng.standard_normal(n)
+    block["z"] = rng.random(n, dtype=np.float32)
+    block["value"] = rng.standard_normal(n, dtype=np.float32)
+    block["id"] = np.arange(start, stop)
+    return block
+
+
+def _write_member(zf, name, shape, dtype, compressed, seed, index):
+    info = zipfile.ZipInfo(name + ".npy", date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    row_bytes = max(1, nbytes // max(1, shape[0]))
+    block_rows = max(1, BLOCK_BYTES // row_bytes)
+    with zf.open(info, "w", force_zip64=nbytes >= zipfile.ZIP64_LIMIT - (1 << 20)) as f:
+        npy_format.write_array_header_1_0(
+            f, {"descr": npy_format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+        for block_index, start in enumerate(range(0, shape[0], block_rows)):
+            # One generator per block, so the data does not depend on timing
+            rng = np.random.default_rng([seed, index, block_index])
+            block = _block(name, shape, dtype, start, min(start + block_rows, shape[0]), rng)
+            f.write(np.ascontiguousarray(block, dtype=dtype).tobytes())
+
+
+def generate_archive(path, size_bytes, compressed=False, members=0, seed=0,
+                     compresslevel=6, progress=None):
+    """Write a synthetic archive of about size_bytes of array data.
+
+    progress, if given, is called with (members_written, member_count).
+    """
+    shapes = member_shapes(size_bytes, members)
+    tmp_path = path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", allowZip64=True, compresslevel=compresslevel) as zf:
+        for i, (name, (shape, dtype)) in enumerate(shapes.items()):
+            _write_member(zf, name, shape, dtype, compressed, seed, i)
+            if progress is not None:
+                progress(i + 1, len(shapes))
+    os.replace(tmp_path, path)
+    return path
+
+
+def archive_path(bench_dir, size_bytes, variant, members, seed):
+    return os.path.join(bench_dir, f"bench-{size_bytes}-{variant}-{members}m-s{seed}.npz")
+
+
+def _read_status(field):
+    """A memory figure of this process from /proc/self/status, in bytes"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    # Linux resets the high-water mark on writing 5 to clear_refs
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss():
+    peak = _read_status("VmHWM")
+    if peak is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    return peak
+
+
+def measure(op, member, fn, samples, nbytes=None, rows=None):
+    """Call fn samples times and summarise the latencies.
+
+    nbytes and rows are the work done by one call, for throughput.
+    """
+    gc.collect()
+    _reset_peak_rss()
+    rss_before = _read_status("VmRSS")
+    seconds = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - started)
+    peak = _peak_rss()
+
+    p50, p90, p99 = (float(p) for p in np.percentile(seconds, [50, 90, 99]))
+    result = {
+        "op": op,
+        "member": member,
+        "samples": samples,
+        "p50": p50,
+        "p90": p90,
+        "p99": p99,
+        "mean": float(np.mean(seconds)),
+        "min": float(np.min(seconds)),
+        "bytes": nbytes,
+        "rows": rows,
+        "mb_per_s": nbytes / p50 / 1e6 if nbytes and p50 > 0 else None,
+        "rows_per_s": rows / p50 if rows and p50 > 0 else None,
+        "peak_rss_bytes": peak,
+        "rss_growth_bytes": None if peak is None or rss_before is None else peak - rss_before,
+    }
+    return result
+
+
+def run_benchmarks(path, ops=OPS, repeats=3, workers=None, work_dir=None, progress=None):
+    """Time the engine operations on one archive; returns result dicts.
+
+    progress, if given, is called with the name of each operation as it
+    starts.
+    """
+    from .archive import NPZArchive
+    from .decimate import minmax_decimate
+    from .density import density_grid, point_bounds, point_chunks
+    from .export import export_member
+    from .histogram import member_histogram
+    from .index import build_index, load_index
+    from .pyramid import TilePyramid
+    from .slicing import SliceReader
+    from .stats import member_field_stats, member_stats
+    from .table import TableModel
+
+    work_dir = work_dir or tempfile.mkdtemp(prefix="npzview-bench-")
+    os.makedirs(work_dir, exist_ok=True)
+    index = build_index(path)
+    # No decoded array, statistics, histogram or tile outlives one call
+    archive = NPZArchive(path, index=index, array_cache=None)
+    big = [name for name, _, _ in LAYOUT]
+    rng = np.random.default_rng(0)
+    results = []
+
+    def step(op):
+        if op not in ops:
+            return False
+        if progress is not None:
+            progress(op)
+        return True
+
+    # Arrays are loaded outside the timed calls of the operations that
+    # work on loaded arrays, as the viewer does
+    arrays = {}
+
+    def loaded(name):
+        if name not in arrays:
+            arrays[name] = archive[name]
+        return arrays[name]
+
+    if step("index"):
+        results.append(measure("index", "cold", lambda: build_index(path), repeats,
+                               rows=len(index)))
+        cache_dir = os.path.join(work_dir, "index-cache")
+        load_index(path, cache_dir)
+        results.append(measure("index", "warm", lambda: load_index(path, cache_dir), repeats,
+                               rows=len(index)))
+
+    if step("load"):
+        for name in big:
+            info = index[name]
+            results.append(measure("load", name, lambda name=name: archive[name], repeats,
+                                   info.nbytes, info.shape[0]))
+
+    if step("stats"):
+        for name in big:
+            info = index[name]
+            if info.dtype.names is not None:
+                fn = lambda name=name: member_field_stats(archive, name, workers, cache=None)
+            else:
+                fn = lambda name=name: member_stats(archive, name, workers, cache=None)
+            results.append(measure("stats", name, fn, repeats, info.nbytes, info.shape[0]))
+
+    if step("histogram"):
+        for name, field in (("signal", None), ("features", None), ("records", "value")):
+            info = index[name]
+            results.append(measure(
+                "histogram", name if field is None else f"{name}.{field}",
+                lambda name=name, field=field: member_histogram(archive, name, 100, workers=workers,
+                                                                cache=None, stats_cache=None,
+                                                                field=field),
+                repeats, info.nbytes, info.shape[0]))
+
+    if step("decimate"):
+        signal = loaded("signal")
+        results.append(measure("decimate", "signal", lambda: minmax_decimate(signal, 2000),
+                               repeats, signal.nbytes, signal.shape[0]))
+
+    if step("table"):
+        # Random pages, each from a fresh model so no block is cached
+        for name in ("features", "records", "volume"):
+            data = loaded(name)
+            model = TableModel(data)
+            pages = iter(rng.integers(0, max(1, model.n_rows // model.BLOCK_ROWS), 10 * repeats))
+            page = lambda data=data, pages=pages: TableModel(data).block(int(next(pages)), 0)
+            cells = model.BLOCK_ROWS * min(model.n_cols, model.BLOCK_COLS)
+            results.append(measure("table", name, page, 10 * repeats,
+                                   cells * data.dtype.itemsize, TableModel.BLOCK_ROWS))
+
+    if step("heatmap"):
+        image = loaded("image")
+        overview = lambda: TilePyramid(image).viewport(0, image.shape[0], 0, image.shape[1],
+                                                        800, 1000)
+        results.append(measure("heatmap", "image", overview, repeats, image.nbytes, image.shape[0]))
+
+    if step("density"):
+        features = loaded("features")
+
+        def scatter():
+            bounds = point_bounds(point_chunks(features, 0, 1), workers)
+            density_grid(point_chunks(features, 0, 1), *bounds, (800, 1000), workers)
+        results.append(measure("density", "features", scatter, repeats,
+                               features.shape[0] * 2 * features.dtype.itemsize, features.shape[0]))
+
+    if step("slice"):
+        volume = loaded("volume")
+        reader = SliceReader(archive, "volume", data=volume, cache_slices=1)
+        indices = iter(rng.integers(0, volume.shape[0], 10 * repeats))
+        results.append(measure(
+            "slice", "volume", lambda: reader.read(1, 2, [int(next(indices)), 0, 0]),
+            10 * repeats, VOLUME_SIDE ** 2 * volume.dtype.itemsize, VOLUME_SIDE))
+
+    if step("export"):
+        for name, fmt in (("features", "csv"), ("records", "csv"), ("records", "npy")):
+            info = index[name]
+            out = os.path.join(work_dir, f"{name}.{fmt}")
+            results.append(measure(
+                "export", f"{name}.{fmt}",
+                lambda name=name, fmt=fmt, out=out: export_member(archive, name, out, fmt,
+                                                                  workers=workers),
+                repeats, info.nbytes, info.shape[0]))
+            os.remove(out)
+
+    archive.close()
+    return results
+
+
+def compare(old, new, threshold=0.1):
+    """[(variant, op, member, old p50, new p50, ratio)] of operations in
+    both reports, and the subset slower by more than threshold"""
+    def keyed(report):
+        return {(r["variant"], r["op"], r["member"]): r for r in report["results"]}
+
+    before, after = keyed(old), keyed(new)
+    rows = []
+    for key in after:
+        if key in before:
+            p_old, p_new = before[key]["p50"], after[key]["p50"]
+            rows.append(key + (p_old, p_new, p_new / p_old if p_old > 0 else float("inf")))
+    regressions = [row for row in rows if row[-1] > 1 + threshold]
+    return rows, regressions
+
+
+def _format_rate(value):
+    return "" if value is None else f"{value:,.0f}"
+
+
+def print_summary(report, out=sys.stderr):
+    out.write(f"{'variant':<11}{'op':<10}{'member':<18}{'p50 ms':>10}{'p99 ms':>10}"
+              f"{'MB/s':>12}{'rows/s':>16}{'peak RSS MB':>13}\n")
+    for r in report["results"]:
+        peak = "" if r["peak_rss_bytes"] is None else f"{r['peak_rss_bytes'] / 2**20:,.0f}"
+        out.write(f"{r['variant']:<11}{r['op']:<10}{r['member']:<18}{r['p50'] * 1e3:>10.2f}"
+                  f"{r['p99'] * 1e3:>10.2f}{_format_rate(r['mb_per_s']):>12}"
+                  f"{_format_rate(r['rows_per_s']):>16}{peak:>13}\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m npzengine.bench",
+                                     description="Benchmark the viewer's engine on synthetic archives")
+    parser.add_argument("--size", default="256MB", help="array data per archive, e.g. 512MB or 20GB")
+    parser.add_argument("--variants", default="stored,compressed",
+                        help="comma-separated: stored (np.savez), compressed (np.savez_compressed)")
+    parser.add_argument("--members", type=int, default=100, help="number of small extra members")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compresslevel", type=int, default=6)
+    parser.add_argument("--dir", default=DEFAULT_BENCH_DIR, help="where archives are kept")
+    parser.add_argument("--regenerate", action="store_true", help="rewrite existing archives")
+    parser.add_argument("--ops", default=",".join(OPS), help="comma-separated operations to time")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None, help="worker threads per operation")
+    parser.add_argument("--out", default=None, help="write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", default=None, metavar="REPORT",
+                        help="report regressions against an earlier JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="median slowdown counted as a regression (default 0.1 = 10%%)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    size = parse_size(args.size)
+    ops = [op.strip() for op in args.ops.split(",") if op.strip()]
+    unknown = set(ops) - set(OPS)
+    if unknown:
+        raise SystemExit(f"Unknown operations: {', '.join(sorted(unknown))}")
+    os.makedirs(args.dir, exist_ok=True)
+
+    report = {
+        "version": BENCH_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {"size": size, "members": args.members, "seed": args.seed,
+                   "compresslevel": args.compresslevel, "repeats": args.repeats,
+                   "threads": args.threads, "ops": ops},
+        "archives": {},
+        "results": [],
+    }
+    for variant in [v.strip() for v in args.variants.split(",") if v.strip()]:
+        if variant not in ("stored", "compressed"):
+            raise SystemExit(f"Unknown variant {variant!r}")
+        path = archive_path(args.dir, size, variant, args.members, args.seed)
+        if args.regenerate or not os.path.exists(path):
+            started = time.perf_counter()
+            generate_archive(path, size, variant == "compressed", args.members, args.seed,
+                             args.compresslevel,
+                             progress=lambda done, total: sys.stderr.write(
+                                 f"\rGenerating {os.path.basename(path)}: {done}/{total} members"))
+            sys.stderr.write(f" ({time.perf_counter() - started:.1f} s)\n")
+        report["archives"][variant] = {"path": path, "file_size": os.path.getsize(path)}
+
+        with tempfile.TemporaryDirectory(prefix="npzview-bench-") as work_dir:
+            results = run_benchmarks(path, ops, args.repeats, args.threads, work_dir,
+                                     progress=lambda op: sys.stderr.write(f"{variant}: {op}\n"))
+        for result in results:
+            result["variant"] = variant
+            report["results"].append(result)
+
+    print_summary(report)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        changed = [key for key in ("size", "members", "seed", "compresslevel")
+                   if old.get("params", {}).get(key) != report["params"][key]]
+        if changed:
+            sys.stderr.write(f"Warning: the reports differ in {', '.join(changed)}\n")
+        rows, regressions = compare(old, report, args.threshold)
+        for variant, op, member, p_old, p_new, ratio in rows:
+            flag = "  REGRESSION" if ratio > 1 + args.threshold else ""
+            sys.stderr.write(f"{variant:<11}{op:<10}{member:<18}{p_old * 1e3:>10.2f} ms -> "
+                             f"{p_new * 1e3:>10.2f} ms  x{ratio:.2f}{flag}\n")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
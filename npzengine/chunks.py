@@ -0,0 +1,53 @@
+"""
+Block iteration and thread-pool mapping shared by the chunked engines.
+
+Statistics, histograms, density grids, filters and exports all walk an
+array a block at a time and reduce the blocks on a thread pool (NumPy
+releases the GIL in the heavy loops). c_order_blocks yields the blocks
+without flattening the array; map_chunks runs the reductions with at
+most two blocks per worker in flight, so streamed sources are never read
+far ahead of the work.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def c_order_blocks(data, block_elems):
+    """Consecutive C-order blocks of data without flattening it"""
+    # Lazy array-likes (concat.ConcatArray) flatten into a lazy view
+    if not isinstance(data, np.ndarray) or data.flags.c_contiguous:
+        flat = data.reshape(-1)
+        for start in range(0, flat.size, block_elems):
+            yield flat[start:start + block_elems]
+        return
+    for start in range(0, data.size, block_elems):
+        stop = min(start + block_elems, data.size)
+        yield data[np.unravel_index(np.arange(start, stop), data.shape)]
+
+
+def map_chunks(fn, chunks, workers, combine):
+    """Apply fn to every chunk (a tuple of arguments) on a pool, passing
+    results to combine in order"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            combine(fn(*chunk))
+        return
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(fn, *chunk))
+                if len(pending) >= 2 * workers:
+                    combine(pending.popleft().result())
+            while pending:
+                combine(pending.popleft().result())
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
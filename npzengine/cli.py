@@ -0,0 +1,221 @@
+"""
+npzview: command line access to the viewer's engine.
+
+    npzview ls ARCHIVE...                 members with shape, dtype and sizes
+    npzview info ARCHIVE... [-m NAME]     full header and storage details
+    npzview stats ARCHIVE... [-m NAME]    min/max/mean/std and NaN/Inf counts
+    npzview head ARCHIVE... [-m NAME]     leading values of each member
+    npzview filter ARCHIVE... -w EXPR     rows matching a filter, e.g. "col[3] > 5"
+    npzview export ARCHIVE... -o DIR      write members as csv/npy/parquet/...
+    npzview gui [ARCHIVE]                 open the viewer window
+
+Results are printed as JSON, one document per invocation. Several
+archives are processed in parallel on a process pool (--jobs). Only the
+modules a command needs are imported, and tkinter/matplotlib only for
+"gui", so inspecting an archive starts quickly.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+
+def _members(index, names):
+    if not names:
+        return list(index.files)
+    missing = [name for name in names if name not in index]
+    if missing:
+        raise KeyError(f"No member(s) {', '.join(missing)} in {index.path}")
+    return names
+
+
+def _member_summary(info):
+    return {
+        "name": info.name,
+        "shape": list(info.shape),
+        "dtype": str(info.dtype),
+        "nbytes": info.nbytes,
+        "compressed_size": info.compressed_size,
+        "storage": "deflate" if info.compressed else "stored",
+    }
+
+
+def cmd_ls(path, args):
+    from .index import load_index
+    index = load_index(path)
+    return {"archive": index.path, "members": [_member_summary(index[name])
+                                               for name in _members(index, args["member"])]}
+
+
+def cmd_info(path, args):
+    from .archive import NPZArchive
+    archive = NPZArchive(path)
+    index = archive.index
+    members = []
+    for name in _members(index, args["member"]):
+        info = index[name].to_dict()
+        info["access"] = archive.access_mode(name)
+        members.append(info)
+    return {"archive": index.path, "file_size": index.file_size,
+            "mtime_ns": index.mtime_ns, "members": members}
+
+
+def cmd_stats(path, args):
+    from .archive import NPZArchive
+    from .stats import member_field_stats, member_stats
+    with NPZArchive(path) as archive:
+        members = {}
+        for name in _members(archive.index, args["member"]):
+            if archive.index[name].dtype.names is not None:
+                # Structured members are summarised field by field
+                fields = member_field_stats(archive, name, workers=args["threads"])
+                members[name] = {field: None if stats is None else stats.to_dict()
+                                 for field, stats in fields.items()}
+                continue
+            stats = member_stats(archive, name, workers=args["threads"])
+            members[name] = None if stats is None else stats.to_dict()
+    return {"archive": archive.path, "stats": members}
+
+
+def cmd_head(path, args):
+    from .archive import NPZArchive
+    from .preview import member_head
+    n = args["rows"]
+    with NPZArchive(path) as archive:
+        members = {}
+        for name in _members(archive.index, args["member"]):
+            # The first n entries along every axis; compressed members
+            # are inflated only as far as the last of them
+            members[name] = member_head(archive, name, n).tolist()
+    return {"archive": archive.path, "head": members}
+
+
+def cmd_filter(path, args):
+    from .archive import NPZArchive
+    from .query import QueryError, filter_rows
+    n = args["rows"]
+    with NPZArchive(path) as archive:
+        members = {}
+        for name in _members(archive.index, args["member"]):
+            # Compressed members are inflated and filtered chunk by chunk
+            try:
+                selection = filter_rows(archive, name, args["where"], workers=args["threads"])
+            except QueryError as e:
+                members[name] = {"error": str(e)}
+                continue
+            members[name] = {"matches": len(selection), "rows": selection.n_rows,
+                             "first": selection.rows[:n].tolist()}
+    return {"archive": archive.path, "filter": args["where"], "members": members}
+
+
+def cmd_export(path, args):
+    from .archive import NPZArchive
+    from .export import export_archive
+    out_dir = args["out"]
+    if args["subdirs"]:
+        out_dir = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0])
+    with NPZArchive(path) as archive:
+        results = export_archive(archive, out_dir, args["format"],
+                                 names=_members(archive.index, args["member"]),
+                                 workers=args["threads"])
+    # A member that failed is reported like a failed archive
+    return {"archive": archive.path,
+            "exports": {name: {"error": f"{type(result).__name__}: {result}"}
+                        if isinstance(result, Exception) else result.to_dict()
+                        for name, result in results.items()}}
+
+
+COMMANDS = {
+    "ls": cmd_ls,
+    "info": cmd_info,
+    "stats": cmd_stats,
+    "head": cmd_head,
+    "filter": cmd_filter,
+    "export": cmd_export,
+}
+
+
+def _run(command, path, args):
+    """Run one command on one archive; errors are reported, not raised,
+    so one bad archive does not stop a batch"""
+    try:
+        return COMMANDS[command](path, args)
+    except Exception as e:
+        return {"archive": os.path.abspath(path), "error": f"{type(e).__name__}: {e}"}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="npzview", description="Inspect and export .npz archives")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for command, help_text in (("ls", "list members"),
+                               ("info", "show header and storage details"),
+                               ("stats", "compute member statistics"),
+                               ("head", "print the leading values of members"),
+                               ("filter", "find the rows of members that match a filter"),
+                               ("export", "export members to files")):
+        p = sub.add_parser(command, help=help_text)
+        p.add_argument("archives", nargs="+", metavar="ARCHIVE")
+        p.add_argument("-m", "--member", action="append", default=[],
+                       help="only this member (repeatable)")
+        p.add_argument("-j", "--jobs", type=int, default=None,
+                       help="archives processed in parallel (default: CPU count)")
+        p.add_argument("--threads", type=int, default=None,
+                       help="worker threads per archive")
+        p.add_argument("--indent", type=int, default=None, help="indent the JSON output")
+        if command == "head":
+            p.add_argument("-n", "--rows", type=int, default=10)
+        if command == "filter":
+            p.add_argument("-w", "--where", required=True,
+                           help='filter expression, e.g. "col[3] > 5 and isnan(col[1])"')
+            p.add_argument("-n", "--rows", type=int, default=10,
+                           help="matching row numbers to print")
+        if command == "export":
+            p.add_argument("-o", "--out", required=True, help="output directory")
+            p.add_argument("-f", "--format", default="npy",
+                           choices=("csv", "csv.gz", "csv.zst", "npy", "parquet"))
+            p.add_argument("--subdirs", action="store_true",
+                           help="one subdirectory per archive (default when exporting several)")
+
+    p = sub.add_parser("gui", help="open the viewer window")
+    p.add_argument("archive", nargs="?", default=None)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "gui":
+        # The only command that needs tkinter and matplotlib
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import ReadData
+        ReadData.main(args.archive)
+        return 0
+
+    options = {
+        "member": args.member,
+        "threads": args.threads,
+        "rows": getattr(args, "rows", None),
+        "where": getattr(args, "where", None),
+        "out": getattr(args, "out", None),
+        "format": getattr(args, "format", None),
+        "subdirs": getattr(args, "subdirs", False) or len(args.archives) > 1,
+    }
+    jobs = min(len(args.archives), args.jobs or os.cpu_count() or 1)
+    if jobs <= 1:
+        results = [_run(args.command, path, options) for path in args.archives]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_run, [args.command] * len(args.archives),
+                                    args.archives, [options] * len(args.archives)))
+
+    output = results[0] if len(results) == 1 else results
+    json.dump(output, sys.stdout, indent=args.indent, default=str)
+    sys.stdout.write("\n")
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
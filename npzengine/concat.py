@@ -0,0 +1,302 @@
+"""
+Virtual concatenation of one member across sharded archives.
+
+Datasets are often split into many archives holding the same member,
+e.g. one file per run or per day. ConcatArchive presents that member as
+a single array concatenated along axis 0 without reading any payload:
+the combined shape and the row offset of every shard come from the
+indexes (zip directories and .npy headers) alone.
+
+Indexing a ConcatArray reads only the shards that overlap the requested
+rows, so the table, line plots and slices work on datasets far larger
+than memory. Statistics are computed per shard, in parallel and cached
+per shard, then merged (see stats.member_stats), so adding a shard only
+costs that shard's pass.
+"""
+
+import json
+import os
+import zipfile
+import zlib
+
+import numpy as np
+
+from .archive import MODE_MMAP, NPZArchive, chunk_elements
+from .arraycache import default_array_cache
+from .index import DEFAULT_CACHE_DIR, ArchiveIndex, MemberInfo
+
+
+class ConcatArray:
+    """Read-only array-like of parts concatenated along axis 0.
+
+    Parts are produced on demand by loader callables, so only the parts
+    an index touches are read. Supports integer, slice and integer/boolean
+    array indexing on axis 0, with any NumPy index on the other axes, and
+    field names of structured arrays.
+    """
+
+    def __init__(self, loaders, lengths, trailing_shape, dtype):
+        self._loaders = list(loaders)
+        self.offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+        self.shape = (int(self.offsets[-1]),) + tuple(trailing_shape)
+        self.dtype = np.dtype(dtype)
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"ConcatArray(shape={self.shape}, dtype={self.dtype}, parts={len(self._loaders)})"
+
+    def part(self, i):
+        return self._loaders[i]()
+
+    def locate(self, rows):
+        """Part number of each row"""
+        return np.searchsorted(self.offsets, rows, side="right") - 1
+
+    def _empty(self, rest):
+        return np.empty((0,) + self.shape[1:], self.dtype)[(slice(None),) + rest]
+
+    def _expand(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        ellipsis = [i for i, k in enumerate(key) if k is Ellipsis]
+        if ellipsis:
+            i = ellipsis[0]
+            n_real = sum(1 for k in key if k is not None and k is not Ellipsis)
+            key = key[:i] + (slice(None),) * (self.ndim - n_real) + key[i + 1:]
+        if not key:
+            key = (slice(None),)
+        if key[0] is None:
+            raise IndexError("ConcatArray cannot insert an axis before axis 0")
+        return key
+
+    def field(self, name):
+        """Lazy view of one field of a structured array"""
+        dtype = self.dtype[name]
+        return ConcatArray([lambda load=load: load()[name] for load in self._loaders],
+                           np.diff(self.offsets), self.shape[1:] + dtype.shape, dtype.base)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.field(key)
+        key = self._expand(key)
+        first, rest = key[0], key[1:]
+        n = self.shape[0]
+
+        if isinstance(first, (int, np.integer)):
+            row = int(first) + n if first < 0 else int(first)
+            if not 0 <= row < n:
+                raise IndexError(f"index {first} is out of bounds for axis 0 with size {n}")
+            i = int(self.locate(row))
+            return self.part(i)[(row - int(self.offsets[i]),) + rest]
+
+        if isinstance(first, slice):
+            start, stop, step = first.indices(n)
+            if step == 1:
+                return self._read_rows(start, stop, rest)
+            first = np.arange(start, stop, step)
+
+        return self._take_rows(first, rest)
+
+    def _read_rows(self, start, stop, rest):
+        pieces = []
+        if start < stop:
+            for i in range(int(self.locate(start)), len(self._loaders)):
+                lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+                if lo >= stop:
+                    break
+                if hi > lo:
+                    pieces.append(self.part(i)[(slice(max(start, lo) - lo, min(stop, hi) - lo),) + rest])
+        if not pieces:
+            return self._empty(rest)
+        return pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+
+    def _take_rows(self, first, rest):
+        rows = np.asarray(first)
+        n = self.shape[0]
+        if rows.dtype == bool:
+            if rows.shape != (n,):
+                raise IndexError(f"boolean index of shape {rows.shape} does not match axis 0 of size {n}")
+            rows = np.flatnonzero(rows)
+        if rows.dtype.kind not in "iu":
+            raise IndexError(f"ConcatArray cannot index axis 0 with {rows.dtype} values")
+
+        # Index arrays on the other axes broadcast with the rows; the
+        # broadcast dimensions come first in the result, as in NumPy
+        advanced = [j for j, k in enumerate(rest) if isinstance(k, (list, np.ndarray))]
+        broadcast = np.broadcast_arrays(rows, *[np.asarray(rest[j]) for j in advanced])
+        shape = broadcast[0].shape
+        rows = broadcast[0].reshape(-1).astype(np.int64)
+        rows = np.where(rows < 0, rows + n, rows)
+        if rows.size and (rows.min() < 0 or rows.max() >= n):
+            raise IndexError(f"index out of bounds for axis 0 with size {n}")
+        others = dict(zip(advanced, (b.reshape(-1) for b in broadcast[1:])))
+
+        parts = self.locate(rows)
+        pieces, positions = [], []
+        for i in np.unique(parts):
+            sel = np.flatnonzero(parts == i)
+            sub = tuple(others[j][sel] if j in others else k for j, k in enumerate(rest))
+            pieces.append(self.part(int(i))[(rows[sel] - self.offsets[i],) + sub])
+            positions.append(sel)
+        if not pieces:
+            sub = tuple(np.zeros(0, np.intp) if j in others else k for j, k in enumerate(rest))
+            values = np.empty((1,) + self.shape[1:], self.dtype)[(np.zeros(0, np.intp),) + sub]
+            return values.reshape(shape + values.shape[1:])
+
+        gathered = np.concatenate(pieces)
+        values = np.empty_like(gathered)
+        values[np.concatenate(positions)] = gathered
+        return values.reshape(shape + values.shape[1:])
+
+    def reshape(self, *shape):
+        """Reshape along the leading axis: shape must be (-1, ...) with
+        trailing dimensions that divide every part evenly. The result is
+        again lazy, with each part reshaped in C order."""
+        if len(shape) == 1 and isinstance(shape[0], tuple):
+            shape = shape[0]
+        if not shape or shape[0] != -1 or -1 in shape[1:]:
+            raise ValueError(f"ConcatArray can only be reshaped to (-1, ...), not {shape}")
+        trailing = tuple(int(d) for d in shape[1:])
+        row_size = int(np.prod(trailing, dtype=np.int64))
+        part_size = int(np.prod(self.shape[1:], dtype=np.int64))
+        lengths = np.diff(self.offsets) * part_size
+        if row_size == 0 or np.any(lengths % row_size):
+            raise ValueError(f"Cannot reshape parts of {self.shape} into {shape}")
+        loaders = [lambda load=load: load().reshape((-1,) + trailing) for load in self._loaders]
+        return ConcatArray(loaders, lengths // row_size, trailing, self.dtype)
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+
+class ConcatArchive:
+    """Archive-like view of one member concatenated across archives.
+
+    The member's shards must agree in dtype and in every dimension but
+    the first. The view has the archive interface the viewer and the
+    engine use (index, files, item access, iter_chunks); shards(name)
+    lists the underlying (archive, name) pairs.
+    """
+
+    def __init__(self, paths, name, indexes=None, cache_dir=DEFAULT_CACHE_DIR,
+                 array_cache=default_array_cache):
+        if not paths:
+            raise ValueError("No archives to concatenate")
+        indexes = indexes or {}
+        self.name = name
+        self.archives = [NPZArchive(path, index=indexes.get(path), cache_dir=cache_dir,
+                                    array_cache=array_cache) for path in paths]
+        self._views = {}   # shard number -> memory-mapped view
+
+        infos = []
+        for archive in self.archives:
+            if name not in archive.index:
+                raise KeyError(f"No member {name!r} in {archive.path}")
+            infos.append(archive.index[name])
+        first = infos[0]
+        if first.ndim == 0:
+            raise ValueError(f"{name!r} is a scalar and cannot be concatenated")
+        for archive, info in zip(self.archives, infos):
+            if info.dtype != first.dtype or info.shape[1:] != first.shape[1:]:
+                raise ValueError(f"{name!r} in {archive.path} is {info.dtype} {info.shape}, "
+                                 f"expected {first.dtype} (n, {', '.join(map(str, first.shape[1:]))})")
+
+        # Any change to any shard changes the virtual member's crc, so
+        # derived results cached for the view are never stale
+        ident = [[a.path, a.index.mtime_ns, a.index.file_size, info.crc]
+                 for a, info in zip(self.archives, infos)]
+        crc = zlib.crc32(json.dumps(ident).encode("utf-8"))
+        rows = sum(info.shape[0] for info in infos)
+        compressed = any(info.compressed for info in infos)
+        member = MemberInfo(name, name, (rows,) + first.shape[1:], first.dtype, False, (1, 0),
+                            zipfile.ZIP_DEFLATED if compressed else zipfile.ZIP_STORED,
+                            sum(info.compressed_size for info in infos),
+                            sum(info.file_size for info in infos), crc, 0, 0)
+        root = os.path.commonpath([os.path.dirname(a.path) for a in self.archives])
+        self.index = ArchiveIndex(os.path.join(root, f"{name} ({len(paths)} archives)"),
+                                  max(a.index.mtime_ns for a in self.archives),
+                                  sum(a.index.file_size for a in self.archives), [member])
+        self.path = self.index.path
+        self.lengths = [info.shape[0] for info in infos]
+
+    @property
+    def files(self):
+        return self.index.files
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def _check(self, name):
+        if name != self.name:
+            raise KeyError(name)
+
+    def _part(self, i):
+        archive = self.archives[i]
+        if archive.access_mode(self.name) != MODE_MMAP:
+            # Decoded shards live in the archive's ArrayCache
+            return archive[self.name]
+        view = self._views.get(i)
+        if view is None:
+            view = self._views[i] = archive[self.name]
+        return view
+
+    def __getitem__(self, name):
+        self._check(name)
+        info = self.index[name]
+        return ConcatArray([lambda i=i: self._part(i) for i in range(len(self.archives))],
+                           self.lengths, info.shape[1:], info.dtype)
+
+    def access_mode(self, name):
+        """Always MODE_MMAP: the view is never loaded as a whole"""
+        self._check(name)
+        return MODE_MMAP
+
+    def shards(self, name):
+        """(archive, name) of every shard, in concatenation order"""
+        self._check(name)
+        return [(archive, name) for archive in self.archives]
+
+    def iter_chunks(self, name, chunk_elems=None, start=0, stop=None):
+        """Yield (offset, 1D array) blocks shard by shard, each shard in
+        its own storage order; offsets count elements across shards"""
+        self._check(name)
+        if chunk_elems is None:
+            chunk_elems = chunk_elements(self.index[name].dtype)
+        total = self.index[name].size
+        stop = total if stop is None else min(stop, total)
+        offset = 0
+        for archive in self.archives:
+            size = archive.index[name].size
+            lo, hi = max(start - offset, 0), min(stop - offset, size)
+            if lo < hi:
+                for local, chunk in archive.iter_chunks(name, chunk_elems, lo, hi):
+                    yield offset + local, chunk
+            offset += size
+            if offset >= stop:
+                break
+
+    def close(self):
+        self._views.clear()
+        for archive in self.archives:
+            archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
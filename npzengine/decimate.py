@@ -0,0 +1,69 @@
+"""
+Min/max-preserving decimation of long 1D series for line plots.
+
+The requested index range is split into equal buckets (one per screen
+pixel column) and each bucket is reduced to its minimum and maximum
+samples, kept in index order. Drawing those 2 points per pixel gives the
+same picture as drawing every sample: spikes and dropouts stay visible.
+"""
+
+import numpy as np
+
+from .trace import span
+
+# Buckets reduced per step, bounding temporaries for non-contiguous input
+BUCKETS_PER_STEP = 4096
+
+
+def _bucket_extrema(y, start, stop, bucket):
+    """Indices of the min and max of each full bucket in [start, stop)"""
+    n_buckets = (stop - start) // bucket
+    lo = np.empty(n_buckets, dtype=np.int64)
+    hi = np.empty(n_buckets, dtype=np.int64)
+    for b0 in range(0, n_buckets, BUCKETS_PER_STEP):
+        b1 = min(b0 + BUCKETS_PER_STEP, n_buckets)
+        seg = np.asarray(y[start + b0 * bucket:start + b1 * bucket]).reshape(b1 - b0, bucket)
+        base = start + np.arange(b0, b1, dtype=np.int64) * bucket
+        lo[b0:b1] = base + seg.argmin(axis=1)
+        hi[b0:b1] = base + seg.argmax(axis=1)
+    return lo, hi
+
+
+def minmax_decimate(y, n_buckets, start=0, stop=None):
+    """Return (x, values) covering y[start:stop] with at most about
+    2 * n_buckets points, preserving each bucket's extremes.
+
+    Ranges short enough to draw directly are returned unchanged.
+    """
+    size = len(y)
+    stop = size if stop is None else stop
+    start = max(0, min(int(start), size))
+    stop = max(start, min(int(stop), size))
+    n = stop - start
+    n_buckets = max(1, int(n_buckets))
+
+    if n <= 2 * n_buckets:
+        return np.arange(start, stop), np.asarray(y[start:stop])
+
+    bucket = -(-n // n_buckets)
+    with span("decimate", nbytes=n * y.dtype.itemsize, points=n, buckets=n_buckets):
+        lo, hi = _bucket_extrema(y, start, stop, bucket)
+
+    # The last, partial bucket
+    tail = start + lo.size * bucket
+    if tail < stop:
+        seg = np.asarray(y[tail:stop])
+        lo = np.append(lo, tail + seg.argmin())
+        hi = np.append(hi, tail + seg.argmax())
+
+    # Interleave each bucket's extremes in index order
+    x = np.empty(2 * lo.size, dtype=np.int64)
+    x[0::2] = np.minimum(lo, hi)
+    x[1::2] = np.maximum(lo, hi)
+
+    # Keep the range end points so the line spans the whole view
+    if x[0] != start:
+        x = np.concatenate(([start], x))
+    if x[-1] != stop - 1:
+        x = np.concatenate((x, [stop - 1]))
+    return x, np.asarray(y[x])
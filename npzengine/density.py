@@ -0,0 +1,196 @@
+"""
+Density rendering of large scatter plots.
+
+Instead of sampling, every point is binned into a 2D count grid the size
+of the plot in pixels; the grid is drawn as one image with a log color
+scale, so dense cores and lone outliers are both visible. Points are
+read in chunks and binned with np.bincount on a thread pool, so the
+cost is one pass over the data and memory stays bounded.
+
+Zooming re-bins just the points inside the new view. When few enough
+points fall in view, they are returned as well so they can be drawn as
+ordinary markers.
+"""
+
+import numpy as np
+
+from .chunks import c_order_blocks, map_chunks
+from .stats import ArrayStats, reduce_chunk
+from .trace import span
+
+DEFAULT_CHUNK_POINTS = 1 << 20
+
+# Views with at most this many points are drawn as markers
+MAX_MARKER_POINTS = 50_000
+
+
+def _axis_values(values):
+    values = np.asarray(values)
+    if values.dtype.kind == "c":
+        values = np.abs(values)
+    return values.astype(np.float64, copy=False)
+
+
+def point_chunks(data, x, y, chunk_points=DEFAULT_CHUNK_POINTS):
+    """Yield (xs, ys) chunks of the points of a scatter plot.
+
+    x and y are "index", "value" or, for 2D arrays, a column number. With
+    "index" and "value" the points are the elements of the array in C
+    order, read without flattening it. For structured arrays they are
+    "index" or field names, read as zero-copy field views of each block
+    of records. For a selection of rows (query.SelectedRows) "index" is
+    the position in the whole array.
+    """
+    row_numbers = getattr(data, "row_numbers", None)
+    if data.dtype.names is not None:
+        records = data if data.ndim == 1 else data.reshape(-1)
+        n = records.shape[0]
+        for start in range(0, n, chunk_points):
+            stop = min(start + chunk_points, n)
+            block = records[start:stop]
+            columns = {axis: _row_index(row_numbers, start, stop) if axis == "index"
+                       else block[axis] for axis in (x, y)}
+            yield columns[x], columns[y]
+        return
+
+    if {x, y} - {"index", "value"}:
+        # Columns of a 2D array
+        n = data.shape[0]
+        for start in range(0, n, chunk_points):
+            stop = min(start + chunk_points, n)
+            columns = {}
+            for axis in (x, y):
+                if axis not in columns:
+                    columns[axis] = (_row_index(row_numbers, start, stop) if axis == "index"
+                                     else data[start:stop, int(axis)])
+            yield columns[x], columns[y]
+        return
+
+    if row_numbers is not None:
+        # Selected rows are read a block of rows at a time; each value is
+        # indexed by its C-order position in the whole array
+        row_size = max(1, data.size // max(1, len(data)))
+        block_rows = max(1, chunk_points // row_size)
+        for start in range(0, len(data), block_rows):
+            stop = min(start + block_rows, len(data))
+            block = np.asarray(data[start:stop]).reshape(-1)
+            index = (row_numbers(start, stop)[:, np.newaxis] * row_size + np.arange(row_size)).reshape(-1)
+            columns = {"index": index, "value": block}
+            yield columns[x], columns[y]
+        return
+
+    start = 0
+    for block in c_order_blocks(data, chunk_points):
+        index = np.arange(start, start + block.size)
+        start += block.size
+        columns = {"index": index, "value": block}
+        yield columns[x], columns[y]
+
+
+def _row_index(row_numbers, start, stop):
+    return np.arange(start, stop) if row_numbers is None else row_numbers(start, stop)
+
+
+def point_bounds(chunks, workers=None, progress=None):
+    """((x_min, x_max), (y_min, y_max)) over the finite coordinates of
+    all points. progress, if given, is called with the number of points
+    read and may raise to abort."""
+    x_stats, y_stats = ArrayStats(), ArrayStats()
+
+    def reduce(xs, ys):
+        return reduce_chunk(xs), reduce_chunk(ys), len(xs)
+
+    def combine(result):
+        x_stats.merge(result[0])
+        y_stats.merge(result[1])
+        if progress is not None:
+            progress(x_stats.total)
+
+    map_chunks(reduce, chunks, workers, combine)
+    bounds = []
+    for stats in (x_stats, y_stats):
+        bounds.append((0.0, 1.0) if stats.count == 0 else (float(stats.min), float(stats.max)))
+    return tuple(bounds)
+
+
+class DensityGrid:
+    """Point counts on a grid covering x_range by y_range; row 0 is at
+    y_range[0]. points holds the (xs, ys) in range when there are few
+    enough to draw as markers, otherwise None."""
+
+    def __init__(self, counts, x_range, y_range, points=None):
+        self.counts = counts
+        self.x_range = x_range
+        self.y_range = y_range
+        self.points = points
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    @property
+    def extent(self):
+        """imshow extent (left, right, bottom, top) with origin="lower\""""
+        return (self.x_range[0], self.x_range[1], self.y_range[0], self.y_range[1])
+
+
+def _widen(lo, hi):
+    lo, hi = float(lo), float(hi)
+    return (lo - 0.5, hi + 0.5) if lo == hi else (lo, hi)
+
+
+def bin_points(xs, ys, x_range, y_range, shape):
+    """Counts of one chunk of points on a (rows, cols) grid, plus the
+    points that fall in range"""
+    rows, cols = shape
+    (x0, x1), (y0, y1) = x_range, y_range
+    xs, ys = _axis_values(xs), _axis_values(ys)
+
+    keep = (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)   # also drops NaN
+    if not keep.all():
+        xs, ys = xs[keep], ys[keep]
+
+    ix = np.minimum(((xs - x0) * (cols / (x1 - x0))).astype(np.intp), cols - 1)
+    iy = np.minimum(((ys - y0) * (rows / (y1 - y0))).astype(np.intp), rows - 1)
+    counts = np.bincount(iy * cols + ix, minlength=rows * cols)
+    return counts, xs, ys
+
+
+def density_grid(chunks, x_range, y_range, shape, workers=None,
+                 max_points=MAX_MARKER_POINTS, progress=None):
+    """Bin an iterable of (xs, ys) chunks into a DensityGrid.
+
+    progress, if given, is called with the number of points read and may
+    raise to abort.
+    """
+    x_range, y_range = _widen(*x_range), _widen(*y_range)
+    rows, cols = max(1, int(shape[0])), max(1, int(shape[1]))
+    counts = np.zeros(rows * cols, dtype=np.int64)
+    kept = []
+    in_view = 0
+    seen = 0
+
+    def bin_chunk(xs, ys):
+        with span("density.bin", points=len(xs)):
+            return bin_points(xs, ys, x_range, y_range, (rows, cols)) + (len(xs),)
+
+    def combine(result):
+        nonlocal in_view, seen
+        chunk_counts, xs, ys, n = result
+        counts[:] += chunk_counts
+        in_view += xs.size
+        seen += n
+        # Keep the points only while a marker plot is still possible
+        if in_view <= max_points:
+            kept.append((xs, ys))
+        elif kept:
+            kept.clear()
+        if progress is not None:
+            progress(seen)
+
+    map_chunks(bin_chunk, chunks, workers, combine)
+    points = None
+    if in_view <= max_points:
+        points = (np.concatenate([xs for xs, _ in kept]) if kept else np.empty(0),
+                  np.concatenate([ys for _, ys in kept]) if kept else np.empty(0))
+    return DensityGrid(counts.reshape(rows, cols), x_range, y_range, points)
@@ -0,0 +1,190 @@
+"""
+Persistent cache of products derived from archive members.
+
+Statistics, histograms, heatmap tiles, previews and similar results are
+expensive to compute for large members but small to keep. DerivedStore
+saves them under ~/.npzviewer/derived, one file per entry, named by a
+hash of the archive path, size and modification time, the member name
+and CRC from the zip directory, and the kind and parameters of the
+product. A changed archive therefore never matches an old entry.
+
+Each entry holds JSON metadata plus raw NumPy arrays:
+
+    magic b"NPZD", uint32 version, uint32 header length,
+    JSON header {"meta": ..., "arrays": [[name, descr, shape, offset], ...]},
+    array bytes, each at its offset from the end of the header
+
+The total size is kept under a byte budget by deleting the least recently
+used entries; reading an entry marks it used by touching its mtime.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import threading
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+DEFAULT_DERIVED_DIR = os.path.join(os.path.expanduser("~"), ".npzviewer", "derived")
+DEFAULT_DERIVED_BYTES = 1 << 30
+
+DERIVED_VERSION = 1
+_MAGIC = b"NPZD"
+_PREFIX = struct.Struct("<4sII")
+_SUFFIX = ".npzd"
+
+
+def _write_entry(path, meta, arrays):
+    layout = []
+    offset = 0
+    blobs = []
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        layout.append([name, npy_format.dtype_to_descr(array.dtype), list(array.shape), offset])
+        blobs.append(array)
+        offset += array.nbytes
+    header = json.dumps({"meta": meta, "arrays": layout}).encode("utf-8")
+
+    tmp_path = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREFIX.pack(_MAGIC, DERIVED_VERSION, len(header)))
+        f.write(header)
+        for array in blobs:
+            f.write(array.data)
+    os.replace(tmp_path, path)
+
+
+def _read_entry(path):
+    with open(path, "rb") as f:
+        raw = f.read()
+    magic, version, header_len = _PREFIX.unpack_from(raw)
+    if magic != _MAGIC or version != DERIVED_VERSION:
+        raise ValueError(f"Not a derived cache entry: {path}")
+    start = _PREFIX.size + header_len
+    header = json.loads(raw[_PREFIX.size:start].decode("utf-8"))
+    arrays = {}
+    for name, descr, shape, offset in header["arrays"]:
+        dtype = npy_format.descr_to_dtype(descr if isinstance(descr, str)
+                                          else [tuple(field) for field in descr])
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(raw, dtype=dtype, count=count,
+                                     offset=start + offset).reshape(shape)
+    return header["meta"], arrays
+
+
+class DerivedStore:
+    """On-disk LRU cache of derived products, bounded in bytes"""
+
+    def __init__(self, cache_dir=DEFAULT_DERIVED_DIR, max_bytes=DEFAULT_DERIVED_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._bytes = None   # total size on disk, scanned on first write
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(archive, name, kind, params=()):
+        """Hex digest naming the entry of one product of one member"""
+        index = archive.index
+        info = index[name]
+        ident = [index.path, index.file_size, index.mtime_ns, name, info.crc, kind, list(params)]
+        return hashlib.sha1(json.dumps(ident, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(self, archive, name, kind, params=()):
+        """(meta, arrays) of a stored product, or None"""
+        path = self._path(self.key(archive, name, kind, params))
+        try:
+            entry = _read_entry(path)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return None
+        return entry
+
+    def put(self, archive, name, kind, params=(), meta=None, arrays=None):
+        """Store a product. The store is an optimisation only, so write
+        errors are ignored."""
+        path = self._path(self.key(archive, name, kind, params))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            _write_entry(path, meta, arrays or {})
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan()
+            else:
+                self._bytes += size - old_size
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return []
+        entries = []
+        for entry_name in names:
+            if not entry_name.endswith(_SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, entry_name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry_name))
+        return entries
+
+    def _scan(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries until under budget"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry_name))
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, entry_name in self._entries():
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry_name))
+                except OSError:
+                    pass
+            self._bytes = 0
+
+
+default_derived_store = DerivedStore()
+
+
+class TileStore:
+    """Adapter persisting the tiles of one TilePyramid in a DerivedStore.
+
+    variant distinguishes pyramids of the same member, e.g. the 2D slices
+    of an N-D array.
+    """
+
+    def __init__(self, store, archive, name, variant=()):
+        self.store = store
+        self.archive = archive
+        self.name = name
+        self.variant = list(variant)
+
+    def get(self, key):
+        entry = self.store.get(self.archive, self.name, "tile", self.variant + list(key))
+        return None if entry is None else entry[1]
+
+    def put(self, key, arrays):
+        self.store.put(self.archive, self.name, "tile", self.variant + list(key), arrays=arrays)
@@ -0,0 +1,479 @@
+"""
+Streaming export of archive members.
+
+Formats:
+
+- "csv", "csv.gz", "csv.zst": rows are formatted a block at a time and
+  written through a large buffered writer. For the compressed variants
+  each block is compressed on a thread pool into an independent gzip
+  member or zstd frame; concatenated, these form a valid stream.
+- "npy": the member's .npy bytes are copied out of the archive without
+  decoding the array; a member concatenated across archives is written
+  shard by shard as one .npy file.
+- "parquet": columnar output of 2D and structured arrays, written one
+  row group per block (requires pyarrow).
+
+Sources are read block by block: memory-mapped and in-memory arrays by
+slicing, compressed archive members through the chunked stream reader,
+so an array is never flattened or copied whole. export_archive exports
+all members of an archive concurrently.
+
+The CSV layout is the viewer's: "Index,Value" rows for 1D arrays and for
+the C-order flattening of N-D arrays, "Row,Col0,Col1,..." for 2D arrays,
+and "Index,<field>,<field>,..." for the records of structured arrays,
+which are formatted column by column from zero-copy field views.
+"""
+
+import importlib.util
+import os
+import threading
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from .archive import MODE_EAGER
+from .chunks import c_order_blocks
+from .table import format_column, format_values
+from .trace import span
+
+DEFAULT_BLOCK_CELLS = 1 << 18
+WRITE_BUFFER = 8 << 20
+COPY_BLOCK = 8 << 20
+
+EXPORT_FORMATS = ("csv", "csv.gz", "csv.zst", "npy", "parquet")
+
+
+class ExportResult:
+    """Summary of a finished export"""
+
+    def __init__(self, path, rows, nbytes, seconds):
+        self.path = path
+        self.rows = rows
+        self.nbytes = nbytes
+        self.seconds = seconds
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "rows": self.rows,
+            "bytes": self.nbytes,
+            "seconds": self.seconds,
+            "rows_per_sec": self.rows_per_sec,
+        }
+
+
+# Python's str of these matches NumPy's and is the fastest path
+_PYTHON_STR_DTYPES = {np.dtype(t) for t in ("b1", "i1", "i2", "i4", "i8", "u1", "u2", "u4", "u8",
+                                            "f8", "c16")}
+
+
+def _widened(values, narrow_floats):
+    """values with float16 (and, if narrow_floats, float32 and complex64)
+    cast to float64 or complex128. Python's str of the wide value writes
+    every digit of the exact value, as format() of a NumPy scalar does;
+    NumPy's shortest repr of a float16 (6.55e+04 for 65504) would read
+    back as a different float64."""
+    kind, itemsize = values.dtype.kind, values.dtype.itemsize
+    if kind == "f" and (itemsize == 2 or (narrow_floats and itemsize < 8)):
+        return values.astype(np.float64)
+    if kind == "c" and narrow_floats and itemsize < 16:
+        return values.astype(np.complex128)
+    return values
+
+
+def _column_strings(column, narrow_floats=False):
+    """Text of each value of a 1D column"""
+    column = _widened(column, narrow_floats)
+    if column.ndim == 1 and column.dtype in _PYTHON_STR_DTYPES:
+        return list(map(str, column.tolist()))
+    return format_column(column).tolist()
+
+
+def _row_strings(block, flat=False):
+    """Comma-joined text of each row of a 2D block, or of each record of
+    a 1D structured block. flat marks the single value column of the
+    "Index,Value" layout, which is written the way f"{value}" writes a
+    NumPy scalar (narrow floats with all the digits of their exact value);
+    the other layouts write NumPy's str of each value."""
+    if block.dtype.names is not None:
+        columns = [_column_strings(block[field]) for field in block.dtype.names]
+        return [",".join(row) for row in zip(*columns)]
+    if block.shape[1] == 1:
+        return _column_strings(block[:, 0], narrow_floats=flat)
+    block = _widened(block, False)
+    if block.dtype in _PYTHON_STR_DTYPES:
+        return [",".join(map(str, row)) for row in block.tolist()]
+    return [",".join(row) for row in format_values(block).tolist()]
+
+
+def _array_blocks(data, block_cells):
+    """Yield 2D blocks of CSV value columns from an array, or 1D blocks
+    of records from a structured array"""
+    if data.dtype.names is not None:
+        yield from c_order_blocks(data, max(1, block_cells // len(data.dtype.names)))
+    elif data.ndim == 2:
+        block_rows = max(1, block_cells // max(1, data.shape[1]))
+        for start in range(0, data.shape[0], block_rows):
+            yield data[start:start + block_rows]
+    else:
+        for block in c_order_blocks(data, block_cells):
+            yield block[:, np.newaxis]
+
+
+def _member_blocks(archive, name, block_cells):
+    """Yield 2D blocks of CSV value columns from a compressed member,
+    inflating it chunk by chunk"""
+    info = archive.index[name]
+    if info.dtype.names is not None:
+        for _, chunk in archive.iter_chunks(name, max(1, block_cells // len(info.dtype.names))):
+            yield chunk
+        return
+    cols = info.shape[1] if info.ndim == 2 else 1
+    block_rows = max(1, block_cells // max(1, cols))
+    for _, chunk in archive.iter_chunks(name, block_rows * cols):
+        yield chunk.reshape(-1, cols)
+
+
+def _gzip_block(data):
+    # wbits=31 writes a complete gzip member, header and trailer included
+    return zlib.compress(data, 6, 31)
+
+
+def _zstd_block(data):
+    import zstandard
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+_COMPRESSORS = {
+    None: None,
+    "gzip": _gzip_block,
+    "zstd": _zstd_block,
+}
+
+
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def write_csv(path, shape, blocks, progress=None, compression=None, workers=None,
+              fields=None):
+    """Write CSV rows from an iterable of 2D value blocks, or of 1D
+    record blocks with the given field names.
+
+    compression is None, "gzip" or "zstd"; compressed blocks are produced
+    on a thread pool of the given number of workers. progress, if given,
+    is called with (rows_written, total_rows) after each block and may
+    raise to abort; the partial file is then removed.
+    """
+    compress = _COMPRESSORS[compression]
+    if compression == "zstd":
+        # Fail before creating the file
+        if importlib.util.find_spec("zstandard") is None:
+            raise ImportError("csv.zst export requires the zstandard package")
+    flat = fields is None and len(shape) != 2
+    if fields is not None:
+        total = int(np.prod(shape, dtype=np.int64))
+        header = "Index," + ",".join(fields) + "\n"
+    elif len(shape) == 2:
+        total = shape[0]
+        header = "Row," + ",".join(f"Col{i}" for i in range(shape[1])) + "\n"
+    else:
+        total = int(np.prod(shape, dtype=np.int64))
+        header = "Index,Value\n"
+
+    def text_blocks():
+        yield header, 0
+        rows = 0
+        for block in blocks:
+            n = block.shape[0]
+            with span("export.format", nbytes=block.nbytes, rows=n):
+                text = "".join([f"{i},{row}\n" for i, row in
+                                zip(range(rows, rows + n), _row_strings(block, flat))])
+            yield text, n
+            rows += n
+
+    started = time.perf_counter()
+    rows = 0
+    try:
+        with span("export.csv", rows=total, compression=compression), \
+                open(path, "wb", buffering=WRITE_BUFFER) as f:
+            if compress is None:
+                for text, n in text_blocks():
+                    f.write(text.encode("utf-8"))
+                    rows += n
+                    if progress is not None and n:
+                        progress(rows, total)
+            else:
+                workers = workers or os.cpu_count() or 1
+                pending = deque()
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    for text, n in text_blocks():
+                        pending.append((pool.submit(compress, text.encode("utf-8")), n))
+                        # Write in order, keeping a bounded number in flight
+                        while pending and (len(pending) > 2 * workers or pending[0][0].done()):
+                            future, done_rows = pending.popleft()
+                            f.write(future.result())
+                            rows += done_rows
+                            if progress is not None and done_rows:
+                                progress(rows, total)
+                    while pending:
+                        future, done_rows = pending.popleft()
+                        f.write(future.result())
+                        rows += done_rows
+                        if progress is not None and done_rows:
+                            progress(rows, total)
+    except BaseException:
+        _remove_partial(path)
+        raise
+
+    return ExportResult(path, rows, os.path.getsize(path), time.perf_counter() - started)
+
+
+def export_array_csv(data, path, progress=None, block_cells=DEFAULT_BLOCK_CELLS,
+                     compression=None, workers=None):
+    """Export an in-memory or memory-mapped array to CSV"""
+    return write_csv(path, data.shape, _array_blocks(data, block_cells), progress,
+                     compression, workers, data.dtype.names)
+
+
+def export_member_csv(archive, name, path, progress=None, data=None,
+                      block_cells=DEFAULT_BLOCK_CELLS, compression=None, workers=None):
+    """Export an archive member to CSV.
+
+    Compressed C-order members are streamed from the archive; everything
+    else is read from the array (data, if it is already loaded).
+    """
+    info = archive.index[name]
+    if (data is None and archive.access_mode(name) == MODE_EAGER
+            and not info.fortran_order and not info.dtype.hasobject):
+        return write_csv(path, info.shape, _member_blocks(archive, name, block_cells), progress,
+                         compression, workers, info.dtype.names)
+    if data is None:
+        data = archive[name]
+    return export_array_csv(data, path, progress, block_cells, compression, workers)
+
+
+def export_array_npy(data, path, progress=None, block_cells=DEFAULT_BLOCK_CELLS):
+    """Write an array, read block by block along axis 0, as a C-order .npy file"""
+    started = time.perf_counter()
+    rows = data.shape[0] if data.ndim else 1
+    row_cells = max(1, int(np.prod(data.shape[1:], dtype=np.int64)))
+    block_rows = max(1, block_cells // row_cells)
+    written = 0
+    try:
+        with span("export.npy", nbytes=data.nbytes), open(path, "wb") as out:
+            npy_format.write_array_header_1_0(
+                out, {"descr": npy_format.dtype_to_descr(data.dtype),
+                      "fortran_order": False, "shape": tuple(data.shape)})
+            for start in range(0, rows, block_rows):
+                block = np.ascontiguousarray(data[start:start + block_rows] if data.ndim else data)
+                out.write(block.data)
+                written += block.nbytes
+                if progress is not None:
+                    progress(written, data.nbytes)
+    except BaseException:
+        _remove_partial(path)
+        raise
+    return ExportResult(path, rows, os.path.getsize(path), time.perf_counter() - started)
+
+
+def export_member_npy(archive, name, path, progress=None):
+    """Copy a member's .npy file out of the archive without decoding it"""
+    info = archive.index[name]
+    if getattr(archive, "shards", None) is not None:
+        # A virtual member has no .npy file of its own to copy
+        return export_array_npy(archive[name], path, progress)
+    started = time.perf_counter()
+    copied = 0
+    try:
+        with span("export.npy", nbytes=info.file_size, member=name), open(path, "wb") as out:
+            if info.compressed:
+                with zipfile.ZipFile(archive.path) as zf, zf.open(info.member) as src:
+                    while True:
+                        buf = src.read(COPY_BLOCK)
+                        if not buf:
+                            break
+                        out.write(buf)
+                        copied += len(buf)
+                        if progress is not None:
+                            progress(copied, info.file_size)
+            else:
+                with open(archive.path, "rb") as src:
+                    src.seek(info.member_offset)
+                    while copied < info.file_size:
+                        buf = src.read(min(COPY_BLOCK, info.file_size - copied))
+                        if not buf:
+                            raise EOFError(f"Archive truncated in member {name!r}")
+                        out.write(buf)
+                        copied += len(buf)
+                        if progress is not None:
+                            progress(copied, info.file_size)
+    except BaseException:
+        _remove_partial(path)
+        raise
+
+    rows = info.shape[0] if info.ndim else 1
+    return ExportResult(path, rows, copied, time.perf_counter() - started)
+
+
+def _columns(block):
+    """(name, 1D values) pairs of a 2D or structured block"""
+    if block.dtype.names is not None:
+        return [(field, block[field]) for field in block.dtype.names]
+    if block.ndim == 1:
+        return [("Value", block)]
+    return [(f"Col{j}", block[:, j]) for j in range(block.shape[1])]
+
+
+def export_member_parquet(archive, name, path, progress=None, data=None,
+                          block_cells=DEFAULT_BLOCK_CELLS):
+    """Export a 1D, 2D or structured member to Parquet, one row group per block"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    info = archive.index[name]
+    if info.ndim > 2 or (info.dtype.names is not None and info.ndim != 1):
+        raise ValueError("Columnar export needs a 1D, 2D or 1D structured array")
+    if info.dtype.names is not None and any(info.dtype[f].shape for f in info.dtype.names):
+        raise ValueError("Columnar export does not support sub-array fields")
+    if data is None:
+        data = archive[name]
+
+    width = data.shape[1] if data.ndim == 2 else max(1, len(data.dtype.names or ()))
+    block_rows = max(1, block_cells // width)
+    total = data.shape[0] if data.ndim else 1
+    data = data.reshape(total, -1) if data.ndim == 0 else data
+
+    started = time.perf_counter()
+    rows = 0
+    writer = None
+    try:
+        for start in range(0, total, block_rows):
+            block = data[start:start + block_rows]
+            table = pa.table({col: pa.array(np.ascontiguousarray(values))
+                              for col, values in _columns(block)})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += block.shape[0]
+            if progress is not None:
+                progress(rows, total)
+        if writer is None:
+            empty = pa.table({col: pa.array(values) for col, values in _columns(data[:0])})
+            pq.write_table(empty, path)
+        else:
+            writer.close()
+            writer = None
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        _remove_partial(path)
+        raise
+
+    return ExportResult(path, rows, os.path.getsize(path), time.perf_counter() - started)
+
+
+def export_member(archive, name, path, fmt="csv", progress=None, data=None, workers=None):
+    """Export one member in any of EXPORT_FORMATS"""
+    if fmt == "csv":
+        return export_member_csv(archive, name, path, progress, data)
+    if fmt == "csv.gz":
+        return export_member_csv(archive, name, path, progress, data,
+                                 compression="gzip", workers=workers)
+    if fmt == "csv.zst":
+        return export_member_csv(archive, name, path, progress, data,
+                                 compression="zstd", workers=workers)
+    if fmt == "npy":
+        return export_member_npy(archive, name, path, progress)
+    if fmt == "parquet":
+        return export_member_parquet(archive, name, path, progress, data)
+    raise ValueError(f"Unknown export format {fmt!r}")
+
+
+class ExportCancelled(Exception):
+    """Stops the member exports still running when their batch is aborted"""
+
+
+def _member_path(out_dir, name, fmt):
+    """Output path of a member; a name with slashes gets subdirectories of
+    out_dir, but never a path outside it"""
+    path = os.path.normpath(os.path.join(out_dir, f"{name}.{fmt}"))
+    root = os.path.normpath(out_dir)
+    if os.path.commonpath([os.path.abspath(root), os.path.abspath(path)]) != os.path.abspath(root):
+        raise ValueError(f"Member name {name!r} points outside the export folder")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def export_archive(archive, out_dir, fmt="npy", names=None, workers=None, progress=None):
+    """Export members of an archive concurrently, one file per member.
+
+    Returns {name: ExportResult}, or the exception for a member that
+    failed; the other members are still exported. workers (default: CPU
+    count) bounds the threads of the whole batch and is split between
+    the members running at once and their compression pools. progress,
+    if given, is called with (members_done, member_count) as members
+    finish and after every block written, and may raise to abort the
+    batch: the members still being written then stop at their next
+    block and their partial files are removed, finished ones are kept.
+    """
+    names = list(archive.files if names is None else names)
+    budget = workers or os.cpu_count() or 1
+    concurrent = max(1, min(len(names), budget))
+    os.makedirs(out_dir, exist_ok=True)
+
+    results = {}
+    aborted = threading.Event()
+    abort = []
+    lock = threading.Lock()
+
+    def report():
+        if progress is not None:
+            with lock:
+                progress(len(results), len(names))
+
+    def member_progress(done, total):
+        if aborted.is_set():
+            raise ExportCancelled()
+        try:
+            report()
+        except BaseException as e:
+            abort.append(e)
+            aborted.set()
+            raise
+
+    def export(name):
+        return export_member(archive, name, _member_path(out_dir, name, fmt), fmt,
+                             member_progress, workers=max(1, budget // concurrent))
+
+    with ThreadPoolExecutor(max_workers=concurrent) as pool:
+        futures = {pool.submit(export, name): name for name in names}
+        try:
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    if aborted.is_set():
+                        raise abort[0] if abort else e
+                    results[futures[future]] = e
+                report()
+        except BaseException:
+            # Running members raise at their next block and remove their
+            # files; the pool waits for them before the error propagates
+            aborted.set()
+            for future in futures:
+                future.cancel()
+            raise
+    return results
@@ -0,0 +1,181 @@
+"""
+Indexes of every archive in a directory tree.
+
+FolderIndex walks a directory for .npz files and indexes them on a
+thread pool, reading only zip directories and .npy headers (and reusing
+the on-disk index cache). Rescanning stats every file and re-indexes
+only archives that appeared or changed since the last scan, so it can
+run periodically to keep a browser up to date. search() filters the
+members of all archives by name, dtype kind and size, and shards() finds
+the archives whose copies of a member can be concatenated.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .index import DEFAULT_CACHE_DIR, load_index
+
+# Labels for dtype kinds, as offered by search filters
+DTYPE_KINDS = {
+    "float": "f",
+    "int": "i",
+    "uint": "u",
+    "complex": "c",
+    "bool": "b",
+    "structured": "V",
+    "text": "SU",
+    "object": "O",
+}
+
+
+class ScanResult:
+    """Archive paths added, changed and removed by one scan"""
+
+    def __init__(self, added, changed, removed):
+        self.added = added
+        self.changed = changed
+        self.removed = removed
+
+    @property
+    def paths(self):
+        return self.added + self.changed + self.removed
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+
+class FolderIndex:
+    """ArchiveIndex of every archive below a directory"""
+
+    def __init__(self, root, extensions=(".npz",), workers=None, cache_dir=DEFAULT_CACHE_DIR):
+        self.root = os.path.abspath(root)
+        self.extensions = tuple(extensions)
+        self.workers = workers or min(32, 4 * (os.cpu_count() or 1))
+        self.cache_dir = cache_dir
+        self.indexes = {}    # path -> ArchiveIndex
+        self.errors = {}     # path -> message, for files that could not be indexed
+        self._seen = {}      # path -> (mtime_ns, size) at the last scan
+        self._lock = threading.Lock()
+
+    @property
+    def paths(self):
+        with self._lock:
+            return sorted(set(self.indexes) | set(self.errors))
+
+    def _walk(self):
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames.sort()
+            for filename in filenames:
+                if not filename.lower().endswith(self.extensions):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found[path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def scan(self, progress=None):
+        """Bring the indexes up to date with the directory.
+
+        progress, if given, is called with (archives_indexed, to_index)
+        and may raise to abort. Returns a ScanResult.
+        """
+        found = self._walk()
+        with self._lock:
+            removed = sorted(set(self._seen) - set(found))
+            added = sorted(set(found) - set(self._seen))
+            changed = sorted(path for path in set(found) & set(self._seen)
+                             if found[path] != self._seen[path])
+
+        todo = added + changed
+        results = {}
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(todo))) as pool:
+                futures = {pool.submit(load_index, path, self.cache_dir): path for path in todo}
+                try:
+                    for future in as_completed(futures):
+                        path = futures[future]
+                        try:
+                            results[path] = future.result()
+                        except Exception as e:
+                            results[path] = e
+                        if progress is not None:
+                            progress(len(results), len(todo))
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        with self._lock:
+            for path in removed:
+                self._seen.pop(path, None)
+                self.indexes.pop(path, None)
+                self.errors.pop(path, None)
+            for path, result in results.items():
+                self._seen[path] = found[path]
+                if isinstance(result, Exception):
+                    self.indexes.pop(path, None)
+                    self.errors[path] = f"{type(result).__name__}: {result}"
+                else:
+                    self.errors.pop(path, None)
+                    self.indexes[path] = result
+        return ScanResult(added, changed, removed)
+
+    def members(self, path, text="", kind=None, min_bytes=None, max_bytes=None):
+        """MemberInfo of one archive's members that pass the filters.
+
+        text matches the member name or the archive path (case-insensitive);
+        kind is a key of DTYPE_KINDS; sizes are in-memory bytes.
+        """
+        with self._lock:
+            index = self.indexes.get(path)
+        if index is None:
+            return []
+        text = text.lower()
+        path_match = text in os.path.relpath(path, self.root).lower()
+        kinds = DTYPE_KINDS.get(kind) if kind else None
+        matches = []
+        for name in index.files:
+            info = index[name]
+            if text and not path_match and text not in name.lower():
+                continue
+            if kinds is not None and info.dtype.kind not in kinds:
+                continue
+            if min_bytes is not None and info.nbytes < min_bytes:
+                continue
+            if max_bytes is not None and info.nbytes > max_bytes:
+                continue
+            matches.append(info)
+        return matches
+
+    def search(self, text="", kind=None, min_bytes=None, max_bytes=None):
+        """[(path, [MemberInfo, ...])] of archives with matching members"""
+        results = []
+        for path in self.paths:
+            members = self.members(path, text, kind, min_bytes, max_bytes)
+            if members:
+                results.append((path, members))
+        return results
+
+    def shards(self, name, like=None):
+        """Paths of the archives whose member name could be concatenated
+        with like (a MemberInfo; by default the first archive's member):
+        same dtype and the same shape after the first axis"""
+        shards = []
+        for path in self.paths:
+            with self._lock:
+                index = self.indexes.get(path)
+            if index is None or name not in index:
+                continue
+            info = index[name]
+            if info.ndim == 0:
+                continue
+            if like is None:
+                like = info
+            if info.dtype == like.dtype and info.shape[1:] == like.shape[1:]:
+                shards.append(path)
+        return shards
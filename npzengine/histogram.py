@@ -0,0 +1,208 @@
+"""
+Exact histograms over chunked sources.
+
+Two passes: the value range comes from the statistics engine (whose
+min/max pass is cached and shared with the info panel), then every chunk
+is binned with np.bincount on a thread pool and the counts are summed.
+Edges and bin assignment follow np.histogram exactly, in the same
+precision (float32 data is binned against float32 edges), so the result
+equals np.histogram(values, bins, range) over all finite values, without
+sampling and without holding more than a few chunks in memory.
+
+Results are cached per (archive, member, field, bins, range), in memory
+and in the persistent derived store. Fields of structured members are
+binned through zero-copy field views of each chunk.
+"""
+
+import threading
+
+import numpy as np
+
+from .chunks import map_chunks
+from .derived import default_derived_store
+from .stats import default_stats_cache, field_dtype, field_size, member_stats, supports_stats
+from .trace import span
+
+
+class Histogram:
+    """Bin counts and edges, as returned by np.histogram"""
+
+    def __init__(self, counts, edges):
+        self.counts = counts
+        self.edges = edges
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def to_dict(self):
+        return {"counts": self.counts.tolist(), "edges": self.edges.tolist()}
+
+
+def bin_dtype(dtype):
+    """Type np.histogram bins values of dtype in: floating types keep their
+    precision (complex values are binned by magnitude), others use float64"""
+    dtype = np.dtype(dtype)
+    if dtype.kind in "fc":
+        return np.finfo(dtype).dtype
+    return np.dtype(np.float64)
+
+
+def histogram_edges(lo, hi, bins, dtype=np.float64):
+    """Bin edges for [lo, hi] the way np.histogram picks them for values of
+    dtype; lo and hi are Python numbers or scalars of that dtype"""
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1, dtype=bin_dtype(dtype))
+
+
+def bin_chunk(chunk, edges):
+    """Counts of one chunk of values in the given (uniform) bins"""
+    bins = edges.size - 1
+    values = np.asarray(chunk).reshape(-1)
+    with span("histogram.bin", nbytes=values.nbytes):
+        if values.dtype.kind == "c":
+            values = np.abs(values)
+        values = values.astype(edges.dtype, copy=False)
+
+        lo, hi = edges[0], edges[-1]
+        keep = (values >= lo) & (values <= hi)   # also drops NaN
+        if not keep.all():
+            values = values[keep]
+
+        # Computed in the edges' precision, in np.histogram's order
+        idx = (((values - lo) / (hi - lo)) * bins).astype(np.intp)
+        idx[idx == bins] -= 1
+        # Correct for rounding near the edges, as np.histogram does
+        idx[values < edges[idx]] -= 1
+        idx[(values >= edges[idx + 1]) & (idx != bins - 1)] += 1
+        return np.bincount(idx, minlength=bins)
+
+
+def compute_histogram(chunks, edges, workers=None, progress=None):
+    """Sum bin counts over an iterable of chunks using a thread pool.
+
+    progress, if given, is called with the number of values binned so far
+    and may raise to abort.
+    """
+    counts = np.zeros(edges.size - 1, dtype=np.int64)
+    seen = 0
+
+    def add(result):
+        nonlocal seen
+        chunk_counts, n = result
+        counts[:] += chunk_counts
+        seen += n
+        if progress is not None:
+            progress(seen)
+
+    map_chunks(lambda chunk: (bin_chunk(chunk, edges), chunk.size),
+               ((chunk,) for chunk in chunks), workers, add)
+    return Histogram(counts, edges)
+
+
+class HistogramCache:
+    """In-memory cache of histograms keyed by archive, member, field, bins
+    and range, backed by an optional persistent DerivedStore"""
+
+    def __init__(self, max_entries=256, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(archive, name, bins, value_range, field=None):
+        index = archive.index
+        return (index.path, index.mtime_ns, index.file_size, name, field, bins, value_range)
+
+    @staticmethod
+    def _params(archive, name, bins, value_range, field):
+        # The edges' type is part of the key, so entries binned in another
+        # precision never match
+        edges = bin_dtype(field_dtype(archive.index[name].dtype, field)).str
+        return ((bins, value_range, edges) if field is None
+                else (bins, value_range, field, edges))
+
+    def get(self, archive, name, bins, value_range, field=None):
+        key = self.key(archive, name, bins, value_range, field)
+        with self._lock:
+            histogram = self._entries.get(key)
+        if histogram is None and self.store is not None:
+            entry = self.store.get(archive, name, "histogram",
+                                   self._params(archive, name, bins, value_range, field))
+            if entry is not None:
+                histogram = Histogram(entry[1]["counts"], entry[1]["edges"])
+                self._remember(key, histogram)
+        return histogram
+
+    def put(self, archive, name, bins, value_range, histogram, field=None):
+        self._remember(self.key(archive, name, bins, value_range, field), histogram)
+        if self.store is not None:
+            self.store.put(archive, name, "histogram",
+                           self._params(archive, name, bins, value_range, field),
+                           arrays={"counts": histogram.counts, "edges": histogram.edges})
+
+    def _remember(self, key, histogram):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = histogram
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+default_histogram_cache = HistogramCache(store=default_derived_store)
+
+
+def member_histogram(archive, name, bins=100, value_range=None, workers=None,
+                     cache=default_histogram_cache, progress=None, field=None,
+                     stats_cache=default_stats_cache):
+    """Exact histogram of the finite values of an archive member, or of
+    one field of a structured member.
+
+    value_range defaults to the (finite) min and max, taken from
+    member_stats with stats_cache (None to always scan). progress, if given,
+    is called with the fraction done and may raise to abort. Returns None
+    for dtypes that cannot be binned.
+    """
+    info = archive.index[name]
+    if not supports_stats(field_dtype(info.dtype, field)):
+        return None
+    if value_range is not None:
+        value_range = (float(value_range[0]), float(value_range[1]))
+
+    if cache is not None:
+        histogram = cache.get(archive, name, bins, value_range, field)
+        if histogram is not None:
+            return histogram
+
+    total = max(1, field_size(info, field))
+    if value_range is None:
+        # First pass: the range, shared with (and cached by) the stats engine
+        range_progress = None
+        if progress is not None:
+            range_progress = lambda f: progress(0.5 * f)
+        stats = member_stats(archive, name, workers, cache=stats_cache,
+                             progress=range_progress, field=field)
+        if stats.count == 0:
+            lo, hi = 0, 1
+        else:
+            # Scalars of the data's type, as np.histogram takes them
+            lo, hi = stats.min, stats.max
+        bin_progress = None if progress is None else lambda n: progress(0.5 + 0.5 * n / total)
+    else:
+        lo, hi = value_range
+        bin_progress = None if progress is None else lambda n: progress(n / total)
+
+    edges = histogram_edges(lo, hi, bins, field_dtype(info.dtype, field))
+    chunks = (chunk if field is None else chunk[field]
+              for _, chunk in archive.iter_chunks(name))
+    with span("histogram.member", member=name, field=field, bins=bins):
+        histogram = compute_histogram(chunks, edges, workers, bin_progress)
+
+    if cache is not None:
+        cache.put(archive, name, bins, value_range, histogram, field)
+    return histogram
@@ -0,0 +1,244 @@
+"""
+Header-only index of the arrays stored in an .npz archive.
+
+The index is built from the zip central directory and the .npy header of
+each member, so no array payload is ever decompressed. Built indexes are
+cached on disk, keyed by file path, modification time and size.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+from .trace import span
+
+INDEX_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".npzviewer", "index")
+
+# Fixed part of a zip local file header (see APPNOTE.TXT 4.3.7)
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+_LOCAL_HEADER_MAGIC = b"PK\x03\x04"
+
+
+class MemberInfo:
+    """Header information for one array stored in an archive"""
+
+    def __init__(self, name, member, shape, dtype, fortran_order, version,
+                 compress_type, compressed_size, file_size, crc,
+                 member_offset, header_size):
+        self.name = name                    # key as shown by np.load
+        self.member = member                # file name inside the zip
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fortran_order = bool(fortran_order)
+        self.version = tuple(version)       # .npy format version
+        self.compress_type = compress_type
+        self.compressed_size = compressed_size
+        self.file_size = file_size          # uncompressed member size
+        self.crc = crc
+        self.member_offset = member_offset  # start of member bytes in the archive
+        self.header_size = header_size      # length of the .npy header
+
+    @property
+    def compressed(self):
+        return self.compress_type != zipfile.ZIP_STORED
+
+    @property
+    def data_offset(self):
+        """Offset of the array payload, in the archive for stored members
+        and in the decompressed member stream otherwise"""
+        if self.compressed:
+            return self.header_size
+        return self.member_offset + self.header_size
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "member": self.member,
+            "shape": list(self.shape),
+            "descr": repr(npy_format.dtype_to_descr(self.dtype)),
+            "fortran_order": self.fortran_order,
+            "version": list(self.version),
+            "compress_type": self.compress_type,
+            "compressed_size": self.compressed_size,
+            "file_size": self.file_size,
+            "crc": self.crc,
+            "member_offset": self.member_offset,
+            "header_size": self.header_size,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        dtype = npy_format.descr_to_dtype(ast.literal_eval(d["descr"]))
+        return cls(d["name"], d["member"], d["shape"], dtype, d["fortran_order"],
+                   d["version"], d["compress_type"], d["compressed_size"],
+                   d["file_size"], d["crc"], d["member_offset"], d["header_size"])
+
+    def __repr__(self):
+        return (f"MemberInfo({self.name!r}, shape={self.shape}, dtype={self.dtype}, "
+                f"compressed={self.compressed})")
+
+
+class ArchiveIndex:
+    """Ordered collection of MemberInfo for one archive"""
+
+    def __init__(self, path, mtime_ns, file_size, members):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.file_size = file_size
+        self.members = list(members)
+        self._by_name = {m.name: m for m in self.members}
+
+    @property
+    def files(self):
+        """Array names, in archive order (same as NpzFile.files)"""
+        return [m.name for m in self.members]
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self.members)
+
+    def __len__(self):
+        return len(self.members)
+
+    def is_current(self):
+        """True if the archive on disk still matches this index"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return st.st_mtime_ns == self.mtime_ns and st.st_size == self.file_size
+
+    def to_dict(self):
+        return {
+            "version": INDEX_VERSION,
+            "path": self.path,
+            "mtime_ns": self.mtime_ns,
+            "size": self.file_size,
+            "members": [m.to_dict() for m in self.members],
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(d["path"], d["mtime_ns"], d["size"],
+                   [MemberInfo.from_dict(m) for m in d["members"]])
+
+
+def _read_npy_header(fp):
+    """Read magic and header from an .npy stream, returning
+    (version, shape, fortran_order, dtype)"""
+    version = npy_format.read_magic(fp)
+    if version == (1, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_1_0(fp)
+    elif version == (2, 0):
+        shape, fortran_order, dtype = npy_format.read_array_header_2_0(fp)
+    else:
+        # Format 3.0 only differs by using utf8 for the header
+        shape, fortran_order, dtype = npy_format._read_array_header(fp, version)
+    return version, shape, fortran_order, dtype
+
+
+def _member_offset(f, zinfo):
+    """Locate the first byte of a member's data by reading its local header"""
+    f.seek(zinfo.header_offset)
+    fields = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    if fields[0] != _LOCAL_HEADER_MAGIC:
+        raise zipfile.BadZipFile(f"Bad local header for member {zinfo.filename}")
+    name_len, extra_len = fields[-2], fields[-1]
+    return zinfo.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+def build_index(path):
+    """Build an ArchiveIndex by reading only zip metadata and .npy headers"""
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    members = []
+
+    with span("index.build", path=path), open(path, "rb") as raw, zipfile.ZipFile(raw) as zf:
+        for zinfo in zf.infolist():
+            if not zinfo.filename.endswith(".npy"):
+                continue
+            # ZipExtFile inflates lazily, so only the header bytes are decoded
+            with zf.open(zinfo) as fp:
+                version, shape, fortran_order, dtype = _read_npy_header(fp)
+                header_size = fp.tell()
+            members.append(MemberInfo(
+                name=zinfo.filename[:-4],
+                member=zinfo.filename,
+                shape=shape,
+                dtype=dtype,
+                fortran_order=fortran_order,
+                version=version,
+                compress_type=zinfo.compress_type,
+                compressed_size=zinfo.compress_size,
+                file_size=zinfo.file_size,
+                crc=zinfo.CRC,
+                member_offset=_member_offset(raw, zinfo),
+                header_size=header_size,
+            ))
+
+    return ArchiveIndex(path, st.st_mtime_ns, st.st_size, members)
+
+
+def _cache_file(path, cache_dir):
+    key = hashlib.sha1(path.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key + ".json")
+
+
+def load_index(path, cache_dir=DEFAULT_CACHE_DIR):
+    """Return the index for an archive, from the on-disk cache when the
+    archive is unchanged, otherwise by reading its headers.
+
+    Pass cache_dir=None to disable the cache.
+    """
+    path = os.path.abspath(path)
+    if cache_dir is None:
+        return build_index(path)
+
+    cache_path = _cache_file(path, cache_dir)
+    try:
+        with span("index.load", path=path), open(cache_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("version") == INDEX_VERSION and cached.get("path") == path:
+            index = ArchiveIndex.from_dict(cached)
+            if index.is_current():
+                return index
+    except (OSError, ValueError, KeyError, SyntaxError, TypeError):
+        pass
+
+    index = build_index(path)
+
+    # The cache is an optimisation only, so failing to write it is not an error
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index.to_dict(), f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return index
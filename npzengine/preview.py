@@ -0,0 +1,177 @@
+"""
+Text previews of arrays for the info panel and the command line.
+
+A preview shows at most ten rows and columns, so it never needs more than
+the start of an array: member_preview formats one from a bounded read of
+an archive member instead of the decoded array.
+"""
+
+import numpy as np
+
+from .archive import MODE_MMAP
+from .table import format_column
+
+# Rows (and columns) shown by a preview
+PREVIEW_ROWS = 10
+
+# Data decoded at most for a member preview, beyond the leading rows
+PREVIEW_BYTES = 64 * 1024
+
+
+def _leading(data, count):
+    """The first count elements of data in C order, reading only the
+    leading rows that hold them"""
+    if data.ndim == 0:
+        return np.asarray(data).reshape(1)
+    row_size = max(1, int(np.prod(data.shape[1:], dtype=np.int64)))
+    return np.asarray(data[:-(-count // row_size)]).reshape(-1)[:count]
+
+
+def _format_records(records, names):
+    # For structured arrays, show the first records with one column per
+    # field
+    columns = [format_column(records[field]).tolist() for field in names]
+    preview = "Index | " + " | ".join(names) + "\n"
+    preview += "-" * 30 + "\n"
+    for i, row in enumerate(zip(*columns)):
+        preview += f"{i:5d} | " + " | ".join(cell[:12] for cell in row) + "\n"
+    return preview
+
+
+def _format_1d(values):
+    # For 1D arrays, show index and value
+    preview = "Index | Value\n"
+    preview += "-" * 30 + "\n"
+    for i, value in enumerate(values):
+        preview += f"{i:5d} | {value}\n"
+    return preview
+
+
+def _format_2d(block, n_cols):
+    # For 2D arrays, show row indices and columns; block holds the leading
+    # rows and at most n_cols columns
+    preview = "Row |"
+    for col in range(n_cols):
+        preview += f" Col{col} |"
+    preview += "\n" + "-" * (8 * n_cols + 6) + "\n"
+
+    for row in range(block.shape[0]):
+        preview += f"{row:3d} |"
+        for col in range(block.shape[1]):
+            val = block[row, col]
+            # Format the value to keep table tidy
+            if isinstance(val, (int, np.integer)):
+                val_str = f"{val:5d}"
+            else:
+                val_str = f"{val:.4f}"[:6]
+            preview += f" {val_str:>5} |"
+        preview += "\n"
+    return preview
+
+
+def _format_leading(values, shape, order="C"):
+    # For higher dimensional arrays, show the first elements in storage
+    # order with their indices
+    preview = f"First elements ({'Fortran' if order == 'F' else 'C'} order):\n"
+    preview += "-" * 30 + "\n"
+    for i, value in enumerate(values):
+        index = tuple(int(k) for k in np.unravel_index(i, shape, order=order))
+        preview += f"{index}: {value}\n"
+    return preview
+
+
+def format_preview(data):
+    """Format the first rows of an array for the info panel; only the
+    leading rows are read"""
+    if data.dtype.names is not None:
+        return _format_records(_leading(data, PREVIEW_ROWS), data.dtype.names)
+    if data.ndim == 1:
+        return _format_1d(np.asarray(data[:PREVIEW_ROWS]))
+    if data.ndim == 2:
+        n_cols = min(PREVIEW_ROWS, data.shape[1])
+        return _format_2d(np.asarray(data[:PREVIEW_ROWS, :n_cols]), n_cols)
+    return _format_leading(_leading(data, PREVIEW_ROWS), data.shape)
+
+
+def member_preview(archive, name, max_bytes=PREVIEW_BYTES):
+    """format_preview of an archive member from a bounded read.
+
+    Only the header (already in the index) and the start of the member's
+    data are decoded: compressed members are inflated about max_bytes
+    far at most and stored members are read through the memory map, so
+    the preview takes the same time for any array size. A compressed 2D
+    member shows fewer rows (or columns, in Fortran order) when the first
+    ten would lie beyond max_bytes; Fortran-ordered N-D members are
+    previewed in storage order.
+    """
+    info = archive.index[name]
+    shape = info.shape
+    order = "F" if info.fortran_order else "C"
+    read_flat = getattr(archive, "read_flat", None)
+    if read_flat is None or (archive.access_mode(name) == MODE_MMAP
+                             and (order == "C" or info.ndim <= 2)):
+        # Mapped and virtual members read just the leading rows they index
+        return format_preview(archive[name])
+    read = lambda start, count: read_flat(name, start, count)
+    leading = read(0, min(PREVIEW_ROWS, info.size))
+
+    if info.ndim == 2 and info.dtype.names is None:
+        rows, cols = shape
+        n_rows, n_cols = min(PREVIEW_ROWS, rows), min(PREVIEW_ROWS, cols)
+        budget = max(1, max_bytes // max(1, info.dtype.itemsize))
+        if info.size == 0:
+            block = np.empty((n_rows, n_cols), info.dtype)
+        elif order == "C":
+            # Row r's first columns start at element r * cols
+            count = min(n_rows, max(1, (budget - n_cols) // cols + 1))
+            block = np.stack([read(r * cols, n_cols) for r in range(count)])
+        else:
+            count = min(n_cols, max(1, (budget - n_rows) // rows + 1))
+            block = np.stack([read(c * rows, n_rows) for c in range(count)], axis=1)
+        return _format_2d(block, n_cols)
+    if info.ndim > 1 and order == "F":
+        return _format_leading(leading, shape, order)
+    if info.dtype.names is not None:
+        return _format_records(leading, info.dtype.names)
+    if info.ndim == 1:
+        return _format_1d(leading)
+    return _format_leading(leading, shape, order)
+
+
+def member_head(archive, name, n):
+    """The first n entries of a member along every axis, as an array.
+
+    Mapped members are sliced in place; other members are read as one run
+    along the storage order's fastest axis per index of the remaining
+    axes, in file order, so a compressed member is inflated once up to the
+    last of them and never decoded whole.
+    """
+    info = archive.index[name]
+    read_flat = getattr(archive, "read_flat", None)
+    if read_flat is None or archive.access_mode(name) == MODE_MMAP:
+        data = archive[name]
+        return np.asarray(data[tuple(slice(0, n) for _ in range(data.ndim))])
+    if info.ndim == 0:
+        return read_flat(name, 0, 1).reshape(())
+
+    shape = tuple(min(n, size) for size in info.shape)
+    head = np.empty(shape, dtype=info.dtype)
+    if head.size == 0:
+        return head
+    # Axes from fastest to slowest varying in the file, and their strides
+    # in elements
+    axes = list(range(info.ndim))
+    if not info.fortran_order:
+        axes.reverse()
+    strides = dict(zip(axes, np.cumprod([1] + [info.shape[axis] for axis in axes[:-1]])))
+    fast, others = axes[0], sorted(axes[1:])
+    runs = []
+    for index in np.ndindex(*(shape[axis] for axis in others)):
+        key = [slice(None)] * info.ndim
+        for axis, i in zip(others, index):
+            key[axis] = i
+        start = sum(int(strides[axis]) * i for axis, i in zip(others, index))
+        runs.append((start, tuple(key)))
+    for start, key in sorted(runs, key=lambda run: run[0]):
+        head[key] = read_flat(name, start, shape[fast])
+    return head
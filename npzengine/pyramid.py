@@ -0,0 +1,206 @@
+"""
+Multi-resolution tile pyramid for heatmaps of large 2D arrays.
+
+Level 0 is the array itself; each level above halves both dimensions by
+reducing 2x2 blocks of the level below. Every tile stores the per-pixel
+sum, count of finite values and maximum of the native elements it
+covers, so both the block mean and the block max are exact at every
+level: averaging never hides a single hot pixel in the max view.
+
+Tiles are built lazily, the first time a view needs them, from the four
+tiles below (level 0 tiles are read straight from the array, so only
+the regions viewed are touched), and are kept in an LRU cache bounded in
+bytes. viewport() assembles just the tiles covering the requested range
+at the level closest to screen resolution.
+
+The coarse levels, which an overview of the whole array needs but which
+take a full pass over the data to build, can also be kept in a
+persistent tile store (see derived.TileStore).
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .trace import span
+
+DEFAULT_TILE_SIZE = 256
+DEFAULT_CACHE_BYTES = 256 << 20
+
+# Levels this far below the top are saved to the tile store, if any
+PERSISTENT_LEVELS = 3
+
+STATS = ("mean", "max")
+
+
+class _Tile:
+    __slots__ = ("sum", "count", "max", "nbytes")
+
+    def __init__(self, sum_, count, max_):
+        self.sum = sum_
+        self.count = count
+        self.max = max_
+        self.nbytes = sum_.nbytes + count.nbytes + max_.nbytes
+
+    def arrays(self):
+        return {"sum": self.sum, "count": self.count, "max": self.max}
+
+    def values(self, stat):
+        if stat == "max":
+            return np.where(self.count > 0, self.max, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.sum / self.count
+
+
+def _pool2(a, fill, reduce):
+    """Reduce 2x2 blocks of a, padding odd edges with fill"""
+    h, w = a.shape
+    if h % 2 or w % 2:
+        padded = np.full((h + h % 2, w + w % 2), fill, dtype=a.dtype)
+        padded[:h, :w] = a
+        a = padded
+    return reduce(a.reshape(a.shape[0] // 2, 2, a.shape[1] // 2, 2), axis=(1, 3))
+
+
+class TilePyramid:
+    """Lazily built mean/max mipmap over a 2D array"""
+
+    def __init__(self, data, tile_size=DEFAULT_TILE_SIZE, cache_bytes=DEFAULT_CACHE_BYTES,
+                 store=None):
+        if data.ndim != 2:
+            raise ValueError("TilePyramid needs a 2D array")
+        self.data = data
+        self.tile_size = tile_size
+        self.cache_bytes = cache_bytes
+        self.store = store
+        self.height, self.width = data.shape
+        longest = max(1, self.height, self.width)
+        self.top_level = max(0, math.ceil(math.log2(longest / tile_size)))
+
+        self._tiles = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def level_shape(self, level):
+        """(rows, cols) of the image at a level"""
+        f = 1 << level
+        return -(-self.height // f), -(-self.width // f)
+
+    def _cache_get(self, key):
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def _cache_put(self, key, tile):
+        with self._lock:
+            if key in self._tiles:
+                return
+            self._tiles[key] = tile
+            self._cached_bytes += tile.nbytes
+            while self._cached_bytes > self.cache_bytes and len(self._tiles) > 1:
+                _, old = self._tiles.popitem(last=False)
+                self._cached_bytes -= old.nbytes
+
+    def tile(self, level, ty, tx, check=None):
+        """The tile at (ty, tx) of a level, building it if needed.
+
+        check, if given, is called before each level 0 read and may raise
+        to abort.
+        """
+        key = (level, ty, tx)
+        tile = self._cache_get(key)
+        if tile is not None:
+            return tile
+
+        persistent = (self.store is not None and level > 0
+                      and level >= self.top_level - PERSISTENT_LEVELS)
+        if persistent:
+            arrays = self.store.get((self.tile_size, level, ty, tx))
+            if arrays is not None:
+                tile = _Tile(arrays["sum"], arrays["count"], arrays["max"])
+                self._cache_put(key, tile)
+                return tile
+
+        t = self.tile_size
+        if level == 0:
+            if check is not None:
+                check()
+            with span("pyramid.tile", level=0) as sp:
+                block = np.asarray(self.data[ty * t:(ty + 1) * t, tx * t:(tx + 1) * t])
+                sp.add_bytes(block.nbytes)
+                if block.dtype.kind == "c":
+                    block = np.abs(block)
+                block = block.astype(np.float64)
+                finite = np.isfinite(block)
+                tile = _Tile(np.where(finite, block, 0.0),
+                             finite.astype(np.int64),
+                             np.where(finite, block, -np.inf))
+        else:
+            rows, cols = self.level_shape(level - 1)
+            child_rows = -(-rows // t)
+            child_cols = -(-cols // t)
+            parts = [[self.tile(level - 1, 2 * ty + dy, 2 * tx + dx, check)
+                      for dx in (0, 1) if 2 * tx + dx < child_cols]
+                     for dy in (0, 1) if 2 * ty + dy < child_rows]
+            with span("pyramid.tile", level=level):
+                sums = np.block([[p.sum for p in row] for row in parts])
+                counts = np.block([[p.count for p in row] for row in parts])
+                maxes = np.block([[p.max for p in row] for row in parts])
+                tile = _Tile(_pool2(sums, 0.0, np.sum),
+                             _pool2(counts, 0, np.sum),
+                             _pool2(maxes, -np.inf, np.max))
+            if persistent:
+                self.store.put((self.tile_size, level, ty, tx), tile.arrays())
+
+        self._cache_put(key, tile)
+        return tile
+
+    def level_for(self, rows, cols, out_height, out_width):
+        """Coarsest level whose image of a rows x cols view is about the
+        screen size along its longer (relative) axis"""
+        scale = max(rows / max(1, out_height), cols / max(1, out_width))
+        if scale <= 1:
+            return 0
+        return min(self.top_level, int(math.floor(math.log2(scale))))
+
+    def viewport(self, r0, r1, c0, c1, out_height, out_width, stat="mean", check=None):
+        """Image of native rows [r0, r1) and columns [c0, c1) at screen
+        resolution.
+
+        Returns (image, (row_start, row_stop, col_start, col_stop)) where
+        the bounds are the native range actually covered by the image,
+        which is the requested range widened to whole level pixels.
+        check, if given, is called while tiles are built and may raise.
+        """
+        r0, r1 = max(0, int(r0)), min(self.height, int(r1))
+        c0, c1 = max(0, int(c0)), min(self.width, int(c1))
+        if r1 <= r0 or c1 <= c0:
+            return np.full((1, 1), np.nan), (r0, r0 + 1, c0, c0 + 1)
+
+        level = self.level_for(r1 - r0, c1 - c0, out_height, out_width)
+        f = 1 << level
+        t = self.tile_size
+        rows, cols = self.level_shape(level)
+
+        # Range in level pixels, then in tiles
+        lr0, lr1 = r0 // f, min(rows, -(-r1 // f))
+        lc0, lc1 = c0 // f, min(cols, -(-c1 // f))
+        ty0, ty1 = lr0 // t, -(-lr1 // t)
+        tx0, tx1 = lc0 // t, -(-lc1 // t)
+
+        with span("pyramid.viewport", level=level):
+            grid = []
+            for ty in range(ty0, ty1):
+                row = []
+                for tx in range(tx0, tx1):
+                    row.append(self.tile(level, ty, tx, check).values(stat))
+                grid.append(row)
+            mosaic = np.block(grid)
+
+        image = mosaic[lr0 - ty0 * t:lr1 - ty0 * t, lc0 - tx0 * t:lc1 - tx0 * t]
+        bounds = (lr0 * f, min(self.height, lr1 * f), lc0 * f, min(self.width, lc1 * f))
+        return image, bounds
@@ -0,0 +1,620 @@
+"""
+Row filters: a small expression language compiled to vectorized NumPy.
+
+    col[3] > 5 and isnan(col[1])
+    temperature > 300 and station in (3, 7)
+    any(col < 0) or index % 1000 == 0
+
+Rows are those of the data table (table.TableModel): the elements of a
+1D array, the rows of a 2D array, the rows over the leading axes of an
+N-D array and the records of a structured array. A filter can refer to
+
+    value          the element of a 1D array
+    col[j], cj     column j of a 2D or N-D array (negative j counts from the end)
+    col            the whole row, for any(...), all(...) and the other row reductions
+    <field>        a field of a structured array, field[j] for sub-array
+                   fields, or col["field"] for any field name
+    index, row     the row number
+
+combined with arithmetic, comparisons (chained too), and, or, not, the
+bitwise &, |, ^, ~, "in" and "not in" over a literal list, the constants
+nan, inf, true and false, the element functions isnan, isinf, isfinite,
+abs, sqrt, log, log10, exp, floor and ceil, and the row reductions any,
+all, sum, min, max and mean.
+
+The filter is parsed with the ast module and checked against that
+grammar before anything runs, then compiled into a tree of closures
+over NumPy operations, so each block of rows is filtered with whole-array
+operations and no Python code runs per row. Blocks are memory-mapped
+views or are inflated from compressed members one at a time, and are
+filtered on a thread pool. The result is a Selection: the sorted int64
+numbers of the matching rows. Selection.view wraps them around the array
+as a lazy array-like that the table, statistics, histograms and scatter
+plots read like the array itself, gathering only the rows they touch.
+"""
+
+import ast
+import operator
+import re
+
+import numpy as np
+
+from .archive import chunk_elements
+from .chunks import map_chunks
+from .histogram import Histogram, bin_chunk, histogram_edges
+from .stats import ArrayStats, numeric_fields, reduce_chunk, supports_stats
+from .trace import span
+
+
+class QueryError(ValueError):
+    """A filter that is not valid for the array it is applied to"""
+
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+}
+
+_UNARY = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+    ast.Invert: np.invert,
+    ast.Not: np.logical_not,
+}
+
+_FUNCTIONS = {
+    "isnan": np.isnan,
+    "isinf": np.isinf,
+    "isfinite": np.isfinite,
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "log10": np.log10,
+    "exp": np.exp,
+    "floor": np.floor,
+    "ceil": np.ceil,
+}
+
+# Reduce every axis but the first, so a row (or a sub-array field)
+# becomes one value per row
+_REDUCTIONS = {
+    "any": np.any,
+    "all": np.all,
+    "sum": np.sum,
+    "min": np.min,
+    "max": np.max,
+    "mean": np.mean,
+}
+
+_CONSTANTS = {"nan": np.nan, "inf": np.inf, "true": True, "false": False}
+
+_COLUMN_NAME = re.compile(r"c(\d+)$")
+
+
+def table_rows(shape, dtype):
+    """(rows, elements per row in storage) of an array laid out as the
+    data table shows it"""
+    shape = tuple(shape)
+    if np.dtype(dtype).names is not None or len(shape) <= 1:
+        return int(np.prod(shape, dtype=np.int64)), 1
+    return int(np.prod(shape[:-1], dtype=np.int64)), shape[-1]
+
+
+class Query:
+    """A filter expression compiled for arrays of one shape and dtype.
+
+    evaluate(block, row0) takes a block of consecutive rows, laid out as
+    row_view lays them out, and returns a boolean mask with one entry per
+    row. Raises QueryError for syntax errors and for names, functions or
+    columns the array does not have.
+    """
+
+    def __init__(self, text, shape, dtype):
+        self.text = text.strip()
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fields = self.dtype.names
+        self.n_rows, self.n_cols = table_rows(self.shape, self.dtype)
+        if not self.text:
+            raise QueryError("Empty filter")
+        try:
+            tree = ast.parse(self.text, mode="eval")
+        except SyntaxError as e:
+            raise QueryError(f"Invalid filter: {e.msg}") from None
+        self._fn = self._compile(tree.body)
+
+    def __repr__(self):
+        return f"Query({self.text!r})"
+
+    def evaluate(self, block, row0=0):
+        """Boolean mask of the rows of block that match"""
+        n = len(block)
+        try:
+            with np.errstate(all="ignore"):
+                mask = np.asarray(self._fn(block, row0))
+        except (TypeError, ValueError, IndexError, ArithmeticError) as e:
+            raise QueryError(f"Cannot evaluate {self.text!r} on {self.dtype} values: {e}") from None
+        if mask.dtype.kind != "b":
+            if mask.dtype.kind not in "iu":
+                raise QueryError(f"{self.text!r} is not a condition")
+            # Like Python, a nonzero number (e.g. flags & 4) counts as true
+            mask = mask != 0
+        if mask.ndim == 0:
+            return np.full(n, bool(mask))
+        if mask.shape != (n,):
+            raise QueryError(f"{self.text!r} gives several values per row; "
+                             f"combine them with any(...) or all(...)")
+        return mask
+
+    # Compilation: each node becomes a function of (block, row0)
+
+    def _source(self, node):
+        return ast.get_source_segment(self.text, node) or type(node).__name__
+
+    def _compile(self, node):
+        compile_node = getattr(self, f"_compile_{type(node).__name__.lower()}", None)
+        if compile_node is None:
+            raise QueryError(f"{self._source(node)!r} is not supported in filters")
+        return compile_node(node)
+
+    def _compile_constant(self, node):
+        value = node.value
+        if not isinstance(value, (bool, int, float, complex, str, bytes)):
+            raise QueryError(f"{self._source(node)!r} is not supported in filters")
+        return lambda block, row0: value
+
+    def _compile_name(self, node):
+        name = node.id
+        if self.fields is not None:
+            if name in self.fields:
+                return lambda block, row0: block[name]
+        elif name == "value" and len(self.shape) <= 1:
+            return lambda block, row0: block
+        elif name == "col" and len(self.shape) >= 2:
+            return lambda block, row0: block
+        elif _COLUMN_NAME.match(name) and len(self.shape) >= 2:
+            return self._column(int(name[1:]), node)
+        if name in ("index", "row"):
+            return lambda block, row0: np.arange(row0, row0 + len(block), dtype=np.int64)
+        if name in _CONSTANTS:
+            value = _CONSTANTS[name]
+            return lambda block, row0: value
+        raise QueryError(f"Unknown name {name!r}; {self._names()}")
+
+    def _names(self):
+        if self.fields is not None:
+            return "fields are " + ", ".join(self.fields)
+        if len(self.shape) <= 1:
+            return "use value for the element and index for the row number"
+        return f"use col[0] to col[{self.n_cols - 1}] for columns and index for the row number"
+
+    def _column(self, j, node):
+        if not -self.n_cols <= j < self.n_cols:
+            raise QueryError(f"{self._source(node)!r}: there are {self.n_cols} columns")
+        return lambda block, row0: block[:, j]
+
+    def _compile_subscript(self, node):
+        target = node.value
+        if not isinstance(target, ast.Name):
+            raise QueryError(f"{self._source(node)!r}: only col and fields can be indexed")
+        try:
+            key = ast.literal_eval(node.slice)
+        except ValueError:
+            raise QueryError(f"{self._source(node)!r}: indices must be literal numbers") from None
+
+        if target.id == "col" and self.fields is not None:
+            if key not in self.fields:
+                raise QueryError(f"{self._source(node)!r}: {self._names()}")
+            return lambda block, row0: block[key]
+        if target.id == "col" and len(self.shape) >= 2:
+            if not isinstance(key, int):
+                raise QueryError(f"{self._source(node)!r}: columns are numbered")
+            return self._column(key, node)
+
+        if self.fields is None or target.id not in self.fields:
+            raise QueryError(f"{self._source(node)!r}: only col and fields can be indexed")
+        field = target.id
+        sub_shape = self.dtype[field].shape
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) > len(sub_shape) or not all(isinstance(k, int) for k in key):
+            raise QueryError(f"{self._source(node)!r}: {field} has shape {sub_shape}")
+        for k, n in zip(key, sub_shape):
+            if not -n <= k < n:
+                raise QueryError(f"{self._source(node)!r}: {field} has shape {sub_shape}")
+        index = (slice(None),) + key
+        return lambda block, row0: block[field][index]
+
+    def _compile_boolop(self, node):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        operands = [self._compile(value) for value in node.values]
+
+        def evaluate(block, row0):
+            result = operands[0](block, row0)
+            for operand in operands[1:]:
+                result = combine(result, operand(block, row0))
+            return result
+        return evaluate
+
+    def _compile_unaryop(self, node):
+        op = _UNARY[type(node.op)]
+        operand = self._compile(node.operand)
+        return lambda block, row0: op(operand(block, row0))
+
+    def _compile_binop(self, node):
+        op = _BINARY.get(type(node.op))
+        if op is None:
+            raise QueryError(f"{self._source(node)!r} is not supported in filters")
+        left, right = self._compile(node.left), self._compile(node.right)
+        return lambda block, row0: op(left(block, row0), right(block, row0))
+
+    def _compile_compare(self, node):
+        steps = []
+        operands = [node.left] + node.comparators
+        for op, left, right in zip(node.ops, operands, operands[1:]):
+            steps.append(self._comparison(op, left, right))
+
+        def evaluate(block, row0):
+            # a < b < c is a < b and b < c, as in Python
+            result = steps[0](block, row0)
+            for step in steps[1:]:
+                result = np.logical_and(result, step(block, row0))
+            return result
+        return evaluate
+
+    def _comparison(self, op, left, right):
+        fn = self._compile(left)
+        if isinstance(op, (ast.In, ast.NotIn)):
+            try:
+                values = ast.literal_eval(right)
+            except ValueError:
+                raise QueryError(f"{self._source(right)!r}: 'in' needs a literal list") from None
+            if not isinstance(values, (tuple, list, set)):
+                values = (values,)
+            values = np.array(list(values))
+            invert = isinstance(op, ast.NotIn)
+            return lambda block, row0: np.isin(fn(block, row0), values, invert=invert)
+        compare = _COMPARE.get(type(op))
+        if compare is None:
+            raise QueryError(f"{type(op).__name__} comparisons are not supported in filters")
+        other = self._compile(right)
+        return lambda block, row0: compare(fn(block, row0), other(block, row0))
+
+    def _compile_call(self, node):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if name not in _FUNCTIONS and name not in _REDUCTIONS:
+            raise QueryError(f"{self._source(node.func)!r} is not a filter function; use "
+                             + ", ".join(list(_FUNCTIONS) + list(_REDUCTIONS)))
+        if len(node.args) != 1 or node.keywords:
+            raise QueryError(f"{name}() takes one argument")
+        arg = self._compile(node.args[0])
+        if name in _FUNCTIONS:
+            fn = _FUNCTIONS[name]
+            return lambda block, row0: fn(arg(block, row0))
+
+        reduce = _REDUCTIONS[name]
+
+        def evaluate(block, row0):
+            values = np.asarray(arg(block, row0))
+            if values.ndim < 2:
+                return values
+            return reduce(values, axis=tuple(range(1, values.ndim)))
+        return evaluate
+
+
+def row_view(data):
+    """data with one table row per index of its first axis, without
+    copying; None when only a gather can produce the rows (N-D arrays
+    that are not C-contiguous)"""
+    if data.ndim == 0:
+        return data.reshape(1)
+    if data.ndim == 1 or (data.ndim == 2 and data.dtype.names is None):
+        return data
+    if isinstance(data, np.ndarray) and not data.flags.c_contiguous:
+        return None
+    # Lazy array-likes (concat.ConcatArray) reshape into lazy views
+    if data.dtype.names is not None:
+        return data.reshape(-1)
+    return data.reshape(-1, data.shape[-1])
+
+
+def take_rows(data, rows, view=None):
+    """The given table rows of data, gathered into an array"""
+    if view is None:
+        view = row_view(data)
+    if view is not None:
+        return view[rows]
+    if data.dtype.names is not None:
+        return data[np.unravel_index(rows, data.shape)]
+    return data[np.unravel_index(rows, data.shape[:-1])]
+
+
+def _c_order(archive, name):
+    """True when the member (every shard of a virtual member) is stored
+    in C order, so its storage-order chunks are whole rows"""
+    shards = getattr(archive, "shards", None)
+    members = shards(name) if shards is not None else [(archive, name)]
+    return not any(shard.index[member].fortran_order for shard, member in members)
+
+
+def row_blocks(archive, name, data=None, block_rows=None):
+    """Yield (first row, block of rows) over a member, laid out as
+    row_view lays them out.
+
+    Without data, C-order members are read chunk by chunk in storage
+    order: memory-mapped members as views, compressed ones inflated a
+    chunk at a time. Otherwise (data given, or a Fortran-order member)
+    the rows are sliced from the array, or gathered when it has no row
+    view.
+    """
+    info = archive.index[name]
+    n_rows, row_size = table_rows(info.shape, info.dtype)
+    if block_rows is None:
+        block_rows = max(1, chunk_elements(info.dtype) // max(1, row_size))
+
+    if data is None and row_size > 0 and _c_order(archive, name):
+        numeric = info.dtype.names is None and info.ndim >= 2
+        for offset, chunk in archive.iter_chunks(name, block_rows * row_size):
+            yield offset // row_size, chunk.reshape(-1, row_size) if numeric else chunk
+        return
+
+    if data is None:
+        data = archive[name]
+    view = row_view(data)
+    for start in range(0, n_rows, block_rows):
+        stop = min(start + block_rows, n_rows)
+        if view is not None:
+            yield start, view[start:stop]
+        else:
+            yield start, take_rows(data, np.arange(start, stop), view)
+
+
+class Selection:
+    """The rows of an array that match a filter, as sorted int64 row
+    numbers of the data table"""
+
+    def __init__(self, rows, n_rows, text):
+        self.rows = rows
+        self.n_rows = n_rows
+        self.text = text
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"Selection({self.text!r}, {len(self.rows):,} of {self.n_rows:,} rows)"
+
+    def view(self, data):
+        """Lazy array-like of the selected rows of data"""
+        return SelectedRows(data, self.rows)
+
+
+def filter_rows(archive, name, text, data=None, workers=None, progress=None, block_rows=None):
+    """Selection of the rows of a member that match a filter.
+
+    Blocks of rows (see row_blocks) are filtered on a thread pool; pass
+    data to filter an array already in memory. progress, if given, is
+    called with the fraction done and may raise to abort. Raises
+    QueryError for filters that do not fit the member.
+    """
+    info = archive.index[name]
+    query = Query(text, info.shape, info.dtype)
+    parts = []
+    done = 0
+
+    def evaluate(row0, block):
+        with span("query.block", nbytes=block.nbytes, rows=len(block)):
+            return len(block), np.flatnonzero(query.evaluate(block, row0)) + row0
+
+    def combine(result):
+        nonlocal done
+        n, rows = result
+        parts.append(rows)
+        done += n
+        if progress is not None:
+            progress(done / max(1, query.n_rows))
+
+    with span("query.member", member=name):
+        map_chunks(evaluate, row_blocks(archive, name, data, block_rows), workers, combine)
+    rows = np.concatenate(parts).astype(np.int64, copy=False) if parts else np.zeros(0, np.int64)
+    return Selection(rows, query.n_rows, query.text)
+
+
+class SelectedRows:
+    """Read-only array-like of selected rows of an array, in the layout
+    of the data table: shape (k,) for 1D and structured arrays, (k,
+    columns) otherwise. Supports integer, slice and integer/boolean array
+    indexing on axis 0, with any NumPy index on the other axes, and field
+    names; only the rows an index touches are gathered from the array.
+    """
+
+    def __init__(self, data, rows, field=None):
+        self.data = data
+        self.rows = rows
+        self.field = field
+        view = row_view(data)
+        if field is not None:
+            dtype = data.dtype[field]
+            self.dtype, trailing = dtype.base, dtype.shape
+            # Gathering a field view reads just that field
+            view = None if view is None else view[field]
+        elif data.dtype.names is not None or data.ndim <= 1:
+            self.dtype, trailing = data.dtype, ()
+        else:
+            self.dtype, trailing = data.dtype, (data.shape[-1],)
+        self._view = view
+        self.shape = (len(rows),) + trailing
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    @property
+    def block_rows(self):
+        """Rows per block for chunked passes over the selection"""
+        return max(1, chunk_elements(self.dtype) // max(1, self.size // max(1, len(self))))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f"SelectedRows(shape={self.shape}, dtype={self.dtype}, of={self.data.shape})"
+
+    def row_numbers(self, start, stop):
+        """Numbers of selected rows [start, stop) in the whole array"""
+        return self.rows[start:stop]
+
+    def row_label(self, row):
+        """Data table label of a selected row: its label in the whole array"""
+        r = int(self.rows[row])
+        data = self.data
+        if data.dtype.names is not None and data.ndim > 1:
+            return str(tuple(int(i) for i in np.unravel_index(r, data.shape)))
+        if data.ndim <= 2 or data.dtype.names is not None:
+            return str(r)
+        return str(tuple(int(i) for i in np.unravel_index(r, data.shape[:-1])))
+
+    def _gather(self, rows):
+        with span("query.gather", rows=len(rows)):
+            if self._view is not None:
+                return self._view[rows]
+            values = take_rows(self.data, rows)
+            return values if self.field is None else values[self.field]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if self.field is not None or self.data.dtype.names is None:
+                raise KeyError(key)
+            return SelectedRows(self.data, self.rows, key)
+        if not isinstance(key, tuple):
+            key = (key,)
+        if key and key[0] is Ellipsis:
+            key = (slice(None),) + key
+        first, rest = (key[0], key[1:]) if key else (slice(None), ())
+        if first is None:
+            raise IndexError("SelectedRows cannot insert an axis before axis 0")
+
+        picked = self.rows[first]
+        if np.ndim(picked) == 0:
+            return self._gather(np.array([picked]))[(0,) + rest]
+        return self._gather(picked)[(slice(None),) + rest]
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+
+def _row_ranges(n_rows, block_rows):
+    for start in range(0, n_rows, block_rows):
+        yield start, min(start + block_rows, n_rows)
+
+
+def selection_stats(view, field=None, workers=None, progress=None):
+    """ArrayStats of the values of a SelectedRows view, or of one of its
+    fields; None for dtypes that cannot be summarised.
+
+    Rows are gathered and reduced block by block on a thread pool.
+    progress, if given, is called with the fraction done.
+    """
+    values = view if field is None else view[field]
+    if not supports_stats(values.dtype):
+        return None
+    result = ArrayStats()
+    done = 0
+
+    def reduce(start, stop):
+        return reduce_chunk(values[start:stop]), stop - start
+
+    def merge(partial):
+        nonlocal done
+        stats, n = partial
+        result.merge(stats)
+        done += n
+        if progress is not None:
+            progress(done / max(1, len(values)))
+
+    map_chunks(reduce, _row_ranges(len(values), values.block_rows), workers, merge)
+    return result
+
+
+def selection_field_stats(view, workers=None, progress=None):
+    """{field: ArrayStats or None} of a SelectedRows view of a structured
+    array, every numeric field reduced in the same pass"""
+    fields = numeric_fields(view.dtype)
+    results = {field: ArrayStats() for field in fields}
+    done = 0
+
+    def reduce(start, stop):
+        records = view[start:stop]
+        return {field: reduce_chunk(records[field]) for field in fields}, stop - start
+
+    def merge(partial):
+        nonlocal done
+        stats, n = partial
+        for field in fields:
+            results[field].merge(stats[field])
+        done += n
+        if progress is not None:
+            progress(done / max(1, len(view)))
+
+    map_chunks(reduce, _row_ranges(len(view), view.block_rows), workers, merge)
+    return {field: results.get(field) for field in view.dtype.names}
+
+
+def selection_histogram(view, bins=100, value_range=None, field=None, workers=None, progress=None):
+    """Exact histogram of the finite values of a SelectedRows view, or of
+    one of its fields; None for dtypes that cannot be binned.
+
+    value_range defaults to the (finite) min and max, found in a first
+    pass. progress, if given, is called with the fraction done.
+    """
+    values = view if field is None else view[field]
+    if not supports_stats(values.dtype):
+        return None
+    bin_progress = progress
+    if value_range is None:
+        stats = selection_stats(values, workers=workers,
+                                progress=None if progress is None else lambda f: progress(0.5 * f))
+        value_range = (0, 1) if stats.count == 0 else (stats.min, stats.max)
+        if progress is not None:
+            bin_progress = lambda f: progress(0.5 + 0.5 * f)
+
+    edges = histogram_edges(*value_range, bins, values.dtype)
+    counts = np.zeros(bins, dtype=np.int64)
+    done = 0
+
+    def add(partial):
+        nonlocal done
+        chunk_counts, n = partial
+        counts[:] += chunk_counts
+        done += n
+        if bin_progress is not None:
+            bin_progress(done / max(1, len(values)))
+
+    map_chunks(lambda start, stop: (bin_chunk(values[start:stop], edges), stop - start),
+                _row_ranges(len(values), values.block_rows), workers, add)
+    return Histogram(counts, edges)
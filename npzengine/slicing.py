@@ -0,0 +1,158 @@
+"""
+2D slices of N-D archive members.
+
+A slice shows two chosen axes with every other axis fixed at an index.
+Only the slice is read: as a strided view for memory-mapped or loaded
+arrays, or, for compressed members, by inflating the byte range that
+holds the slice's elements chunk by chunk and keeping just those
+elements, so memory stays bounded even when the range spans most of the
+member (a leading axis displayed). Slices are kept in a small LRU cache
+and neighbours along an axis can be prefetched in the background, so
+stepping through a volume plays back without waiting on I/O.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .archive import MODE_EAGER
+from .trace import span
+
+
+def slice_index(ndim, row_axis, col_axis, indices):
+    """Indexing tuple selecting a 2D slice; indices holds one entry per
+    axis (entries for the displayed axes are ignored)"""
+    return tuple(slice(None) if axis in (row_axis, col_axis) else int(indices[axis])
+                 for axis in range(ndim))
+
+
+class SliceReader:
+    """Reads 2D slices of one archive member"""
+
+    def __init__(self, archive, name, data=None, cache_slices=16):
+        self.archive = archive
+        self.name = name
+        self.info = archive.index[name]
+        self.data = data
+        self.cache_slices = cache_slices
+        self._cache = OrderedDict()
+        # Reentrant: cancelling a prefetch runs its done callback at once
+        self._lock = threading.RLock()
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}  # key -> future of a queued or running prefetch
+
+        # Without a loaded array, compressed members are read through the
+        # stream; everything else is sliced from the (mapped) array
+        self._streamed = data is None and archive.access_mode(name) == MODE_EAGER
+        if data is None and not self._streamed:
+            self.data = archive[name]
+
+    @property
+    def shape(self):
+        return self.info.shape
+
+    def _key(self, row_axis, col_axis, indices):
+        fixed = tuple(int(i) for axis, i in enumerate(indices) if axis not in (row_axis, col_axis))
+        return row_axis, col_axis, fixed
+
+    def _read_streamed(self, row_axis, col_axis, indices):
+        """Inflate the byte range that holds the slice a chunk at a time,
+        gathering the slice's elements from each chunk"""
+        info = self.info
+        shape = info.shape
+        # Element strides of the storage layout
+        strides = [1] * len(shape)
+        axes = range(len(shape)) if info.fortran_order else reversed(range(len(shape)))
+        step = 1
+        for axis in axes:
+            strides[axis] = step
+            step *= shape[axis]
+
+        base = sum(int(indices[a]) * strides[a] for a in range(len(shape))
+                   if a not in (row_axis, col_axis))
+        offsets = (base
+                   + np.arange(shape[row_axis], dtype=np.int64)[:, np.newaxis] * strides[row_axis]
+                   + np.arange(shape[col_axis], dtype=np.int64)[np.newaxis, :] * strides[col_axis])
+        values = np.empty(offsets.size, dtype=info.dtype)
+        if not offsets.size:
+            return values.reshape(offsets.shape)
+        wanted = offsets.reshape(-1)
+        order = np.argsort(wanted, kind="stable")
+        wanted = wanted[order]
+        lo = 0
+        for offset, chunk in self.archive.iter_chunks(self.name, start=int(wanted[0]),
+                                                      stop=int(wanted[-1]) + 1):
+            hi = int(np.searchsorted(wanted, offset + chunk.size))
+            values[order[lo:hi]] = chunk[wanted[lo:hi] - offset]
+            lo = hi
+        return values.reshape(offsets.shape)
+
+    def _read(self, row_axis, col_axis, indices):
+        if self._streamed:
+            return self._read_streamed(row_axis, col_axis, indices)
+        view = self.data[slice_index(self.data.ndim, row_axis, col_axis, indices)]
+        if row_axis > col_axis:
+            view = view.T
+        if self.archive.access_mode(self.name) != MODE_EAGER:
+            # Copy out of the map so the pages are read now, not at draw time
+            return np.array(view)
+        return view
+
+    def read(self, row_axis, col_axis, indices):
+        """The 2D slice with row_axis down and col_axis across"""
+        if row_axis == col_axis:
+            raise ValueError("The two displayed axes must differ")
+        key = self._key(row_axis, col_axis, indices)
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                return result
+
+        with span("slice.read", member=self.name) as sp:
+            result = self._read(row_axis, col_axis, indices)
+            sp.add_bytes(result.nbytes)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_slices:
+                self._cache.popitem(last=False)
+        return result
+
+    def prefetch(self, row_axis, col_axis, indices, axis, radius=1):
+        """Read the slices next to indices along axis in the background.
+
+        Slices already cached or queued are not read twice, and queued
+        reads that are no longer next to indices are cancelled, so
+        scrubbing along an axis never builds a backlog of stale slices.
+        """
+        neighbours = {}
+        for delta in range(-radius, radius + 1):
+            i = int(indices[axis]) + delta
+            if delta == 0 or not 0 <= i < self.shape[axis]:
+                continue
+            neighbour = list(indices)
+            neighbour[axis] = i
+            neighbours[self._key(row_axis, col_axis, neighbour)] = neighbour
+
+        with self._lock:
+            for key in [key for key in self._pending if key not in neighbours]:
+                # A read already running finishes (and is cached); a queued one is dropped
+                if self._pending[key].cancel():
+                    self._pending.pop(key, None)
+            for key, neighbour in neighbours.items():
+                if key in self._cache or key in self._pending:
+                    continue
+                future = self._pool.submit(self.read, row_axis, col_axis, neighbour)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._prefetched(key, f))
+
+    def _prefetched(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
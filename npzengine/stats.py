@@ -0,0 +1,380 @@
+"""
+Single-pass, chunked statistics for archive members.
+
+Each chunk is reduced to an ArrayStats accumulator (count, min, max,
+mean and sum of squared deviations, plus NaN/Inf/zero counts) and the
+partial results are merged with Chan's parallel update, so the whole
+array is read once and no full-size temporaries are allocated. Chunks
+are reduced on a thread pool, since NumPy reductions release the GIL.
+
+Min, max, mean and variance are computed over finite values only; NaN
+and infinite values are counted separately. Complex values are
+summarised by their magnitude. Structured arrays are summarised field
+by field, reducing zero-copy field views of each chunk.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .archive import chunk_elements
+from .chunks import map_chunks
+from .derived import default_derived_store
+from .trace import span
+
+
+def supports_stats(dtype):
+    """True for dtypes the statistics engine can summarise"""
+    return np.dtype(dtype).kind in "biufc"
+
+
+def numeric_fields(dtype):
+    """Fields of a structured dtype that can be summarised, in order"""
+    dtype = np.dtype(dtype)
+    return [field for field in dtype.names or () if supports_stats(dtype[field].base)]
+
+
+def field_dtype(dtype, field=None):
+    """Element dtype of a field, or dtype itself for field None"""
+    dtype = np.dtype(dtype)
+    return dtype if field is None else dtype[field].base
+
+
+def field_size(info, field=None):
+    """Number of values of one field (sub-array fields hold several per record)"""
+    if field is None:
+        return info.size
+    return info.size * int(np.prod(info.dtype[field].shape, dtype=np.int64))
+
+
+class ArrayStats:
+    """Mergeable accumulator of summary statistics"""
+
+    def __init__(self):
+        self.total = 0          # elements seen, including NaN/Inf
+        self.count = 0          # finite elements
+        self.nan_count = 0
+        self.inf_count = 0
+        self.zero_count = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0           # sum of squared deviations from the mean
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else float("nan")
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    def update(self, chunk):
+        """Fold a block of values into the accumulator"""
+        self.merge(reduce_chunk(chunk))
+        return self
+
+    def merge(self, other):
+        """Combine with another accumulator (Chan et al.)"""
+        self.total += other.total
+        self.nan_count += other.nan_count
+        self.inf_count += other.inf_count
+        self.zero_count += other.zero_count
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "count": self.count,
+            "nan_count": self.nan_count,
+            "inf_count": self.inf_count,
+            "zero_count": self.zero_count,
+            "min": None if self.min is None else self.min.item(),
+            "max": None if self.max is None else self.max.item(),
+            "mean": self.mean if self.count else None,
+            "variance": self.variance if self.count else None,
+            "std": self.std if self.count else None,
+        }
+
+    def __repr__(self):
+        return (f"ArrayStats(total={self.total}, min={self.min}, max={self.max}, "
+                f"mean={self.mean}, std={self.std})")
+
+
+def reduce_chunk(chunk):
+    """Reduce one block of values to an ArrayStats"""
+    stats = ArrayStats()
+    chunk = np.asarray(chunk).reshape(-1)
+    if chunk.dtype.kind == "c":
+        chunk = np.abs(chunk)
+    stats.total = chunk.size
+    if chunk.size == 0:
+        return stats
+
+    stats.zero_count = chunk.size - int(np.count_nonzero(chunk))
+    values = chunk
+    if chunk.dtype.kind == "f":
+        finite = np.isfinite(chunk)
+        n_finite = int(np.count_nonzero(finite))
+        if n_finite < chunk.size:
+            stats.nan_count = int(np.count_nonzero(np.isnan(chunk)))
+            stats.inf_count = chunk.size - n_finite - stats.nan_count
+            values = chunk[finite]
+
+    stats.count = values.size
+    if values.size:
+        stats.min = values.min()
+        stats.max = values.max()
+        as_float = values.astype(np.float64, copy=False)
+        stats.mean = float(as_float.mean())
+        stats.m2 = float(as_float.var()) * values.size
+    return stats
+
+
+def compute_stats(chunks, workers=None, progress=None):
+    """Reduce an iterable of chunks to one ArrayStats using a thread pool.
+
+    At most two chunks per worker are in flight, so streamed sources are
+    never read far ahead of the reductions. progress, if given, is called
+    with the number of elements reduced so far; it may raise to abort.
+    """
+    result = ArrayStats()
+
+    def merge(stats):
+        result.merge(stats)
+        if progress is not None:
+            progress(result.total)
+
+    _reduce_chunks(chunks, reduce_chunk, merge, workers)
+    return result
+
+
+def compute_field_stats(chunks, fields, workers=None, progress=None):
+    """Reduce chunks of a structured array to {field: ArrayStats} in one
+    pass. progress, if given, is called with the number of records
+    reduced so far; it may raise to abort."""
+    results = {field: ArrayStats() for field in fields}
+    records = 0
+
+    def reduce(chunk):
+        return {field: reduce_chunk(chunk[field]) for field in fields}, chunk.size
+
+    def merge(result):
+        nonlocal records
+        partial, n = result
+        for field in fields:
+            results[field].merge(partial[field])
+        records += n
+        if progress is not None:
+            progress(records)
+
+    _reduce_chunks(chunks, reduce, merge, workers)
+    return results
+
+
+def _reduce_chunks(chunks, reduce, merge, workers=None):
+    """Apply reduce to every chunk on a thread pool and pass the results
+    to merge in chunk order"""
+    def traced(chunk):
+        with span("stats.reduce", nbytes=chunk.nbytes):
+            return reduce(chunk)
+
+    map_chunks(traced, ((chunk,) for chunk in chunks), workers, merge)
+
+
+def stats_to_entry(stats):
+    """(meta, arrays) of an ArrayStats for a DerivedStore; min and max
+    keep their dtype in an array"""
+    meta = {field: getattr(stats, field) for field in
+            ("total", "count", "nan_count", "inf_count", "zero_count", "mean", "m2")}
+    arrays = {}
+    if stats.min is not None:
+        arrays["range"] = np.array([stats.min, stats.max])
+    return meta, arrays
+
+
+def stats_from_entry(meta, arrays):
+    stats = ArrayStats()
+    for field, value in meta.items():
+        setattr(stats, field, value)
+    if "range" in arrays:
+        stats.min, stats.max = arrays["range"][0], arrays["range"][1]
+    return stats
+
+
+class StatsCache:
+    """In-memory cache of member (or field) statistics keyed by archive,
+    member and field, backed by an optional persistent DerivedStore"""
+
+    def __init__(self, store=None):
+        self.store = store
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(archive, name, field=None):
+        index = archive.index
+        return (index.path, index.mtime_ns, index.file_size, name, field)
+
+    def get(self, archive, name, field=None):
+        key = self.key(archive, name, field)
+        with self._lock:
+            stats = self._entries.get(key)
+        if stats is None and self.store is not None:
+            entry = self.store.get(archive, name, "stats", () if field is None else (field,))
+            if entry is not None:
+                stats = stats_from_entry(*entry)
+                with self._lock:
+                    self._entries[key] = stats
+        return stats
+
+    def put(self, archive, name, stats, field=None):
+        with self._lock:
+            self._entries[self.key(archive, name, field)] = stats
+        if self.store is not None:
+            meta, arrays = stats_to_entry(stats)
+            self.store.put(archive, name, "stats", () if field is None else (field,),
+                           meta=meta, arrays=arrays)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+default_stats_cache = StatsCache(store=default_derived_store)
+
+
+def _member_chunks(archive, name, data=None):
+    """Blocks of a member in storage order: views of data, the member
+    already in memory, if given, else read from the archive"""
+    if data is None:
+        return (chunk for _, chunk in archive.iter_chunks(name))
+    flat = data.reshape(-1, order="A")
+    step = chunk_elements(flat.dtype)
+    return (flat[start:start + step] for start in range(0, flat.size, step))
+
+
+def member_stats(archive, name, workers=None, cache=default_stats_cache, progress=None,
+                 field=None, data=None):
+    """Statistics of one archive member, or of one field of a structured
+    member, computed in a single chunked pass.
+
+    Returns None for dtypes that cannot be summarised (e.g. string arrays,
+    or structured arrays without a field). progress, if given, is called
+    with the fraction done. data, if given, is the member already decoded;
+    it is reduced instead of reading the member again. Virtual archives
+    that list their shards (concat.ConcatArchive) are summarised shard by
+    shard with sharded_stats.
+    """
+    info = archive.index[name]
+    if not supports_stats(field_dtype(info.dtype, field)):
+        return None
+    if cache is not None:
+        stats = cache.get(archive, name, field)
+        if stats is not None:
+            return stats
+
+    shards = getattr(archive, "shards", None)
+    with span("stats.member", member=name, field=field):
+        if shards is not None:
+            stats = sharded_stats(shards(name), workers, cache, progress, field)
+        else:
+            chunks = (chunk if field is None else chunk[field]
+                      for chunk in _member_chunks(archive, name, data))
+            done = None
+            if progress is not None:
+                total = max(1, field_size(info, field))
+                done = lambda n: progress(n / total)
+            stats = compute_stats(chunks, workers, done)
+
+    if cache is not None:
+        cache.put(archive, name, stats, field)
+    return stats
+
+
+def member_field_stats(archive, name, workers=None, cache=default_stats_cache, progress=None,
+                       data=None):
+    """{field: ArrayStats or None} of a structured member.
+
+    Every numeric field missing from the cache is reduced in the same
+    pass over the member; other fields map to None. progress, if given,
+    is called with the fraction done; data is as for member_stats.
+    """
+    info = archive.index[name]
+    fields = numeric_fields(info.dtype)
+    results = {}
+    if cache is not None:
+        for field in fields:
+            results[field] = cache.get(archive, name, field)
+    todo = [field for field in fields if results.get(field) is None]
+
+    if todo:
+        chunks = _member_chunks(archive, name, data)
+        done = None
+        if progress is not None:
+            done = lambda n: progress(n / max(1, info.size))
+        with span("stats.fields", member=name, fields=len(todo)):
+            computed = compute_field_stats(chunks, todo, workers, done)
+        for field, stats in computed.items():
+            results[field] = stats
+            if cache is not None:
+                cache.put(archive, name, stats, field)
+    return {field: results.get(field) for field in info.dtype.names or ()}
+
+
+def sharded_stats(shards, workers=None, cache=default_stats_cache, progress=None, field=None):
+    """Merged statistics of several (archive, name) shards, or of one
+    field of them.
+
+    Shards are summarised in parallel, each with its share of the
+    workers and through the cache, so an unchanged shard is never read
+    twice. progress, if given, is called with the overall fraction done.
+    """
+    workers = workers or os.cpu_count() or 1
+    sizes = [field_size(archive.index[name], field) for archive, name in shards]
+    total = max(1, sum(sizes))
+    done = [0.0] * len(shards)
+    lock = threading.Lock()
+
+    def shard_progress(i):
+        if progress is None:
+            return None
+
+        def update(fraction):
+            with lock:
+                done[i] = fraction * sizes[i]
+                overall = sum(done) / total
+            progress(overall)
+        return update
+
+    parallel = max(1, min(workers, len(shards)))
+    inner = max(1, workers // parallel)
+    result = ArrayStats()
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(member_stats, archive, name, inner, cache, shard_progress(i), field)
+                   for i, (archive, name) in enumerate(shards)]
+        try:
+            # Merged in shard order, so the result does not depend on timing
+            for future in futures:
+                result.merge(future.result())
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return result
@@ -0,0 +1,152 @@
+"""
+Streaming reader for deflate-compressed archive members.
+
+MemberStream inflates a member straight from the archive file in bounded
+blocks, yielding the array payload as consecutive runs of elements in
+storage order (C order, or Fortran order for fortran_order arrays).
+
+While inflating it records a sparse index of checkpoints, each holding a
+copy of the zlib state together with the matching compressed and
+uncompressed offsets. Seeking backwards, or far forwards into an already
+visited region, restarts from the nearest checkpoint instead of
+re-inflating the member from its first byte.
+"""
+
+import bisect
+import threading
+import zipfile
+import zlib
+
+import numpy as np
+
+from .trace import span
+
+DEFAULT_CHECKPOINT_INTERVAL = 32 << 20   # uncompressed bytes between checkpoints
+DEFAULT_READ_SIZE = 1 << 20              # compressed bytes read per file access
+
+
+class _Checkpoint:
+    __slots__ = ("pos", "comp_pos", "state")
+
+    def __init__(self, pos, comp_pos, state):
+        self.pos = pos              # offset in the uncompressed member
+        self.comp_pos = comp_pos    # offset in the compressed member
+        self.state = state          # zlib decompressobj positioned at pos
+
+
+class MemberStream:
+    """Seekable, bounded-memory reader over one compressed member"""
+
+    def __init__(self, path, info,
+                 checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL,
+                 read_size=DEFAULT_READ_SIZE):
+        if info.compress_type != zipfile.ZIP_DEFLATED:
+            raise ValueError(f"Member {info.name!r} is not deflate-compressed")
+        if info.dtype.hasobject:
+            raise ValueError(f"Member {info.name!r} holds Python objects")
+
+        self.path = path
+        self.info = info
+        self.checkpoint_interval = checkpoint_interval
+        self.read_size = read_size
+
+        self._file = open(path, "rb")
+        self._lock = threading.Lock()
+        self._checkpoints = [_Checkpoint(0, 0, zlib.decompressobj(-zlib.MAX_WBITS))]
+        self._restore(self._checkpoints[0])
+
+    @property
+    def checkpoints(self):
+        """Uncompressed offsets of the recorded restart points"""
+        return [cp.pos for cp in self._checkpoints]
+
+    def _restore(self, cp):
+        self._inflater = cp.state.copy()
+        self._pos = cp.pos
+        self._comp_pos = cp.comp_pos
+        self._tail = b""
+
+    def _record_checkpoint(self):
+        last = self._checkpoints[-1].pos
+        if self._pos - last < self.checkpoint_interval:
+            return
+        # Input still waiting in the tail has not been seen by the inflater
+        comp_pos = self._comp_pos - len(self._tail)
+        self._checkpoints.append(_Checkpoint(self._pos, comp_pos, self._inflater.copy()))
+
+    def _inflate(self, max_bytes, sink):
+        """Inflate up to max_bytes from the current position into sink
+        (a list of bytes objects, or None to discard)"""
+        remaining = max_bytes
+        with span("stream.inflate", member=self.info.name) as sp:
+            while remaining > 0:
+                if not self._tail:
+                    left = self.info.compressed_size - self._comp_pos
+                    if left > 0:
+                        self._file.seek(self.info.member_offset + self._comp_pos)
+                        self._tail = self._file.read(min(self.read_size, left))
+                        self._comp_pos += len(self._tail)
+                        sp.add_bytes(len(self._tail))
+                data = self._tail
+                # With no new input this drains output zlib is still holding
+                out = self._inflater.decompress(data, remaining)
+                self._tail = self._inflater.unconsumed_tail
+                if not out and not data:
+                    break
+                if out:
+                    self._pos += len(out)
+                    remaining -= len(out)
+                    if sink is not None:
+                        sink.append(out)
+                # Only the furthest point reached so far extends the index
+                if self._pos > self._checkpoints[-1].pos:
+                    self._record_checkpoint()
+        return max_bytes - remaining
+
+    def _seek(self, pos):
+        if pos == self._pos:
+            return
+        i = bisect.bisect_right(self.checkpoints, pos) - 1
+        cp = self._checkpoints[i]
+        # Restart from a checkpoint when going backwards, or when one lies
+        # between the current position and the target
+        if pos < self._pos or cp.pos > self._pos:
+            self._restore(cp)
+        while self._pos < pos:
+            if not self._inflate(min(pos - self._pos, self.read_size * 4), None):
+                raise EOFError(f"Unexpected end of member {self.info.name!r}")
+
+    def read_bytes(self, offset, count):
+        """Return count uncompressed bytes of the member starting at offset"""
+        with self._lock:
+            self._seek(offset)
+            parts = []
+            got = self._inflate(count, parts)
+            if got < count:
+                raise EOFError(f"Unexpected end of member {self.info.name!r}")
+            return b"".join(parts)
+
+    def read_elements(self, start, count):
+        """Return elements [start, start + count) in storage order as a 1D array"""
+        itemsize = self.info.dtype.itemsize
+        count = max(0, min(count, self.info.size - start))
+        raw = self.read_bytes(self.info.data_offset + start * itemsize, count * itemsize)
+        return np.frombuffer(raw, dtype=self.info.dtype, count=count)
+
+    def iter_chunks(self, chunk_elems, start=0, stop=None):
+        """Yield (offset, 1D array) blocks of at most chunk_elems elements"""
+        stop = self.info.size if stop is None else min(stop, self.info.size)
+        offset = start
+        while offset < stop:
+            count = min(chunk_elems, stop - offset)
+            yield offset, self.read_elements(offset, count)
+            offset += count
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
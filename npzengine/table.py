@@ -0,0 +1,141 @@
+"""
+Cell access for the data table.
+
+TableModel presents any array as a 2D grid of formatted cells: 1D arrays
+as a single column, 2D arrays as they are, and N-D arrays as rows over
+all leading axes with one column per element of the last axis.
+Structured arrays are tables of records, one column per field, each
+formatted from a zero-copy field view of the block's records. Cells
+are fetched in fixed-size blocks, each a slice or strided gather of
+exactly the elements it covers, formatted with one vectorized conversion
+and kept in a small LRU cache, so scrolling anywhere in the array costs
+the same as scrolling near its start.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .trace import span
+
+
+def format_values(values):
+    """Convert an array of values to strings in one pass"""
+    values = np.asarray(values)
+    if values.dtype.names is not None or values.dtype.hasobject:
+        # Structured and object values have no vectorized str conversion
+        out = np.empty(values.shape, dtype=object)
+        out.flat[:] = [str(v) for v in values.flat]
+        return out
+    return values.astype(str)
+
+
+def format_column(values):
+    """One string per record of a field; sub-array fields are shown whole"""
+    if values.ndim <= 1:
+        return format_values(values)
+    out = np.empty(values.shape[0], dtype=object)
+    out[:] = [str(v) for v in values]
+    return out
+
+
+class TableModel:
+    """Lazily formatted 2D cell view over an array"""
+
+    BLOCK_ROWS = 64
+    BLOCK_COLS = 32
+
+    def __init__(self, data, cache_blocks=256):
+        self.data = data
+        self.cache_blocks = cache_blocks
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self.fields = data.dtype.names
+
+        if self.fields is not None:
+            self.n_rows = data.size
+            self.n_cols = len(self.fields)
+        elif data.ndim == 0:
+            self.n_rows, self.n_cols = 1, 1
+        elif data.ndim == 1:
+            self.n_rows, self.n_cols = data.shape[0], 1
+        elif data.ndim == 2:
+            self.n_rows, self.n_cols = data.shape
+        else:
+            self.n_rows = int(np.prod(data.shape[:-1], dtype=np.int64))
+            self.n_cols = data.shape[-1]
+
+    def row_label(self, row):
+        labels = getattr(self.data, "row_label", None)
+        if labels is not None:
+            # A selection of rows (query.SelectedRows) keeps the labels
+            # the rows have in the whole array
+            return labels(row)
+        if self.fields is not None and self.data.ndim > 1:
+            # Records of an N-D structured array are addressed by their index
+            return str(tuple(int(i) for i in np.unravel_index(row, self.data.shape)))
+        if self.data.ndim <= 2:
+            return str(row)
+        # Rows of an N-D array are addressed by their leading indices
+        return str(tuple(int(i) for i in np.unravel_index(row, self.data.shape[:-1])))
+
+    def column_label(self, col):
+        if self.fields is not None:
+            return self.fields[col]
+        if self.data.ndim < 2:
+            return "Value"
+        return f"Col {col}"
+
+    def records(self, r0, r1):
+        """Records [r0, r1) of a structured array, in C order"""
+        data = self.data
+        if data.ndim == 0:
+            return data.reshape(1)
+        if data.ndim == 1:
+            return data[r0:r1]
+        return data[np.unravel_index(np.arange(r0, r1), data.shape)]
+
+    def fetch(self, r0, r1, c0, c1):
+        """Raw values of rows [r0, r1) and columns [c0, c1) as a 2D array"""
+        data = self.data
+        if data.ndim == 0:
+            return data.reshape(1, 1)
+        if data.ndim == 1:
+            return data[r0:r1, np.newaxis]
+        if data.ndim == 2:
+            return data[r0:r1, c0:c1]
+        coords = np.unravel_index(np.arange(r0, r1), data.shape[:-1])
+        return data[coords + (slice(c0, c1),)]
+
+    def block(self, block_row, block_col):
+        """Formatted cells of one block, as nested lists"""
+        key = (block_row, block_col)
+        with self._lock:
+            cells = self._blocks.get(key)
+            if cells is not None:
+                self._blocks.move_to_end(key)
+                return cells
+
+        r0 = block_row * self.BLOCK_ROWS
+        c0 = block_col * self.BLOCK_COLS
+        r1 = min(r0 + self.BLOCK_ROWS, self.n_rows)
+        c1 = min(c0 + self.BLOCK_COLS, self.n_cols)
+        with span("table.block", rows=r1 - r0, cols=c1 - c0):
+            if self.fields is not None:
+                # Column-wise: each field is formatted in one conversion
+                records = self.records(r0, r1)
+                columns = [format_column(records[field]).tolist() for field in self.fields[c0:c1]]
+                cells = [list(row) for row in zip(*columns)]
+            else:
+                cells = format_values(self.fetch(r0, r1, c0, c1)).tolist()
+
+        with self._lock:
+            self._blocks[key] = cells
+            while len(self._blocks) > self.cache_blocks:
+                self._blocks.popitem(last=False)
+        return cells
+
+    def cell(self, row, col):
+        block = self.block(row // self.BLOCK_ROWS, col // self.BLOCK_COLS)
+        return block[row % self.BLOCK_ROWS][col % self.BLOCK_COLS]
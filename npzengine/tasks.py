@@ -0,0 +1,127 @@
+"""
+Background task scheduler.
+
+Jobs run on a worker pool; their results, errors and progress updates are
+queued and delivered by poll(), which the GUI calls from its event loop
+(root.after), so callbacks always run on the thread that owns the widgets.
+
+Tasks can be grouped: submitting a new task to a group cancels the task
+already running there, and callbacks of cancelled tasks are never
+delivered, so a stale result can never overwrite a newer one.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .trace import span
+
+
+class TaskCancelled(Exception):
+    """Raised inside a job when its task has been cancelled"""
+
+
+class Task:
+    """Handle passed to a job as its first argument"""
+
+    def __init__(self, scheduler, group, on_done, on_error, on_progress):
+        self.group = group
+        self._scheduler = scheduler
+        self._cancelled = threading.Event()
+        self._on_done = on_done
+        self._on_error = on_error
+        self._on_progress = on_progress
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Raise TaskCancelled if the task has been cancelled"""
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def progress(self, fraction=None, message=None):
+        """Report progress (fraction in [0, 1]) and check for cancellation.
+
+        Suitable as the progress callback of engine functions, so cancelling
+        a task aborts the computation at the next chunk.
+        """
+        self.check()
+        if self._on_progress is not None:
+            self._scheduler._events.put((self, False, self._on_progress, (fraction, message)))
+
+
+class TaskScheduler:
+    """Runs jobs off the GUI thread and hands results back through poll()"""
+
+    def __init__(self, max_workers=2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._events = queue.Queue()
+        self._groups = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, group=None, on_done=None, on_error=None, on_progress=None):
+        """Run fn(task, *args) on a worker and return its Task"""
+        task = Task(self, group, on_done, on_error, on_progress)
+        if group is not None:
+            with self._lock:
+                previous = self._groups.get(group)
+                self._groups[group] = task
+            if previous is not None:
+                previous.cancel()
+        self._pool.submit(self._run, task, fn, args)
+        return task
+
+    def cancel(self, group):
+        """Cancel the running task of a group, if any"""
+        with self._lock:
+            task = self._groups.pop(group, None)
+        if task is not None:
+            task.cancel()
+
+    def busy(self, group):
+        with self._lock:
+            return group in self._groups
+
+    def _run(self, task, fn, args):
+        try:
+            task.check()
+            with span(f"task.{task.group or 'ungrouped'}"):
+                result = fn(task, *args)
+        except TaskCancelled:
+            return
+        except Exception as e:
+            self._events.put((task, True, task._on_error, (e,)))
+        else:
+            self._events.put((task, True, task._on_done, (result,)))
+
+    def _finish(self, task):
+        with self._lock:
+            if self._groups.get(task.group) is task:
+                del self._groups[task.group]
+
+    def poll(self):
+        """Deliver queued callbacks; call from the GUI thread"""
+        while True:
+            try:
+                task, final, callback, args = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if task.cancelled:
+                continue
+            if final:
+                self._finish(task)
+            if callback is not None:
+                callback(*args)
+
+    def shutdown(self):
+        with self._lock:
+            tasks = list(self._groups.values())
+            self._groups.clear()
+        for task in tasks:
+            task.cancel()
+        self._pool.shutdown(wait=False)
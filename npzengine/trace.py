@@ -0,0 +1,199 @@
+"""
+Instrumentation spans around the hot paths of the engine and viewer.
+
+    with span("stats.reduce", nbytes=chunk.nbytes):
+        ...
+
+A span records its wall time, the bytes the code reports reading and,
+when allocation tracking is on, the net bytes allocated meanwhile
+(through tracemalloc, which NumPy reports its buffers to). Spans nest per
+thread. The tracer keeps per-name totals for a live breakdown and a
+bounded list of events that can be saved as a Chrome trace (open it in
+chrome://tracing or ui.perfetto.dev).
+
+Tracing is off by default. span() then returns one shared no-op object,
+so an instrumented call costs a function call and an attribute test.
+Setting NPZVIEW_TRACE=<file> turns tracing on at start-up and writes the
+trace to <file> at exit; NPZVIEW_TRACE_ALLOC=1 also tracks allocations.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+MAX_EVENTS = 200_000
+
+
+class _NullSpan:
+    """What span() returns while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, n):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed region; use as a context manager"""
+
+    __slots__ = ("tracer", "name", "nbytes", "args", "start", "alloc_start")
+
+    def __init__(self, tracer, name, nbytes, args):
+        self.tracer = tracer
+        self.name = name
+        self.nbytes = nbytes
+        self.args = args
+        self.alloc_start = None
+
+    def add_bytes(self, n):
+        """Count bytes read inside the span"""
+        self.nbytes += n
+
+    def __enter__(self):
+        if self.tracer.track_alloc:
+            self.alloc_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        alloc = None
+        if self.alloc_start is not None and tracemalloc.is_tracing():
+            alloc = tracemalloc.get_traced_memory()[0] - self.alloc_start
+        self.tracer._record(self, end, alloc, exc_type is not None)
+        return False
+
+
+class Tracer:
+    """Collects spans: per-name totals and a bounded event log"""
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.track_alloc = False
+        self._started_tracemalloc = False
+        self._events = deque(maxlen=max_events)
+        self._totals = {}    # name -> [count, ns, bytes, alloc bytes]
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, track_alloc=False):
+        if track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.track_alloc = track_alloc
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.track_alloc = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def span(self, name, nbytes=0, **args):
+        """A Span named name, or a no-op while tracing is off. nbytes
+        counts bytes read; args are shown with the event in the trace."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, nbytes, args)
+
+    def _record(self, span, end, alloc, failed):
+        duration = end - span.start
+        args = span.args
+        if failed:
+            args = dict(args, error=True)
+        event = (span.name, span.start, duration, threading.get_ident(), span.nbytes, alloc, args)
+        with self._lock:
+            self._events.append(event)
+            total = self._totals.get(span.name)
+            if total is None:
+                total = self._totals[span.name] = [0, 0, 0, 0]
+            total[0] += 1
+            total[1] += duration
+            total[2] += span.nbytes
+            total[3] += alloc or 0
+
+    def totals(self):
+        """Per-name totals, most time first"""
+        with self._lock:
+            items = [(name, list(total)) for name, total in self._totals.items()]
+        rows = []
+        for name, (count, ns, nbytes, alloc) in items:
+            seconds = ns / 1e9
+            rows.append({
+                "name": name,
+                "count": count,
+                "seconds": seconds,
+                "mean_seconds": seconds / count,
+                "bytes": nbytes,
+                "mb_per_s": nbytes / seconds / 1e6 if nbytes and seconds > 0 else None,
+                "alloc_bytes": alloc if self.track_alloc or alloc else None,
+            })
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._totals.clear()
+
+    def chrome_trace(self):
+        """The recorded events in Chrome's trace event format"""
+        with self._lock:
+            events = list(self._events)
+        pid = os.getpid()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                  "args": {"name": names.get(tid, str(tid))}}
+                 for tid in sorted({event[3] for event in events})]
+        for name, start, duration, tid, nbytes, alloc, args in events:
+            event_args = dict(args)
+            if nbytes:
+                event_args["bytes"] = nbytes
+            if alloc is not None:
+                event_args["alloc_bytes"] = alloc
+            trace.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - self._origin) / 1e3,
+                "dur": duration / 1e3,
+                "pid": pid,
+                "tid": tid,
+                "args": event_args,
+            })
+        return {"traceEvents": trace, "displayTimeUnit": "ms",
+                "otherData": {"totals": self.totals()}}
+
+    def dump(self, path):
+        """Write the Chrome trace to path"""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+
+tracer = Tracer()
+span = tracer.span
+
+
+def _configure_from_environment():
+    path = os.environ.get("NPZVIEW_TRACE")
+    if not path:
+        return
+    tracer.enable(track_alloc=os.environ.get("NPZVIEW_TRACE_ALLOC") == "1")
+    atexit.register(tracer.dump, path)
+
+
+_configure_from_environment()
@@ -0,0 +1,8 @@
+"""Command line entry point: python npzview.py ls archive.npz (see npzengine.cli)"""
+
+import sys
+
+from npzengine.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
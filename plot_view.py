@@ -0,0 +1,83 @@
+from npzengine.trace import span
+
+
+class PlotView:
+    """The figure's axes and artists, kept alive from one plot to the next.
+
+    A plot with the same layout as the one on screen (another slice of a
+    volume, other scatter dimensions, refreshed heatmap tiles) replaces
+    the data of the existing artists instead of rebuilding the figure.
+    Updates that leave the static parts of the figure alone are blitted:
+    the figure is rendered once without its dynamic artists and kept as a
+    background, and each update restores it and draws only those artists.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.fig = canvas.figure
+        self.layout = None
+        self.artists = {}       # named artists of the plot on screen
+        self._dynamic = []      # artists drawn by a blitted update, in order
+        self._background = None
+        self._capturing = False
+        canvas.mpl_connect("draw_event", self._on_draw)
+
+    def begin(self, layout):
+        """True if the plot on screen has this layout and can be updated in
+        place; otherwise the figure is cleared for a new plot"""
+        if layout is not None and layout == self.layout:
+            return True
+        self.reset()
+        self.layout = layout
+        return False
+
+    def reset(self):
+        self.fig.clear()
+        self.layout = None
+        self.artists = {}
+        self._dynamic = []
+        self._background = None
+
+    def set_dynamic(self, artists):
+        """Artists that updates change: data, titles, color bars and any
+        axis whose limits follow the data. Everything else is background."""
+        self._dynamic = [artist for artist in artists if artist is not None]
+        self._background = None
+
+    def redraw(self):
+        """Render the whole figure"""
+        with span("gui.draw", kind=self.layout[0] if self.layout else None):
+            self.canvas.draw()
+
+    def update(self, full=False):
+        """Show changes made to the dynamic artists. Pass full=True when
+        anything else changed too, e.g. the limits of a static axis."""
+        if full or not self._dynamic:
+            self.redraw()
+            return
+        if self._background is None:
+            self._capture()
+        with span("gui.blit", artists=len(self._dynamic)):
+            self.canvas.restore_region(self._background)
+            for artist in self._dynamic:
+                self.fig.draw_artist(artist)
+            self.canvas.blit(self.fig.bbox)
+
+    def _capture(self):
+        # Animated artists are left out of a draw; they are only animated
+        # while the background renders so saved figures still show them
+        for artist in self._dynamic:
+            artist.set_animated(True)
+        self._capturing = True
+        try:
+            with span("gui.draw", kind="background"):
+                self.canvas.draw()
+        finally:
+            self._capturing = False
+            for artist in self._dynamic:
+                artist.set_animated(False)
+
+    def _on_draw(self, event):
+        # Any other draw (resize, pan, zoom) may have changed the static
+        # parts of the figure, so the background is stale after it
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox) if self._capturing else None
@@ -0,0 +1,44 @@
+"""
+Shared fixtures: small archives written with np.savez / np.savez_compressed
+into a temporary folder, opened without the on-disk index cache or the
+array cache so every read goes through the code under test.
+"""
+
+import numpy as np
+import pytest
+
+from npzengine import NPZArchive
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(12345)
+
+
+@pytest.fixture
+def make_archive(tmp_path):
+    """make_archive(arrays, compressed=True, name="data.npz") -> path"""
+    def make(arrays, compressed=True, name="data.npz"):
+        path = tmp_path / name
+        (np.savez_compressed if compressed else np.savez)(path, **arrays)
+        return str(path)
+    return make
+
+
+@pytest.fixture
+def open_archive():
+    """open_archive(path) -> NPZArchive that bypasses every cache"""
+    archives = []
+
+    def open_(path):
+        archive = NPZArchive(path, cache_dir=None, array_cache=None)
+        archives.append(archive)
+        return archive
+    yield open_
+    for archive in archives:
+        archive.close()
+
+
+@pytest.fixture(params=[True, False], ids=["compressed", "stored"])
+def compressed(request):
+    return request.param
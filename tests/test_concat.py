@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from npzengine import ConcatArchive, member_stats
+
+
+@pytest.fixture
+def shards(rng, make_archive):
+    parts = [rng.normal(size=(rows, 3)) for rows in (50, 0, 120, 7, 80)]
+    paths = [make_archive({"x": part, "other": np.arange(3)}, compressed=i % 2 == 0,
+                          name=f"shard{i}.npz")
+             for i, part in enumerate(parts)]
+    return paths, np.concatenate(parts)
+
+
+@pytest.fixture
+def concat(shards):
+    archive = ConcatArchive(shards[0], "x", cache_dir=None, array_cache=None)
+    yield archive, shards[1]
+    archive.close()
+
+
+def test_shape_comes_from_the_indexes(concat):
+    archive, whole = concat
+    assert archive.files == ["x"]
+    assert archive.index["x"].shape == whole.shape
+    assert archive["x"].shape == whole.shape
+
+
+@pytest.mark.parametrize("key", [
+    0, 49, 50, 170, -1, -8,
+    slice(None), slice(40, 60), slice(45, 180), slice(None, None, 7), slice(200, 10, -3),
+    (slice(30, 60), 1), (slice(None), slice(0, 2)), (55, 2),
+    [0, 176, 49, 50, 50, 256], np.array([-1, 3]),
+])
+def test_indexing_matches_np_concatenate(concat, key):
+    archive, whole = concat
+    np.testing.assert_array_equal(np.asarray(archive["x"][key]), whole[key])
+
+
+def test_boolean_and_out_of_range_indexing(concat, rng):
+    archive, whole = concat
+    mask = rng.random(whole.shape[0]) < 0.3
+    np.testing.assert_array_equal(archive["x"][mask], whole[mask])
+    with pytest.raises(IndexError):
+        archive["x"][whole.shape[0]]
+
+
+def test_chunks_and_stats_cover_every_shard(concat):
+    archive, whole = concat
+    chunks = list(archive.iter_chunks("x", chunk_elems=64))
+    np.testing.assert_array_equal(np.concatenate([chunk for _, chunk in chunks]),
+                                  whole.reshape(-1))
+    stats = member_stats(archive, "x", workers=2, cache=None)
+    assert (stats.count, stats.min, stats.max) == (whole.size, whole.min(), whole.max())
+    assert stats.variance == pytest.approx(whole.var())
+
+
+def test_mismatched_shards_are_refused(make_archive):
+    paths = [make_archive({"x": np.zeros((4, 3))}, name="a.npz"),
+             make_archive({"x": np.zeros((4, 2))}, name="b.npz")]
+    with pytest.raises(ValueError):
+        ConcatArchive(paths, "x", cache_dir=None, array_cache=None)
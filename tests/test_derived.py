@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+from npzengine import NPZArchive
+from npzengine.derived import DerivedStore
+
+
+def test_round_trip(tmp_path, make_archive):
+    archive = NPZArchive(make_archive({"x": np.arange(10)}), cache_dir=None)
+    store = DerivedStore(str(tmp_path / "derived"))
+    counts = np.arange(5, dtype=np.int64)
+    store.put(archive, "x", "histogram", (5, None), meta={"bins": 5},
+              arrays={"counts": counts, "edges": np.linspace(0, 1, 6, dtype=np.float32)})
+    meta, arrays = store.get(archive, "x", "histogram", (5, None))
+    assert meta == {"bins": 5}
+    np.testing.assert_array_equal(arrays["counts"], counts)
+    assert arrays["edges"].dtype == np.float32
+    assert store.get(archive, "x", "histogram", (6, None)) is None
+    assert store.get(archive, "x", "stats") is None
+
+
+def test_changed_archive_misses(tmp_path, make_archive):
+    path = make_archive({"x": np.arange(10)})
+    store = DerivedStore(str(tmp_path / "derived"))
+    store.put(archive=NPZArchive(path, cache_dir=None), name="x", kind="stats", meta={"n": 1})
+    assert store.get(NPZArchive(path, cache_dir=None), "x", "stats") is not None
+
+    # Same contents, new modification time
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert store.get(NPZArchive(path, cache_dir=None), "x", "stats") is None
+
+    # Rewritten with other data
+    make_archive({"x": np.arange(11)})
+    assert store.get(NPZArchive(path, cache_dir=None), "x", "stats") is None
+
+
+def test_eviction_keeps_the_budget(tmp_path, make_archive):
+    archive = NPZArchive(make_archive({"x": np.arange(10)}), cache_dir=None)
+    cache_dir = str(tmp_path / "derived")
+    store = DerivedStore(cache_dir, max_bytes=40_000)
+    for i in range(20):
+        store.put(archive, "x", "tile", (i,), arrays={"tile": np.zeros(1_000)})
+    assert sum(os.path.getsize(os.path.join(cache_dir, name))
+               for name in os.listdir(cache_dir)) <= 40_000
+    assert store.get(archive, "x", "tile", (19,)) is not None
+    assert store.get(archive, "x", "tile", (0,)) is None
@@ -0,0 +1,140 @@
+import gzip
+import io
+import os
+
+import numpy as np
+import pytest
+
+from npzengine.export import export_archive, export_member, export_member_csv
+
+
+def read_csv(path):
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt") as f:
+            text = f.read()
+    elif path.endswith(".zst"):
+        zstandard = pytest.importorskip("zstandard")
+        with open(path, "rb") as f:
+            reader = zstandard.ZstdDecompressor().stream_reader(f)
+            text = io.TextIOWrapper(reader, encoding="utf-8").read()
+    else:
+        with open(path) as f:
+            text = f.read()
+    header, *rows = text.splitlines()
+    return header, [row.split(",") for row in rows]
+
+
+@pytest.fixture
+def members(rng):
+    records = np.zeros(1_000, dtype=[("t", "f4"), ("n", "i8")])
+    records["t"] = rng.normal(size=records.size)
+    records["n"] = rng.integers(-50, 50, records.size)
+    return {
+        "vector": rng.normal(size=5_000),
+        "vector32": rng.normal(size=5_000).astype(np.float32),
+        "matrix": rng.normal(size=(700, 6)),
+        "fortran": np.asfortranarray(rng.normal(size=(40, 30))),
+        "volume": rng.normal(size=(20, 10, 8)),
+        "ints": rng.integers(-1000, 1000, size=(300, 4)),
+        "records": records,
+    }
+
+
+@pytest.mark.parametrize("fmt", ["csv", "csv.gz", "csv.zst"])
+def test_csv_round_trip(members, make_archive, open_archive, compressed, tmp_path, fmt):
+    archive = open_archive(make_archive(members, compressed))
+    for name, data in members.items():
+        path = str(tmp_path / f"{name}.{fmt}")
+        result = export_member(archive, name, path, fmt, workers=2)
+        header, rows = read_csv(path)
+        assert result.rows == len(rows), name
+        if data.dtype.names is not None:
+            assert header == "Index," + ",".join(data.dtype.names)
+            for field, column in zip(data.dtype.names, zip(*[row[1:] for row in rows])):
+                np.testing.assert_array_equal(np.array(column, dtype=data.dtype[field]),
+                                              data[field])
+        elif data.ndim == 2:
+            assert header == "Row," + ",".join(f"Col{i}" for i in range(data.shape[1]))
+            np.testing.assert_array_equal(np.array([row[1:] for row in rows], dtype=data.dtype),
+                                          data)
+        else:
+            assert header == "Index,Value"
+            values = np.array([row[1] for row in rows], dtype=data.dtype)
+            np.testing.assert_array_equal(values, data.reshape(-1))
+        assert [int(row[0]) for row in rows] == list(range(len(rows)))
+
+
+def test_small_blocks_give_the_same_text(members, make_archive, open_archive, tmp_path):
+    archive = open_archive(make_archive(members))
+    for name in members:
+        whole, blocked = str(tmp_path / "whole.csv"), str(tmp_path / "blocked.csv")
+        export_member_csv(archive, name, whole)
+        export_member_csv(archive, name, blocked, block_cells=37)
+        with open(whole) as a, open(blocked) as b:
+            assert a.read() == b.read(), name
+
+
+def test_float16_is_written_at_full_precision(make_archive, open_archive, tmp_path):
+    values = np.array([[65504, 0.1], [-3.5, 1e-4]], dtype=np.float16)
+    archive = open_archive(make_archive({"h": values}))
+    path = str(tmp_path / "h.csv")
+    export_member(archive, "h", path)
+    _, rows = read_csv(path)
+    assert rows[0][1] == "65504.0"
+    np.testing.assert_array_equal(np.array([row[1:] for row in rows], dtype=np.float64),
+                                  values.astype(np.float64))
+
+
+def test_npy_round_trip(members, make_archive, open_archive, compressed, tmp_path):
+    archive = open_archive(make_archive(members, compressed))
+    for name, data in members.items():
+        path = str(tmp_path / f"{name}.npy")
+        export_member(archive, name, path, "npy")
+        loaded = np.load(path)
+        assert loaded.dtype == data.dtype
+        np.testing.assert_array_equal(loaded, data)
+
+
+def test_parquet_round_trip(members, make_archive, open_archive, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    archive = open_archive(make_archive(members))
+    table = pq.read_table(export_member(archive, "matrix", str(tmp_path / "m.parquet"),
+                                        "parquet").path)
+    np.testing.assert_array_equal(np.column_stack([table[f"Col{j}"].to_numpy()
+                                                   for j in range(6)]), members["matrix"])
+    table = pq.read_table(export_member(archive, "records", str(tmp_path / "r.parquet"),
+                                        "parquet").path)
+    np.testing.assert_array_equal(table["n"].to_numpy(), members["records"]["n"])
+
+
+def test_export_archive_nested_names_and_failures(make_archive, open_archive, tmp_path):
+    data = np.arange(20.0).reshape(4, 5)
+    archive = open_archive(make_archive({"sub/dir": data, "../outside": data, "ok": data}))
+    out_dir = str(tmp_path / "out")
+    results = export_archive(archive, out_dir, "npy", workers=4)
+    np.testing.assert_array_equal(np.load(os.path.join(out_dir, "sub", "dir.npy")), data)
+    np.testing.assert_array_equal(np.load(os.path.join(out_dir, "ok.npy")), data)
+    assert isinstance(results["../outside"], ValueError)
+    assert not os.path.exists(str(tmp_path / "outside.npy"))
+
+
+class Abort(Exception):
+    pass
+
+
+def test_aborted_batch_leaves_no_partial_files(rng, make_archive, open_archive, tmp_path):
+    # Four blocks per member, so no member is complete after three blocks
+    members = {f"m{i}": rng.normal(size=(200_000, 4)) for i in range(4)}
+    archive = open_archive(make_archive(members))
+    out_dir = str(tmp_path / "out")
+    calls = 0
+
+    def progress(done, total):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise Abort()
+
+    with pytest.raises(Abort):
+        export_archive(archive, out_dir, "csv", workers=4, progress=progress)
+    assert os.listdir(out_dir) == []
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from npzengine.histogram import member_histogram
+
+
+def finite(values):
+    if values.dtype.kind == "c":
+        values = np.abs(values)
+    return values[np.isfinite(values)] if values.dtype.kind == "f" else values
+
+
+MEMBERS = {
+    "float64": lambda rng: rng.normal(size=300_000),
+    "float32": lambda rng: rng.normal(size=3_000_000).astype(np.float32),
+    "float16": lambda rng: rng.normal(size=100_000).astype(np.float16),
+    "int": lambda rng: rng.integers(-1000, 1000, size=200_000),
+    "complex64": lambda rng: (rng.normal(size=50_000)
+                              + 1j * rng.normal(size=50_000)).astype(np.complex64),
+    "constant": lambda rng: np.full(1_000, 3.3, dtype=np.float32),
+    "with_nan": lambda rng: np.where(rng.random(100_000) < 0.1, np.nan,
+                                     rng.normal(size=100_000)).astype(np.float32),
+}
+
+
+@pytest.fixture(scope="module")
+def members():
+    rng = np.random.default_rng(7)
+    return {name: make(rng) for name, make in MEMBERS.items()}
+
+
+@pytest.mark.parametrize("name", list(MEMBERS))
+@pytest.mark.parametrize("value_range", [None, (-0.7, 1.3)])
+def test_equals_np_histogram(members, make_archive, open_archive, name, value_range):
+    values = members[name]
+    archive = open_archive(make_archive({name: values}))
+    histogram = member_histogram(archive, name, bins=50, value_range=value_range, workers=4,
+                                 cache=None, stats_cache=None)
+    counts, edges = np.histogram(finite(values), 50, range=value_range)
+    np.testing.assert_array_equal(histogram.counts, counts)
+    np.testing.assert_array_equal(histogram.edges, edges)
+    assert histogram.edges.dtype == edges.dtype
+
+
+def test_structured_field(rng, make_archive, open_archive):
+    records = np.zeros(50_000, dtype=[("x", "f4"), ("y", "i4")])
+    records["x"] = rng.normal(size=records.size)
+    archive = open_archive(make_archive({"r": records}, compressed=False))
+    histogram = member_histogram(archive, "r", bins=30, field="x", cache=None, stats_cache=None)
+    np.testing.assert_array_equal(histogram.counts, np.histogram(records["x"], 30)[0])
+
+
+def test_unsupported_dtype(make_archive, open_archive):
+    archive = open_archive(make_archive({"s": np.array(["a"])}))
+    assert member_histogram(archive, "s", cache=None, stats_cache=None) is None
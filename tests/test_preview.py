@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from npzengine.preview import format_preview, member_head, member_preview
+
+
+def arrays(rng):
+    records = np.zeros(15, dtype=[("x", "f4"), ("y", "i2")])
+    records["x"] = rng.normal(size=15)
+    return {
+        "scalar": np.array(2.5),
+        "vector": rng.normal(size=30),
+        "matrix": rng.normal(size=(13, 7)),
+        "fortran2d": np.asfortranarray(rng.normal(size=(12, 11))),
+        "volume": rng.normal(size=(12, 3, 14)),
+        "fortran3d": np.asfortranarray(rng.normal(size=(12, 11, 13))),
+        "records": records,
+        "strings": np.array(["ab", "c"]),
+        "empty": np.zeros((0, 4)),
+    }
+
+
+@pytest.mark.parametrize("n", [1, 5, 10])
+def test_member_head_matches_slicing(rng, make_archive, open_archive, compressed, n):
+    members = arrays(rng)
+    archive = open_archive(make_archive(members, compressed))
+    for name, data in members.items():
+        head = member_head(archive, name, n)
+        expected = data[tuple(slice(0, n) for _ in range(data.ndim))]
+        assert head.shape == expected.shape, name
+        assert head.tolist() == expected.tolist(), name
+
+
+def test_member_preview_matches_format_preview(rng, make_archive, open_archive, compressed):
+    members = arrays(rng)
+    archive = open_archive(make_archive(members, compressed))
+    for name, data in members.items():
+        if name == "fortran3d":
+            continue
+        assert member_preview(archive, name) == format_preview(data), name
+
+
+def test_fortran_nd_preview_is_in_storage_order(rng, make_archive, open_archive):
+    data = np.asfortranarray(rng.normal(size=(12, 11, 13)))
+    archive = open_archive(make_archive({"f": data}))
+    preview = member_preview(archive, "f")
+    assert preview.startswith("First elements (Fortran order):")
+    lines = preview.splitlines()[2:]
+    assert lines[0] == f"(0, 0, 0): {data[0, 0, 0]}"
+    assert lines[1] == f"(1, 0, 0): {data[1, 0, 0]}"
+
+
+def test_scalar_preview(make_archive, open_archive, compressed):
+    archive = open_archive(make_archive({"s": np.array(7)}, compressed))
+    assert member_head(archive, "s", 10).shape == ()
+    assert member_head(archive, "s", 10) == 7
+    assert "7" in member_preview(archive, "s")
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from npzengine import QueryError, filter_rows
+from npzengine.query import Selection, selection_histogram, selection_stats
+
+
+@pytest.fixture
+def table(rng):
+    values = rng.normal(size=(20_000, 4))
+    values[rng.choice(values.shape[0], 100, replace=False), 1] = np.nan
+    return values
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("text, mask", [
+    ("col[3] > 0.5 and isnan(col[1])", lambda v, i: (v[:, 3] > 0.5) & np.isnan(v[:, 1])),
+    ("c0 < -1 or c2 > 2", lambda v, i: (v[:, 0] < -1) | (v[:, 2] > 2)),
+    ("any(col < -2)", lambda v, i: (v < -2).any(axis=1)),
+    ("index % 97 == 0 and not col[0] > 0", lambda v, i: (i % 97 == 0) & ~(v[:, 0] > 0)),
+    ("0 < abs(c1) < 0.1", lambda v, i: (0 < np.abs(v[:, 1])) & (np.abs(v[:, 1]) < 0.1)),
+])
+def test_2d_matches_boolean_mask(table, make_archive, open_archive, compressed, workers,
+                                 text, mask):
+    archive = open_archive(make_archive({"t": table}, compressed))
+    selection = filter_rows(archive, "t", text, workers=workers, block_rows=1_000)
+    expected = np.flatnonzero(mask(table, np.arange(table.shape[0])))
+    np.testing.assert_array_equal(selection.rows, expected)
+    assert selection.n_rows == table.shape[0]
+    np.testing.assert_array_equal(np.asarray(selection.view(table)), table[expected])
+
+
+def test_fortran_order_and_loaded_data(table, make_archive, open_archive):
+    data = np.asfortranarray(table)
+    archive = open_archive(make_archive({"t": data}))
+    expected = np.flatnonzero(data[:, 2] >= 1)
+    for source in (None, np.load(archive.path)["t"]):
+        selection = filter_rows(archive, "t", "col[2] >= 1", data=source, block_rows=777)
+        np.testing.assert_array_equal(selection.rows, expected)
+
+
+def test_1d_and_nd_members(rng, make_archive, open_archive):
+    values = rng.normal(size=50_000)
+    # The rows of an N-D array run over every axis but the last
+    volume = rng.normal(size=(300, 6, 5))
+    archive = open_archive(make_archive({"v": values, "n": volume}))
+    np.testing.assert_array_equal(filter_rows(archive, "v", "abs(value) > 2").rows,
+                                  np.flatnonzero(np.abs(values) > 2))
+    np.testing.assert_array_equal(filter_rows(archive, "n", "mean(col) > 0.3").rows,
+                                  np.flatnonzero(volume.reshape(-1, 5).mean(axis=1) > 0.3))
+
+
+def test_structured_member(rng, make_archive, open_archive, compressed):
+    records = np.zeros(30_000, dtype=[("temperature", "f8"), ("station", "i4")])
+    records["temperature"] = rng.normal(300, 10, records.size)
+    records["station"] = rng.integers(0, 10, records.size)
+    archive = open_archive(make_archive({"r": records}, compressed))
+    selection = filter_rows(archive, "r", "temperature > 305 and station in (3, 7)",
+                            block_rows=4_096)
+    mask = (records["temperature"] > 305) & np.isin(records["station"], [3, 7])
+    np.testing.assert_array_equal(selection.rows, np.flatnonzero(mask))
+
+    view = selection.view(records)
+    stats = selection_stats(view, field="temperature")
+    assert stats.count == mask.sum()
+    assert stats.min == records["temperature"][mask].min()
+    assert stats.mean == pytest.approx(records["temperature"][mask].mean())
+
+
+def test_selection_histogram_matches_np_histogram(table):
+    selection_rows = np.flatnonzero(table[:, 0] > 0)
+    view = Selection(selection_rows, table.shape[0], "c0 > 0").view(table[:, 3])
+    histogram = selection_histogram(view, bins=40)
+    counts, edges = np.histogram(table[selection_rows, 3], 40)
+    np.testing.assert_array_equal(histogram.counts, counts)
+    np.testing.assert_array_equal(histogram.edges, edges)
+
+
+@pytest.mark.parametrize("text", ["col[9] > 0", "__import__('os')", "c0 >", "value.real > 0"])
+def test_invalid_filters_raise_query_error(table, make_archive, open_archive, text):
+    archive = open_archive(make_archive({"t": table}))
+    with pytest.raises(QueryError):
+        filter_rows(archive, "t", text)
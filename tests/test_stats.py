@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from npzengine import member_stats
+from npzengine.stats import member_field_stats
+
+
+def with_specials(values, rng):
+    values = values.copy()
+    for value, n in ((np.nan, 50), (np.inf, 5), (-np.inf, 5), (0, 20)):
+        np.put(values, rng.choice(values.size, n, replace=False), value)
+    return values
+
+
+def assert_matches(stats, values):
+    finite = np.where(np.isfinite(values), values, np.nan)
+    assert stats.total == values.size
+    assert stats.count == np.count_nonzero(np.isfinite(values))
+    assert stats.nan_count == np.count_nonzero(np.isnan(values))
+    assert stats.inf_count == np.count_nonzero(np.isinf(values))
+    assert stats.zero_count == np.count_nonzero(values == 0)
+    assert stats.min == np.nanmin(finite)
+    assert stats.max == np.nanmax(finite)
+    assert stats.mean == pytest.approx(np.nanmean(finite.astype(np.float64)), rel=1e-9)
+    assert stats.variance == pytest.approx(np.nanvar(finite.astype(np.float64)), rel=1e-9)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_float_member(rng, make_archive, open_archive, compressed, dtype, workers):
+    values = with_specials(rng.normal(3, 2, size=(400, 300)).astype(dtype), rng)
+    archive = open_archive(make_archive({"x": values}, compressed))
+    assert_matches(member_stats(archive, "x", workers, cache=None), values)
+
+
+def test_integer_and_complex_members(rng, make_archive, open_archive):
+    ints = rng.integers(-500, 500, size=100_000)
+    cplx = rng.normal(size=50_000) + 1j * rng.normal(size=50_000)
+    archive = open_archive(make_archive({"i": ints, "c": cplx}))
+    stats = member_stats(archive, "i", cache=None)
+    assert (stats.min, stats.max) == (ints.min(), ints.max())
+    assert stats.variance == pytest.approx(ints.var())
+    assert_matches(member_stats(archive, "c", cache=None), np.abs(cplx))
+
+
+def test_fortran_order_member(rng, make_archive, open_archive, compressed):
+    values = np.asfortranarray(with_specials(rng.normal(size=(300, 200)), rng))
+    archive = open_archive(make_archive({"f": values}, compressed))
+    assert_matches(member_stats(archive, "f", cache=None), values)
+
+
+def test_decoded_array_gives_the_same_stats(rng, make_archive, open_archive):
+    values = with_specials(rng.normal(size=(200, 200)), rng)
+    archive = open_archive(make_archive({"x": values}))
+    assert_matches(member_stats(archive, "x", cache=None, data=np.load(archive.path)["x"]),
+                   values)
+
+
+def test_structured_member_per_field(rng, make_archive, open_archive, compressed):
+    records = np.zeros(20_000, dtype=[("t", "f4"), ("n", "i8"), ("tag", "U4")])
+    records["t"] = with_specials(rng.normal(size=records.size).astype(np.float32), rng)
+    records["n"] = rng.integers(0, 1000, records.size)
+    archive = open_archive(make_archive({"r": records}, compressed))
+    stats = member_field_stats(archive, "r", cache=None)
+    assert stats["tag"] is None
+    assert_matches(stats["t"], records["t"])
+    assert (stats["n"].min, stats["n"].max) == (records["n"].min(), records["n"].max())
+    assert_matches(member_stats(archive, "r", cache=None, field="t"), records["t"])
+
+
+def test_unsupported_dtype(make_archive, open_archive):
+    archive = open_archive(make_archive({"s": np.array(["a", "b"])}))
+    assert member_stats(archive, "s", cache=None) is None
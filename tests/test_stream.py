@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from npzengine import MemberStream
+
+CHECKPOINT = 64 << 10   # small, so a test archive spans many checkpoints
+
+
+@pytest.fixture
+def volume(rng, make_archive, open_archive):
+    data = rng.normal(size=(64, 50, 40))
+    path = make_archive({"v": data, "f": np.asfortranarray(data)})
+    return data, path, open_archive(path)
+
+
+def test_sequential_chunks_match_np_load(volume):
+    data, path, archive = volume
+    with MemberStream(path, archive.index["v"], checkpoint_interval=CHECKPOINT,
+                      read_size=4096) as stream:
+        chunks = list(stream.iter_chunks(7_777))
+        assert len(stream.checkpoints) > 10
+    assert [offset for offset, _ in chunks] == list(range(0, data.size, 7_777))
+    np.testing.assert_array_equal(np.concatenate([chunk for _, chunk in chunks]),
+                                  data.reshape(-1))
+
+
+def test_seeks_across_checkpoints(volume, rng):
+    data, path, archive = volume
+    flat = data.reshape(-1)
+    with MemberStream(path, archive.index["v"], checkpoint_interval=CHECKPOINT,
+                      read_size=4096) as stream:
+        # Forward to the end first, so backward seeks restart from checkpoints
+        stream.read_elements(flat.size - 10, 10)
+        starts = rng.integers(0, flat.size, 50)
+        for start in list(starts) + [0, flat.size - 1, CHECKPOINT // 8, CHECKPOINT // 8 - 1]:
+            start = int(start)
+            np.testing.assert_array_equal(stream.read_elements(start, 3_000),
+                                          flat[start:start + 3_000])
+
+
+def test_fortran_order_reads_in_storage_order(volume):
+    data, path, archive = volume
+    with MemberStream(path, archive.index["f"], checkpoint_interval=CHECKPOINT) as stream:
+        np.testing.assert_array_equal(stream.read_elements(1_000, 5_000),
+                                      data.reshape(-1, order="F")[1_000:6_000])
+
+
+def test_read_past_end_is_clipped(volume):
+    data, path, archive = volume
+    with MemberStream(path, archive.index["v"]) as stream:
+        np.testing.assert_array_equal(stream.read_elements(data.size - 5, 100),
+                                      data.reshape(-1)[-5:])
+
+
+def test_stored_member_is_rejected(make_archive, open_archive):
+    path = make_archive({"x": np.arange(10)}, compressed=False)
+    with pytest.raises(ValueError):
+        MemberStream(path, open_archive(path).index["x"])